@@ -6,14 +6,19 @@ Premium chat interface with RAG-powered responses
 import streamlit as st
 from pathlib import Path
 import sys
+import time
 from datetime import datetime
 
+_script_start = time.perf_counter()
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.config import Config
-from src.rag.generator import get_generator
+from src.rag.generator import start_background_warm_up, wait_for_generator, get_warm_up_error
+from src.rag.retriever import get_retriever
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
 
 # Page configuration
 st.set_page_config(
@@ -188,10 +193,20 @@ logger = setup_logger("streamlit_app")
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
-if 'generator' not in st.session_state:
+# Load the model and collection in the background so the UI renders immediately
+start_background_warm_up()
+
+
+@st.cache_resource(show_spinner="Loading knowledge base...")
+def load_generator():
+    """Generator shared by every session in this process"""
+    return wait_for_generator()
+
+
+def require_generator():
+    """Shared generator, or stop the page with an error if it cannot start"""
     try:
-        st.session_state.generator = get_generator()
-        logger.info("Generator initialized")
+        return load_generator()
     except Exception as e:
         st.error(f"❌ Failed to initialize AI system: {e}")
         logger.error(f"Initialization error: {e}")
@@ -234,6 +249,10 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    # A failed background warm-up is retried once here so the page shows why
+    if get_warm_up_error() is not None:
+        require_generator()
+    
     # Sidebar
     with st.sidebar:
         st.markdown("### ⚙️ Settings")
@@ -279,6 +298,29 @@ def main():
         - 📖 Handbook content
         """)
         
+        # Initialization timings of the shared components
+        timings = get_registry().get_timings()
+        if timings:
+            with st.expander("⏱️ System Status"):
+                for name, seconds in timings.items():
+                    st.markdown(f"- {name.replace('_', ' ')}: {seconds:.2f}s")
+                
+                if get_registry().is_initialized("retriever"):
+                    cache_stats = get_retriever().get_cache_stats()
+                    semantic = cache_stats.get('semantic_cache')
+                    if semantic:
+                        st.markdown(f"- semantic cache hit rate: {semantic['hit_rate']:.0%}")
+                    st.markdown(
+                        f"- query cache hit rate: "
+                        f"{cache_stats['query_embedding_cache']['hit_rate']:.0%}"
+                    )
+                    reranker = cache_stats.get('reranker')
+                    if reranker:
+                        st.markdown(
+                            f"- reranker fallbacks: {reranker['fallbacks']} "
+                            f"of {reranker['reranked'] + reranker['fallbacks']}"
+                        )
+        
         # Clear chat
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.messages = []
@@ -320,27 +362,27 @@ def main():
             full_response = ""
             sources = []
             
+            # Shared generator (waits for warm-up if needed)
+            generator = require_generator()
+            
             try:
-                # Get response from generator
-                response = st.session_state.generator.generate(
+                events = generator.generate_stream(
                     query=prompt,
                     faculty=faculty,
                     top_k=top_k,
                     temperature=temperature
                 )
                 
-                answer = response['answer']
-                sources = response['sources']
-                
-                # Simulate streaming effect
-                import time
-                words = answer.split()
-                for i, word in enumerate(words):
-                    full_response += word + " "
-                    # Update every 3 words for smooth streaming
-                    if i % 3 == 0 or i == len(words) - 1:
+                for event in events:
+                    if event['type'] == 'sources':
+                        sources = event['sources']
+                    elif event['type'] == 'delta':
+                        full_response += event['content']
                         message_placeholder.markdown(full_response + "▌")
-                        time.sleep(0.05)  # Small delay for streaming effect
+                    elif event['type'] == 'done':
+                        logger.info(
+                            f"Time to first token: {event['metadata']['time_to_first_token']}s"
+                        )
                 
                 # Final response without cursor
                 message_placeholder.markdown(full_response)
@@ -409,3 +451,7 @@ def main():
 
 if __name__ == "__main__":
     main()
+    
+    if 'startup_logged' not in st.session_state:
+        st.session_state.startup_logged = True
+        logger.info(f"UI rendered in {time.perf_counter() - _script_start:.2f}s")
@@ -3,7 +3,9 @@ Knowledge Base Builder
 Combines all data sources and builds the vector database
 """
 
+import argparse
 import json
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Dict
 from tqdm import tqdm
@@ -13,7 +15,11 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
-from src.rag.vector_store import get_vector_store
+from src.rag.vector_store import (
+    create_vector_store, content_hash, record_hash, make_chunk_id, prepare_records
+)
+from src.rag.bm25_index import BM25Index, get_bm25_index_path
+from src.rag.kb_version import write_kb_version, read_kb_version
 
 logger = setup_logger(
     "kb_builder",
@@ -26,16 +32,34 @@ class KnowledgeBaseBuilder:
     
     def __init__(self):
         """Initialize builder"""
-        self.vector_store = get_vector_store()
+        self._vector_store = None
         self.stats = {
             'web_docs': 0,
             'faculty_docs': 0,
             'handbook_pages': 0,
-            'total_chunks': 0
+            'total_chunks': 0,
+            'duplicate_chunks': 0,
+            'added': 0,
+            'updated': 0,
+            'removed': 0,
+            'unchanged': 0,
+            'write_timings': {},
+            'bm25_terms': 0
         }
         
         logger.info("Knowledge Base Builder initialized")
     
+    @property
+    def vector_store(self):
+        """Vector store, opened on first use (always writable, even on serving nodes)"""
+        if self._vector_store is None:
+            self._vector_store = create_vector_store(read_only=False)
+        return self._vector_store
+    
+    @vector_store.setter
+    def vector_store(self, store):
+        self._vector_store = store
+    
     def load_web_data(self) -> List[Dict]:
         """Load main website data"""
         logger.info("Loading main website data...")
@@ -108,6 +132,26 @@ class KnowledgeBaseBuilder:
         
         return documents
     
+    def load_all_documents(self) -> List[Dict]:
+        """Load raw documents from every data source"""
+        all_documents = []
+        
+        # 1. Main website
+        web_docs = self.load_web_data()
+        all_documents.extend(web_docs)
+        
+        # 2. Faculty website (FTS)
+        faculty_docs = self.load_faculty_data("FTS")
+        all_documents.extend(faculty_docs)
+        
+        # 3. Handbooks
+        handbook_docs = self.load_handbook_data()
+        all_documents.extend(handbook_docs)
+        
+        logger.info(f"Total raw documents: {len(all_documents)}")
+        
+        return all_documents
+    
     def chunk_document(self, content: str, chunk_size: int = None, 
                       overlap: int = None) -> List[str]:
         """
@@ -139,6 +183,29 @@ class KnowledgeBaseBuilder:
         
         return chunks
     
+    def get_source_key(self, doc: Dict) -> str:
+        """
+        Stable identifier of the source a document came from
+        
+        Args:
+            doc: Raw document
+        
+        Returns:
+            URL, handbook file and page, or a content hash as last resort
+        """
+        metadata = doc.get('metadata', {})
+        
+        url = doc.get('url') or metadata.get('url')
+        if url:
+            return url
+        
+        source_file = doc.get('source_file') or metadata.get('source_file')
+        if source_file:
+            page_number = metadata.get('page_number')
+            return f"{source_file}#page={page_number}" if page_number else source_file
+        
+        return content_hash(doc.get('content', ''))
+    
     def prepare_documents_for_vectorstore(self, documents: List[Dict]) -> List[Dict]:
         """
         Prepare documents for vector store
@@ -152,6 +219,7 @@ class KnowledgeBaseBuilder:
         logger.info("Preparing documents for vector store...")
         
         prepared_docs = []
+        seen_ids = set()
         
         for doc in tqdm(documents, desc="Chunking documents"):
             content = doc.get('content', '')
@@ -160,6 +228,8 @@ class KnowledgeBaseBuilder:
             if not content or len(content.strip()) < 100:
                 continue
             
+            source_key = self.get_source_key(doc)
+            
             # For short documents, don't chunk
             if len(content) < Config.CHUNK_SIZE:
                 prepared_doc = {
@@ -171,8 +241,7 @@ class KnowledgeBaseBuilder:
                     if key in doc and key not in prepared_doc['metadata']:
                         prepared_doc['metadata'][key] = doc[key]
                 
-                prepared_docs.append(prepared_doc)
-                self.stats['total_chunks'] += 1
+                self._add_prepared(prepared_docs, seen_ids, prepared_doc, source_key, 0)
             else:
                 # Chunk long documents
                 chunks = self.chunk_document(content)
@@ -191,19 +260,39 @@ class KnowledgeBaseBuilder:
                         'content': chunk,
                         'metadata': metadata
                     }
-                    prepared_docs.append(prepared_doc)
-                    self.stats['total_chunks'] += 1
+                    self._add_prepared(prepared_docs, seen_ids, prepared_doc, source_key, i)
         
         logger.info(f"✅ Prepared {len(prepared_docs)} document chunks")
+        if self.stats['duplicate_chunks']:
+            logger.warning(f"Skipped {self.stats['duplicate_chunks']} duplicate chunks")
         
         return prepared_docs
     
+    def _add_prepared(self, prepared_docs: List[Dict], seen_ids: set,
+                      prepared_doc: Dict, source_key: str, chunk_index: int):
+        """Assign the deterministic ID and keep the chunk unless it is a duplicate"""
+        doc_id = make_chunk_id(source_key, chunk_index)
+        if doc_id in seen_ids:
+            self.stats['duplicate_chunks'] += 1
+            return
+        
+        seen_ids.add(doc_id)
+        prepared_doc['id'] = doc_id
+        prepared_doc['metadata']['source_key'] = source_key
+        prepared_doc['metadata']['content_hash'] = record_hash(
+            prepared_doc['content'], prepared_doc['metadata']
+        )
+        
+        prepared_docs.append(prepared_doc)
+        self.stats['total_chunks'] += 1
+    
     def build_knowledge_base(self, rebuild: bool = False):
         """
         Build complete knowledge base
         
         Args:
-            rebuild: If True, delete existing collection and rebuild
+            rebuild: If True, delete existing collection and rebuild;
+                otherwise upsert new/changed chunks and delete removed ones
         """
         logger.info("Building knowledge base...")
         
@@ -212,40 +301,71 @@ class KnowledgeBaseBuilder:
             try:
                 self.vector_store.delete_collection()
                 # Reinitialize vector store
-                from src.rag.vector_store import VectorStore
-                self.vector_store = VectorStore()
+                self.vector_store = create_vector_store(read_only=False)
             except Exception as e:
                 logger.warning(f"Could not delete collection: {e}")
         
         # Load all data sources
-        all_documents = []
-        
-        # 1. Main website
-        web_docs = self.load_web_data()
-        all_documents.extend(web_docs)
+        all_documents = self.load_all_documents()
         
-        # 2. Faculty website (FTS)
-        faculty_docs = self.load_faculty_data("FTS")
-        all_documents.extend(faculty_docs)
+        # Prepare documents (chunking)
+        prepared_docs = self.prepare_documents_for_vectorstore(all_documents)
         
-        # 3. Handbooks
-        handbook_docs = self.load_handbook_data()
-        all_documents.extend(handbook_docs)
+        # Write to vector store (large corpora are encoded by a process pool)
+        generator = self.vector_store.embedding_generator
+        batch_size = 100
+        pool = nullcontext()
+        
+        if (len(prepared_docs) > Config.MULTIPROCESS_MIN_DOCUMENTS
+                and Config.EMBEDDING_WORKERS > 1):
+            logger.info(f"Using {Config.EMBEDDING_WORKERS} embedding worker processes")
+            pool = generator.multi_process_pool(Config.EMBEDDING_WORKERS)
+            batch_size = max(100, Config.EMBEDDING_WORKERS * 32)
+        
+        with pool:
+            if rebuild:
+                logger.info("Adding documents to vector store...")
+                self.vector_store.add_documents(prepared_docs, batch_size=batch_size)
+                self.stats['added'] = len(prepared_docs)
+            else:
+                logger.info("Syncing documents with vector store...")
+                self.stats.update(
+                    self.vector_store.sync_documents(prepared_docs, batch_size=batch_size)
+                )
         
-        logger.info(f"Total raw documents: {len(all_documents)}")
+        self.stats['write_timings'] = self.vector_store.last_write_timings
         
-        # Prepare documents (chunking)
-        prepared_docs = self.prepare_documents_for_vectorstore(all_documents)
+        # Sparse index over the same chunks, rebuilt in full (it takes seconds)
+        ids, texts, metadatas = prepare_records(prepared_docs)
+        bm25_index = BM25Index.build(ids, texts, metadatas)
+        bm25_index.save(get_bm25_index_path(self.vector_store.collection_name))
+        self.stats['bm25_terms'] = len(bm25_index.vocabulary)
         
-        # Add to vector store
-        logger.info("Adding documents to vector store...")
-        self.vector_store.add_documents(prepared_docs, batch_size=100)
+        self.stamp_version(rebuild)
         
         # Print statistics
         self.print_stats()
         
         logger.info("✅ Knowledge base built successfully!")
     
+    def stamp_version(self, rebuild: bool) -> bool:
+        """
+        Stamp a new KB version so caches drop answers from the old build
+        
+        A sync that changed nothing keeps the current version, so a no-op
+        nightly run does not flush the caches on every replica.
+        
+        Returns:
+            True if a new version was written
+        """
+        changed = rebuild or any(self.stats[key] for key in ('added', 'updated', 'removed'))
+        if not changed and read_kb_version() != 'unversioned':
+            logger.info(f"Knowledge base unchanged, keeping version {read_kb_version()}")
+            return False
+        
+        write_kb_version(document_count=self.vector_store.get_stats()['document_count'])
+        return True
+    
     def print_stats(self):
         """Print build statistics"""
         print("\n" + "="*60)
@@ -255,6 +375,17 @@ class KnowledgeBaseBuilder:
         print(f"Faculty website documents: {self.stats['faculty_docs']}")
         print(f"Handbook pages:            {self.stats['handbook_pages']}")
         print(f"Total chunks in DB:        {self.stats['total_chunks']}")
+        print(f"Added / updated:           {self.stats['added']} / {self.stats['updated']}")
+        print(f"Removed / unchanged:       {self.stats['removed']} / {self.stats['unchanged']}")
+        print(f"BM25 vocabulary:           {self.stats['bm25_terms']} terms")
+        
+        timings = self.stats['write_timings']
+        if timings:
+            print(f"Embed stage:               {timings['embed_seconds']:.2f}s")
+            print(f"Write stage:               {timings['write_seconds']:.2f}s")
+            print(f"Writer idle (waiting):     {timings['wait_seconds']:.2f}s")
+            print(f"Pipeline wall time:        {timings['total_seconds']:.2f}s "
+                  f"({timings['batches']} batches)")
         print("="*60)
         
         # Vector store stats
@@ -262,11 +393,18 @@ class KnowledgeBaseBuilder:
         print(f"\nVector Store: {vs_stats['collection_name']}")
         print(f"Documents: {vs_stats['document_count']}")
         print(f"Embedding dimension: {vs_stats['embedding_dimension']}")
+        for name, count in vs_stats.get('partitions', {}).items():
+            print(f"  {name}: {count}")
         print("="*60)
 
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Build the knowledge base")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Delete the collection and rebuild from scratch")
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("🏗️  Knowledge Base Builder")
     print("="*60)
@@ -277,8 +415,8 @@ def main():
     try:
         builder = KnowledgeBaseBuilder()
         
-        # Build knowledge base (rebuild=True to start fresh)
-        builder.build_knowledge_base(rebuild=True)
+        # Incremental by default; --rebuild starts fresh
+        builder.build_knowledge_base(rebuild=args.rebuild)
         
         print("\n✅ Knowledge base ready!")
         print("\nYou can now run the Streamlit app:")
@@ -0,0 +1,214 @@
+"""
+ONNX Model Exporter
+Exports the embedding model to ONNX, quantizes it and checks parity with torch
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import List
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.rag.onnx_encoder import (
+    OnnxEncoder,
+    ONNX_MODEL_FILE,
+    ONNX_QUANTIZED_MODEL_FILE,
+    ONNX_CONFIG_FILE
+)
+
+logger = setup_logger(
+    "onnx_export",
+    log_file=str(Config.LOGS_DIR / "onnx_export.log")
+)
+
+SAMPLE_QUERIES = [
+    "What programs does the Faculty of Technological Studies offer?",
+    "How do I apply to the University of Vavuniya?",
+    "What recent events happened at the university?",
+    "Tell me about the different faculties at VAU",
+    "What are the modules in the DICT degree?"
+]
+
+
+def export_model(output_dir: Path):
+    """
+    Export the sentence-transformers model to ONNX
+
+    Args:
+        output_dir: Directory to write the graph, tokenizer and config
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    logger.info(f"Loading {Config.EMBEDDING_MODEL} for export...")
+    model = SentenceTransformer(Config.EMBEDDING_MODEL, device="cpu")
+
+    pooling = next(m for m in model if isinstance(m, Pooling))
+    if pooling.get_pooling_mode_str() != "mean":
+        raise ValueError(f"Only mean pooling is supported, got {pooling.get_pooling_mode_str()}")
+
+    class TransformerWrapper(torch.nn.Module):
+        """Return token embeddings only so the graph has one output"""
+
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids
+            )[0]
+
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    dummy = tokenizer(SAMPLE_QUERIES[:2], padding=True, return_tensors="pt")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = output_dir / ONNX_MODEL_FILE
+
+    logger.info(f"Exporting graph to {model_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            TransformerWrapper(transformer),
+            (dummy['input_ids'], dummy['attention_mask'], dummy['token_type_ids']),
+            str(model_path),
+            input_names=['input_ids', 'attention_mask', 'token_type_ids'],
+            output_names=['token_embeddings'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'token_type_ids': {0: 'batch', 1: 'sequence'},
+                'token_embeddings': {0: 'batch', 1: 'sequence'}
+            },
+            opset_version=14
+        )
+
+    tokenizer.save_pretrained(str(output_dir))
+
+    with open(output_dir / ONNX_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': Config.EMBEDDING_MODEL,
+            'embedding_dim': model.get_sentence_embedding_dimension(),
+            'max_seq_length': model.max_seq_length,
+            'pad_token': tokenizer.pad_token,
+            'normalize': any(isinstance(m, Normalize) for m in model)
+        }, f, indent=2)
+
+    logger.info("✅ ONNX export complete")
+
+
+def quantize_model(output_dir: Path):
+    """
+    Apply dynamic int8 quantization to the exported graph
+
+    Args:
+        output_dir: Directory holding the float32 graph
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    logger.info("Quantizing weights to int8...")
+    quantize_dynamic(
+        str(output_dir / ONNX_MODEL_FILE),
+        str(output_dir / ONNX_QUANTIZED_MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
+    logger.info("✅ Quantized model written")
+
+
+def load_sample_texts(limit: int = 200) -> List[str]:
+    """Load a sample of real corpus texts for the parity check"""
+    texts = list(SAMPLE_QUERIES)
+
+    web_file = Config.RAW_DATA_DIR / "vau_scraped_latest.json"
+    if web_file.exists():
+        with open(web_file, 'r', encoding='utf-8') as f:
+            texts.extend(doc['content'][:Config.CHUNK_SIZE] for doc in json.load(f))
+
+    handbook_file = Config.PROCESSED_DATA_DIR / "handbooks_processed_latest.json"
+    if handbook_file.exists():
+        with open(handbook_file, 'r', encoding='utf-8') as f:
+            for handbook in json.load(f):
+                texts.extend(page['content'][:Config.CHUNK_SIZE] for page in handbook['pages'])
+
+    texts = [t for t in texts if t.strip()]
+    return texts[:limit]
+
+
+def check_parity(output_dir: Path, quantized: bool, threshold: float) -> bool:
+    """
+    Compare ONNX embeddings against the torch model
+
+    Args:
+        output_dir: Directory holding the exported model
+        quantized: Check the int8 graph instead of float32
+        threshold: Minimum acceptable cosine similarity per text
+
+    Returns:
+        True if every text is above the threshold
+    """
+    from sentence_transformers import SentenceTransformer
+
+    texts = load_sample_texts()
+    reference = SentenceTransformer(Config.EMBEDDING_MODEL, device="cpu").encode(
+        texts, convert_to_numpy=True, normalize_embeddings=True
+    )
+    candidate = OnnxEncoder(str(output_dir), quantized=quantized).encode(texts)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+
+    similarity = (reference * candidate).sum(axis=1)
+    passed = bool(similarity.min() >= threshold)
+
+    label = "int8" if quantized else "float32"
+    print(f"\n{label} parity over {len(texts)} texts:")
+    print(f"  min cosine:  {similarity.min():.5f}")
+    print(f"  mean cosine: {similarity.mean():.5f}")
+    print(f"  threshold:   {threshold:.5f} -> {'PASS' if passed else 'FAIL'}")
+
+    return passed
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--output-dir", default=Config.ONNX_MODEL_PATH)
+    parser.add_argument("--no-quantize", action="store_true",
+                        help="Skip int8 quantization")
+    parser.add_argument("--check-only", action="store_true",
+                        help="Only run the parity check on an existing export")
+    parser.add_argument("--threshold", type=float, default=Config.ONNX_PARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("📦 ONNX Model Exporter")
+    print("="*60)
+
+    Config.create_directories()
+    output_dir = Path(args.output_dir)
+
+    if not args.check_only:
+        export_model(output_dir)
+        if not args.no_quantize:
+            quantize_model(output_dir)
+
+    passed = check_parity(output_dir, quantized=False, threshold=args.threshold)
+    if (output_dir / ONNX_QUANTIZED_MODEL_FILE).exists():
+        passed = check_parity(output_dir, quantized=True, threshold=args.threshold) and passed
+
+    if not passed:
+        print("\n❌ Parity check failed - keep EMBEDDING_BACKEND=torch")
+        sys.exit(1)
+
+    print("\n✅ ONNX model ready. Set EMBEDDING_BACKEND=onnx to use it.")
+
+
+if __name__ == "__main__":
+    main()
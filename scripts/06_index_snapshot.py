@@ -0,0 +1,79 @@
+"""
+Index Snapshot Tool
+Exports the knowledge base to a single archive and restores it on another node
+"""
+
+import argparse
+import time
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.rag.vector_store import create_vector_store
+from src.rag.snapshot import export_snapshot, import_snapshot, SUPPORTED_DTYPES
+from src.rag.kb_version import read_kb_version
+
+logger = setup_logger(
+    "index_snapshot",
+    log_file=str(Config.LOGS_DIR / "index_snapshot.log")
+)
+
+DEFAULT_SNAPSHOT_PATH = Config.DATA_DIR / "snapshots" / "knowledge_base.zip"
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Export or restore a knowledge base snapshot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write the current index to an archive")
+    export_parser.add_argument("path", nargs="?", default=str(DEFAULT_SNAPSHOT_PATH))
+    export_parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default="float16",
+                               help="Vector precision stored in the archive")
+
+    import_parser = subparsers.add_parser("import", help="Restore an archive into the configured backend")
+    import_parser.add_argument("path", nargs="?", default=str(DEFAULT_SNAPSHOT_PATH))
+    import_parser.add_argument("--replace", action="store_true",
+                               help="Delete the existing collection before restoring")
+    import_parser.add_argument("--merge", action="store_true",
+                               help="Keep existing chunks that are not in the snapshot")
+
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("📦 Knowledge Base Snapshot")
+    print("="*60)
+
+    Config.create_directories()
+    start = time.perf_counter()
+    store = create_vector_store(read_only=False)
+
+    if args.command == "export":
+        manifest = export_snapshot(store, args.path, dtype=args.dtype)
+        size_mb = Path(args.path).stat().st_size / 1e6
+        print(f"\nExported {manifest['document_count']} chunks to {args.path}")
+        print(f"Vectors: {manifest['embedding_dimension']}-d {manifest['dtype']}, archive {size_mb:.1f} MB")
+    else:
+        if args.replace:
+            store.delete_collection()
+            store = create_vector_store(read_only=False)
+
+        manifest = import_snapshot(store, args.path, merge=args.merge)
+        print(f"\nRestored {manifest['document_count']} chunks into {Config.VECTOR_DB_TYPE}")
+        if manifest['removed_count']:
+            print(f"Removed {manifest['removed_count']} chunks not in the snapshot")
+
+    version = (manifest.get('kb_version') or {}).get('version', 'unversioned')
+    if args.command == "import" and args.merge:
+        version = f"{read_kb_version()} (merged from {version})"
+    print(f"Model: {manifest['embedding_model_id']}")
+    print(f"Knowledge base version: {version}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Embedding Throughput Benchmark
+Compares encoding speed with and without length-bucketed batching (ONNX backend)
+"""
+
+import argparse
+import importlib
+import time
+from pathlib import Path
+from typing import List
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from src.config import Config
+from src.rag.embeddings import EmbeddingGenerator
+
+
+def load_corpus() -> List[str]:
+    """Load and chunk the real corpus exactly as the knowledge-base builder does"""
+    builder_module = importlib.import_module("04_build_knowledge_base")
+    builder = builder_module.KnowledgeBaseBuilder()
+    documents = builder.load_all_documents()
+    prepared = builder.prepare_documents_for_vectorstore(documents)
+    return [doc['content'] for doc in prepared]
+
+
+def padding_ratio(lengths: np.ndarray, batch_size: int) -> float:
+    """Padded token slots per real token when batching in the given order"""
+    padded = 0
+    for start in range(0, len(lengths), batch_size):
+        batch = lengths[start:start + batch_size]
+        padded += batch.max() * len(batch)
+    return padded / lengths.sum()
+
+
+def baseline_order(texts: List[str], backend: str) -> np.ndarray:
+    """
+    Order the encoder batches texts in without bucketing
+
+    sentence-transformers sorts each call by character length (longest
+    first); the ONNX encoder keeps input order.
+    """
+    if backend == "torch":
+        return np.argsort([-len(text) for text in texts], kind='stable')
+    return np.arange(len(texts))
+
+
+def run(generator: EmbeddingGenerator, texts: List[str], batch_size: int,
+        bucketing: bool, repeats: int) -> float:
+    """Best-of-N sentences/sec for one configuration"""
+    generator.length_bucketing = bucketing
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        generator.generate_embeddings(
+            texts,
+            batch_size=batch_size,
+            show_progress=False,
+            use_cache=False
+        )
+        elapsed = time.perf_counter() - start
+        best = max(best, len(texts) / elapsed)
+    return best
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark embedding throughput")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--shuffle-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("⏱️  Embedding Throughput Benchmark")
+    print("="*60)
+
+    texts = load_corpus()
+
+    # Builder order groups similar sources; shuffle to mimic mixed batches
+    rng = np.random.default_rng(args.shuffle_seed)
+    texts = [texts[i] for i in rng.permutation(len(texts))]
+
+    generator = EmbeddingGenerator(use_cache=False, query_cache_size=0)
+    lengths = generator._token_lengths(texts)
+
+    print(f"\nCorpus: {len(texts)} chunks, {Config.EMBEDDING_MODEL} ({generator.backend})")
+    print(f"Token length: min {lengths.min()}, median {int(np.median(lengths))}, max {lengths.max()}")
+    baseline = lengths[baseline_order(texts, generator.backend)]
+    print(f"Padding ratio (encoder order): {padding_ratio(baseline, args.batch_size):.2f}")
+    print(f"Padding ratio (bucketed):      {padding_ratio(np.sort(lengths), args.batch_size):.2f}")
+
+    if generator.backend != "onnx":
+        print("\nBucketing only applies to the ONNX backend "
+              "(sentence-transformers sorts batches itself)")
+        print("="*60)
+        return
+
+    # Warm-up so the first measured run does not pay for lazy initialization
+    generator.generate_embeddings(texts[:args.batch_size], show_progress=False, use_cache=False)
+
+    before = run(generator, texts, args.batch_size, bucketing=False, repeats=args.repeats)
+    after = run(generator, texts, args.batch_size, bucketing=True, repeats=args.repeats)
+
+    print(f"\nWithout bucketing: {before:8.1f} sentences/sec")
+    print(f"With bucketing:    {after:8.1f} sentences/sec")
+    print(f"Speed-up:          {after / before:8.2f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Vector Search Benchmark
+Compares exact float32 search with int8 first-pass search plus exact re-scoring
+"""
+
+import argparse
+import importlib
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from src.config import Config
+from src.rag.embeddings import get_embedding_generator
+from src.rag.numpy_store import NumpyVectorStore, quantize_int8
+
+SAMPLE_QUERIES = [
+    "What programs does the Faculty of Technological Studies offer?",
+    "How do I apply to the University of Vavuniya?",
+    "What recent events happened at the university?",
+    "Tell me about the different faculties at VAU",
+    "What are the modules in the DICT degree?"
+]
+
+
+def load_corpus() -> List[dict]:
+    """Load and chunk the real corpus exactly as the knowledge-base builder does"""
+    builder_module = importlib.import_module("04_build_knowledge_base")
+    builder = builder_module.KnowledgeBaseBuilder()
+    documents = builder.load_all_documents()
+    return builder.prepare_documents_for_vectorstore(documents)
+
+
+def build_queries(documents: List[dict], num_queries: int, seed: int) -> List[str]:
+    """Sample questions plus opening sentences of random chunks"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(documents), size=min(num_queries, len(documents)), replace=False)
+    snippets = [documents[i]['content'][:200] for i in picks]
+    return SAMPLE_QUERIES + snippets
+
+
+def time_search(store: NumpyVectorStore, query_embeddings: np.ndarray, top_k: int,
+                repeats: int) -> Tuple[np.ndarray, List[Set[str]]]:
+    """Per-query latency in ms (best of N) and the returned IDs"""
+    latencies, results = [], []
+    for embedding in query_embeddings:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            found = store.search_many_by_embedding([embedding], top_k)[0]
+            best = min(best, time.perf_counter() - start)
+        latencies.append(best * 1000)
+        results.append({r['id'] for r in found})
+    return np.array(latencies), results
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark exact vs int8 vector search")
+    parser.add_argument("--top-k", type=int, default=Config.TOP_K_RESULTS)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("⏱️  Vector Search Benchmark")
+    print("="*60)
+
+    documents = load_corpus()
+    generator = get_embedding_generator()
+    queries = build_queries(documents, args.num_queries, args.seed)
+    query_embeddings = generator.generate_embeddings(queries, show_progress=False, use_cache=False)
+
+    # Throwaway indexes so the real one is never touched
+    with tempfile.TemporaryDirectory() as index_dir:
+        Config.NUMPY_INDEX_PATH = index_dir
+
+        exact_store = NumpyVectorStore("benchmark_exact", read_only=False, quantization="none")
+        exact_store.add_documents(documents)
+        records = exact_store.export_records()
+
+        quantized_store = NumpyVectorStore("benchmark_int8", read_only=False, quantization="int8")
+        quantized_store.add_records(
+            records['ids'], records['embeddings'], records['documents'], records['metadatas']
+        )
+
+        exact_ms, exact_ids = time_search(exact_store, query_embeddings, args.top_k, args.repeats)
+        int8_ms, int8_ids = time_search(quantized_store, query_embeddings, args.top_k, args.repeats)
+
+    recall = np.mean([len(e & q) / len(e) for e, q in zip(exact_ids, int8_ids) if e])
+
+    num_vectors, dim = records['embeddings'].shape
+    codes, scales = quantize_int8(records['embeddings'])
+    float_bytes = records['embeddings'].astype(np.float32).nbytes / num_vectors
+    int8_bytes = (codes.nbytes + scales.nbytes) / num_vectors
+
+    print(f"\nCorpus: {num_vectors} chunks, {dim}-d, {len(queries)} queries, top_k={args.top_k}")
+    print(f"Re-score factor: {Config.NUMPY_RESCORE_FACTOR} "
+          f"({args.top_k * Config.NUMPY_RESCORE_FACTOR} candidates re-scored)")
+    print(f"\n{'':18}{'bytes/vector':>14}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'float32 exact':18}{float_bytes:14.1f}"
+          f"{np.percentile(exact_ms, 50):10.3f}{np.percentile(exact_ms, 95):10.3f}")
+    print(f"{'int8 + re-score':18}{int8_bytes:14.1f}"
+          f"{np.percentile(int8_ms, 50):10.3f}{np.percentile(int8_ms, 95):10.3f}")
+    print(f"\nRecall@{args.top_k} vs exact: {recall:.4f}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
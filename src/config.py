@@ -19,6 +19,12 @@ class Config:
     RAW_DATA_DIR = DATA_DIR / "raw"
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
     CHROMADB_DIR = DATA_DIR / "chromadb"
+    NUMPY_INDEX_DIR = DATA_DIR / "numpy_index"
+    PARTITION_MANIFEST_DIR = DATA_DIR / "partitions"
+    BM25_INDEX_DIR = DATA_DIR / "bm25_index"
+    EMBEDDING_CACHE_DIR = DATA_DIR / "embedding_cache"
+    ONNX_MODEL_DIR = DATA_DIR / "onnx"
+    KB_VERSION_PATH = DATA_DIR / "kb_version.json"
     LOGS_DIR = DATA_DIR / "logs"
     
     # API Keys
@@ -27,20 +33,65 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
     
     # Vector Database
-    VECTOR_DB_TYPE = os.getenv("VECTOR_DB_TYPE", "chromadb")
+    VECTOR_DB_TYPE = os.getenv("VECTOR_DB_TYPE", "chromadb")  # chromadb or numpy
     CHROMADB_PATH = os.getenv("CHROMADB_PATH", str(CHROMADB_DIR))
+    NUMPY_INDEX_PATH = os.getenv("NUMPY_INDEX_PATH", str(NUMPY_INDEX_DIR))
+    NUMPY_QUANTIZATION = os.getenv("NUMPY_QUANTIZATION", "none")  # none or int8
+    NUMPY_RESCORE_FACTOR = int(os.getenv("NUMPY_RESCORE_FACTOR", "4"))
+    WRITE_PIPELINE_DEPTH = int(os.getenv("WRITE_PIPELINE_DEPTH", "2"))
+    VECTOR_DB_PARTITIONED = os.getenv("VECTOR_DB_PARTITIONED", "false").lower() == "true"
+    PARTITION_SEARCH_WORKERS = int(os.getenv("PARTITION_SEARCH_WORKERS", "4"))
+    VECTOR_DB_READ_ONLY = os.getenv("VECTOR_DB_READ_ONLY", "false").lower() == "true"
     
     # Model Configuration
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", str(EMBEDDING_CACHE_DIR))
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch or onnx
+    ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", str(ONNX_MODEL_DIR))
+    ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "true").lower() == "true"
+    ONNX_PARITY_THRESHOLD = float(os.getenv("ONNX_PARITY_THRESHOLD", "0.99"))
+    EMBEDDING_LENGTH_BUCKETING = os.getenv("EMBEDDING_LENGTH_BUCKETING", "true").lower() == "true"
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", str(os.cpu_count() or 1)))
+    MULTIPROCESS_MIN_DOCUMENTS = int(os.getenv("MULTIPROCESS_MIN_DOCUMENTS", "2000"))
     LLM_PRIMARY = os.getenv("LLM_PRIMARY", "groq")
     LLM_FALLBACK = os.getenv("LLM_FALLBACK", "openai")
     GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1000"))
+    GROQ_PROMPT_TOKENS = int(os.getenv("GROQ_PROMPT_TOKENS", "4000"))
+    OPENAI_PROMPT_TOKENS = int(os.getenv("OPENAI_PROMPT_TOKENS", "8000"))
     
     # RAG Configuration
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "100"))
     TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    HYBRID_CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "3"))
+    RRF_K = int(os.getenv("RRF_K", "60"))
+    BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+    BM25_B = float(os.getenv("BM25_B", "0.75"))
+    RERANKER_ENABLED = os.getenv("RERANKER_ENABLED", "false").lower() == "true"
+    RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_TIME_BUDGET_MS = int(os.getenv("RERANK_TIME_BUDGET_MS", "300"))
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+    MMR_ENABLED = os.getenv("MMR_ENABLED", "true").lower() == "true"
+    MMR_CANDIDATES = int(os.getenv("MMR_CANDIDATES", "20"))
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+    CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "false").lower() == "true"
+    COMPRESSION_SENTENCES = int(os.getenv("COMPRESSION_SENTENCES", "4"))
+    COMPRESSION_NEIGHBORS = int(os.getenv("COMPRESSION_NEIGHBORS", "1"))
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+    SEMANTIC_CACHE_MAX_DISTANCE = float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.05"))
+    
+    # Response Cache
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", str(DATA_DIR / "response_cache.sqlite3"))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
     
     # UI Configuration
     APP_TITLE = os.getenv("APP_TITLE", "Vavuniya University AI Assistant")
@@ -3,16 +3,15 @@ API Manager for LLM providers
 Handles Groq (primary) and OpenAI (fallback)
 """
 
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator
 from pathlib import Path
 import sys
-from groq import Groq
-from openai import OpenAI
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
 
 logger = setup_logger("api_manager")
 
@@ -28,6 +27,7 @@ class LLMAPIManager:
         self.groq_client = None
         if Config.GROQ_API_KEY:
             try:
+                from groq import Groq
                 self.groq_client = Groq(api_key=Config.GROQ_API_KEY)
                 logger.info("✅ Groq client initialized")
             except Exception as e:
@@ -37,6 +37,7 @@ class LLMAPIManager:
         self.openai_client = None
         if Config.OPENAI_API_KEY:
             try:
+                from openai import OpenAI
                 self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
                 logger.info("✅ OpenAI client initialized")
             except Exception as e:
@@ -53,19 +54,21 @@ class LLMAPIManager:
         }
     
     def generate_response(self, messages: list, temperature: float = 0.7,
-                         max_tokens: int = 1000, use_fallback: bool = True) -> Dict:
+                         max_tokens: int = None, use_fallback: bool = True) -> Dict:
         """
         Generate response using primary (Groq) or fallback (OpenAI)
         
         Args:
             messages: List of message dictionaries
             temperature: Sampling temperature
-            max_tokens: Maximum tokens to generate
+            max_tokens: Maximum tokens to generate (default from config)
             use_fallback: Whether to use fallback on error
         
         Returns:
             Dictionary with response and metadata
         """
+        max_tokens = max_tokens or Config.LLM_MAX_TOKENS
+        
         # Try Groq first
         if self.groq_client:
             try:
@@ -134,20 +137,121 @@ class LLMAPIManager:
             }
         }
     
+    def generate_stream(self, messages: list, temperature: float = 0.7,
+                        max_tokens: int = None, use_fallback: bool = True) -> Iterator[Dict]:
+        """
+        Stream a response from primary (Groq) or fallback (OpenAI)
+        
+        Falls back to OpenAI only if Groq fails before producing its first
+        token; a failure after that is raised to the caller.
+        
+        Args:
+            messages: List of message dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate (default from config)
+            use_fallback: Whether to use fallback on error
+        
+        Yields:
+            {'type': 'delta', 'content': str} for each text delta, then one
+            {'type': 'done', 'model', 'provider', 'usage'}
+        """
+        max_tokens = max_tokens or Config.LLM_MAX_TOKENS
+        
+        providers = []
+        if self.groq_client:
+            providers.append(('groq', self.groq_client, Config.GROQ_MODEL, {}))
+        if self.openai_client:
+            providers.append((
+                'openai', self.openai_client, Config.OPENAI_MODEL,
+                {'stream_options': {'include_usage': True}}
+            ))
+        
+        for position, (provider, client, model, extra) in enumerate(providers):
+            is_last = position == len(providers) - 1
+            started_answer = False
+            usage = {}
+            
+            try:
+                logger.info(f"Streaming from {provider} API...")
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **extra
+                )
+                
+                for chunk in stream:
+                    chunk_usage = self._get_chunk_usage(chunk)
+                    if chunk_usage:
+                        usage = chunk_usage
+                    
+                    if not chunk.choices:
+                        continue
+                    
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    
+                    started_answer = True
+                    yield {'type': 'delta', 'content': delta}
+                
+                self.stats[f'{provider}_calls'] += 1
+                
+                yield {
+                    'type': 'done',
+                    'model': model,
+                    'provider': provider,
+                    'usage': usage
+                }
+                return
+                
+            except Exception as e:
+                self.stats[f'{provider}_errors'] += 1
+                
+                if started_answer or not use_fallback or is_last:
+                    logger.error(f"{provider} streaming error: {e}")
+                    raise
+                
+                logger.warning(f"{provider} streaming error before first token, falling back: {e}")
+        
+        raise RuntimeError("No LLM API available")
+    
+    @staticmethod
+    def _get_chunk_usage(chunk) -> Dict:
+        """Token usage from a stream chunk (OpenAI: chunk.usage, Groq: chunk.x_groq.usage)"""
+        usage = getattr(chunk, 'usage', None)
+        if usage is None:
+            usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+        
+        if usage is None:
+            return {}
+        
+        return {
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'total_tokens': usage.total_tokens
+        }
+    
+    def get_primary_model(self) -> str:
+        """Model that will answer when no fallback is needed"""
+        return Config.GROQ_MODEL if self.groq_client else Config.OPENAI_MODEL
+    
+    def get_prompt_token_budget(self) -> int:
+        """
+        Token budget of the primary model for one request (prompt and answer)
+        
+        Prompts are sized for the model expected to answer; the OpenAI
+        fallback normally has the larger budget, so they fit there too.
+        """
+        return Config.GROQ_PROMPT_TOKENS if self.groq_client else Config.OPENAI_PROMPT_TOKENS
+    
     def get_stats(self) -> Dict:
         """Get API usage statistics"""
         return self.stats.copy()
 
 
-# Singleton instance
-_api_manager = None
-
-
 def get_api_manager() -> LLMAPIManager:
-    """Get or create API manager singleton"""
-    global _api_manager
-    
-    if _api_manager is None:
-        _api_manager = LLMAPIManager()
-    
-    return _api_manager
+    """Get or create API manager singleton (shared, thread-safe)"""
+    return get_registry().get("api_manager", LLMAPIManager)
@@ -0,0 +1,103 @@
+"""
+Token Counting
+Prompt token estimates shared by context packing and reporting
+"""
+
+from typing import Optional
+from pathlib import Path
+import sys
+import threading
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.logger import setup_logger
+from src.utils.text import split_sentences
+
+logger = setup_logger("tokens")
+
+# BPE used by current OpenAI chat models; close enough for Llama on Groq
+TOKEN_ENCODING = "cl100k_base"
+
+# Fallback when tiktoken (or its encoding file) is unavailable
+CHARS_PER_TOKEN = 4
+
+# Share of a token budget to fill when counts are only estimated; the
+# length estimate undercounts digits, codes and non-English text
+ESTIMATE_SAFETY_FACTOR = 0.85
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding() -> Optional[object]:
+    """tiktoken encoding, loaded once (None if unavailable)"""
+    global _encoding, _encoding_loaded
+
+    if _encoding_loaded:
+        return _encoding
+
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                # Imported here so importing this module stays cheap
+                import tiktoken
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+                _encoding = None
+            _encoding_loaded = True
+
+    return _encoding
+
+
+def token_counts_are_exact() -> bool:
+    """Whether count_tokens() uses tiktoken rather than the length estimate"""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens in a text
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Exact count with tiktoken, otherwise a length-based estimate
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to fit a token budget, ending on a sentence boundary
+
+    Args:
+        text: Text to cut
+        max_tokens: Token budget
+
+    Returns:
+        The longest run of leading sentences that fits (possibly empty)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        # +1 for the space that joins sentences back together
+        cost = count_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+
+    return " ".join(kept)
@@ -0,0 +1,210 @@
+"""
+BM25 Index
+Compact inverted index for exact-term (sparse) retrieval over the knowledge-base chunks
+"""
+
+from typing import List, Dict, Optional, Any, Tuple
+from collections import Counter
+from pathlib import Path
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("bm25_index")
+
+# Metadata fields stored per chunk so sparse search honours the same filters
+FILTER_COLUMNS = ('faculty', 'source_type')
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its
+me my of on or our the their there this to was we what when where which who
+why will with you your about tell
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords (keeps codes like DICT or IT1234)"""
+    return [token for token in TOKEN_PATTERN.findall(text.casefold()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the same chunk IDs as the vector index
+
+    Postings are stored in CSR form (one offset per term into flat row
+    and term-frequency arrays), so the whole index is a handful of NumPy
+    arrays in a single .npz file. Only IDs and filter columns are kept;
+    chunk text and metadata come from the vector store.
+    """
+
+    def __init__(self, ids: List[str], vocabulary: Dict[str, int], offsets: np.ndarray,
+                 rows: np.ndarray, term_freqs: np.ndarray, doc_lengths: np.ndarray,
+                 columns: Dict[str, np.ndarray], k1: float = None, b: float = None):
+        """
+        Initialize index from its arrays (use build() or load())
+
+        Args:
+            ids: Chunk ID per row
+            vocabulary: Term -> term ID
+            offsets: Start of each term's postings (len(vocabulary) + 1)
+            rows: Posting rows, grouped by term
+            term_freqs: Term frequency per posting
+            doc_lengths: Token count per row
+            columns: Filter column values per row
+            k1: Term-frequency saturation (default from config)
+            b: Length normalization (default from config)
+        """
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.rows = rows
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.columns = columns
+        self.k1 = k1 if k1 is not None else Config.BM25_K1
+        self.b = b if b is not None else Config.BM25_B
+
+        num_docs = len(ids)
+        doc_freqs = np.diff(offsets)
+        self.idf = np.log(1.0 + (num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+
+        avg_length = float(doc_lengths.mean()) if num_docs else 1.0
+        self._length_norm = (
+            self.k1 * (1.0 - self.b + self.b * doc_lengths / max(avg_length, 1e-9))
+        ).astype(np.float32)
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str], metadatas: List[Dict]) -> "BM25Index":
+        """
+        Build an index over chunk texts
+
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            metadatas: Chunk metadata (for filter columns)
+
+        Returns:
+            BM25Index
+        """
+        vocabulary = {}
+        term_ids, posting_rows, posting_tfs = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                posting_rows.append(row)
+                posting_tfs.append(count)
+
+        term_ids = np.array(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind='stable')
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)))
+
+        columns = {
+            name: np.array([m.get(name, '') for m in metadatas], dtype=str)
+            for name in FILTER_COLUMNS
+        }
+
+        return cls(
+            list(ids),
+            vocabulary,
+            offsets,
+            np.array(posting_rows, dtype=np.int32)[order],
+            np.array(posting_tfs, dtype=np.uint16)[order],
+            doc_lengths,
+            columns
+        )
+
+    def save(self, path: str):
+        """Write the index atomically to a single .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                ids=np.array(self.ids, dtype=str),
+                terms=np.array(terms, dtype=str),
+                offsets=self.offsets,
+                rows=self.rows,
+                term_freqs=self.term_freqs,
+                doc_lengths=self.doc_lengths,
+                **{f"column_{name}": values for name, values in self.columns.items()}
+            )
+        os.replace(tmp_path, path)
+
+        logger.info(f"✅ BM25 index saved: {len(self.ids)} chunks, {len(terms)} terms")
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Load an index written by save()"""
+        with np.load(path) as data:
+            terms = data['terms'].tolist()
+            return cls(
+                data['ids'].tolist(),
+                {term: i for i, term in enumerate(terms)},
+                data['offsets'],
+                data['rows'],
+                data['term_freqs'],
+                data['doc_lengths'],
+                {name: data[f"column_{name}"] for name in FILTER_COLUMNS}
+            )
+
+    def query_terms(self, query: str) -> List[str]:
+        """Distinct query tokens present in the vocabulary; only these affect search()"""
+        return sorted(term for term in set(tokenize(query)) if term in self.vocabulary)
+
+    def search(self, query: str, top_k: int,
+               filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 score
+
+        Args:
+            query: Search query
+            top_k: Number of results
+            filters: Equality filters on faculty / source_type
+
+        Returns:
+            (chunk ID, score) pairs, best first; chunks without any query term are skipped
+        """
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+
+        for term in self.query_terms(query):
+            term_id = self.vocabulary[term]
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            rows = self.rows[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            scores[rows] += self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + self._length_norm[rows])
+
+        for key, value in (filters or {}).items():
+            if key in self.columns:
+                scores[self.columns[key] != str(value)] = 0.0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+
+        top_k = min(top_k, len(matched))
+        best = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        best = best[np.argsort(-scores[best])]
+
+        return [(self.ids[row], float(scores[row])) for row in best]
+
+
+def get_bm25_index_path(collection_name: str = "university_docs") -> Path:
+    """Location of the BM25 index for a collection"""
+    return Path(Config.BM25_INDEX_DIR) / f"{collection_name}.npz"
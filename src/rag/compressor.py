@@ -0,0 +1,120 @@
+"""
+Context Compressor
+Query-focused extractive compression of retrieved context blocks
+"""
+
+from typing import List, Dict
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.utils.text import split_sentences
+
+logger = setup_logger("compressor")
+
+# Marks text dropped before, between or after kept sentences
+GAP_MARKER = " … "
+
+
+class ContextCompressor:
+    """
+    Keep the sentences of each block that are closest to the query
+
+    Every sentence of every block is embedded in one batch with the
+    retriever's (already loaded) embedding model. Per block, the top
+    sentences by cosine similarity are kept together with their
+    neighbours, in original order, so the extract still reads coherently.
+    """
+
+    def __init__(self, embedding_generator, sentences_per_block: int = None,
+                 neighbors: int = None):
+        """
+        Initialize compressor
+
+        Args:
+            embedding_generator: EmbeddingGenerator producing normalized embeddings
+            sentences_per_block: Best-matching sentences kept per block (default from config)
+            neighbors: Sentences kept on each side of a match (default from config)
+        """
+        self.embedding_generator = embedding_generator
+        self.sentences_per_block = (
+            sentences_per_block if sentences_per_block is not None else Config.COMPRESSION_SENTENCES
+        )
+        self.neighbors = neighbors if neighbors is not None else Config.COMPRESSION_NEIGHBORS
+
+    def _kept_indices(self, similarities: np.ndarray) -> List[int]:
+        """Indices of the best sentences and their neighbours, in order"""
+        best = np.argsort(-similarities)[:self.sentences_per_block]
+
+        kept = set()
+        for index in best:
+            start = max(0, index - self.neighbors)
+            end = min(len(similarities), index + self.neighbors + 1)
+            kept.update(range(start, end))
+
+        return sorted(kept)
+
+    def compress(self, query_embedding: np.ndarray, blocks: List[Dict]) -> List[Dict]:
+        """
+        Shorten blocks to their query-relevant sentences
+
+        Args:
+            query_embedding: Normalized query embedding
+            blocks: Context blocks with 'content'
+
+        Returns:
+            Blocks with compressed 'content' (others unchanged)
+        """
+        start = time.perf_counter()
+        sentences = [split_sentences(block['content']) for block in blocks]
+        flat = [sentence for block_sentences in sentences for sentence in block_sentences]
+
+        # Blocks no longer than the best-sentence count are always kept whole
+        if all(len(s) <= self.sentences_per_block for s in sentences):
+            return blocks
+
+        embeddings = self.embedding_generator.generate_embeddings(
+            flat, show_progress=False, use_cache=False
+        )
+        similarities = embeddings @ np.asarray(query_embedding, dtype=np.float32)
+
+        compressed = []
+        offset = 0
+        for block, block_sentences in zip(blocks, sentences):
+            block_similarities = similarities[offset:offset + len(block_sentences)]
+            offset += len(block_sentences)
+
+            # Neighbour windows overlap, so only the kept set shows whether anything is dropped
+            kept = self._kept_indices(block_similarities)
+            if len(kept) == len(block_sentences):
+                compressed.append(block)
+                continue
+
+            parts = []
+            if kept[0] > 0:
+                parts.append(GAP_MARKER.lstrip())
+            for position, index in enumerate(kept):
+                if position > 0:
+                    parts.append(" " if index == kept[position - 1] + 1 else GAP_MARKER)
+                parts.append(block_sentences[index])
+            if kept[-1] < len(block_sentences) - 1:
+                parts.append(GAP_MARKER.rstrip())
+
+            compressed.append({**block, 'content': "".join(parts)})
+
+        original_chars = sum(len(block['content']) for block in blocks)
+        compressed_chars = sum(len(block['content']) for block in compressed)
+        ratio = compressed_chars / original_chars if original_chars else 1.0
+        logger.info(
+            f"Compressed context {original_chars} -> {compressed_chars} chars "
+            f"(ratio {ratio:.2f}, {len(flat)} sentences embedded) "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+        return compressed
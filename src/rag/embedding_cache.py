@@ -0,0 +1,232 @@
+"""
+Embedding Cache
+Persistent, content-addressed store of document embeddings
+"""
+
+from typing import List, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import re
+import sys
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("embedding_cache")
+
+
+# Set in index.meta.json; bump when the on-disk layout changes
+INDEX_FORMAT = 2
+
+# Hex length of a make_key() hash
+KEY_LENGTH = 64
+
+
+@contextmanager
+def _locked_file(path: Path):
+    """Exclusive inter-process lock held for the duration of the block"""
+    with open(path, 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by a hash of (model name, text)
+
+    Vectors are appended to a raw float32 file that is read back as a
+    memory-mapped matrix; an append-only index log maps each content hash
+    to its row. Appends take an exclusive file lock, so several processes
+    (build, pool workers, serving replicas) can share one cache directory,
+    and each process picks up the others' entries by reading the log tail.
+    """
+
+    def __init__(self, model_name: str, embedding_dim: int, cache_dir: str = None):
+        """
+        Initialize embedding cache
+
+        Args:
+            model_name: Embedding model name (part of every key)
+            embedding_dim: Embedding dimension
+            cache_dir: Cache root directory (default from config)
+        """
+        self.model_name = model_name
+        self.embedding_dim = embedding_dim
+
+        safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+        self.cache_dir = Path(cache_dir or Config.EMBEDDING_CACHE_PATH) / safe_name
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        self.index_path = self.cache_dir / "index.log"
+        self.meta_path = self.cache_dir / "index.meta.json"
+        self.lock_path = self.cache_dir / ".lock"
+
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._rows = {}
+        self._index_offset = 0
+
+        self._load()
+
+    def _load(self):
+        """Check the cache belongs to this model and read the index log"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        with _locked_file(self.lock_path):
+            meta = None
+            if self.meta_path.exists():
+                try:
+                    with open(self.meta_path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Embedding cache metadata unreadable, starting empty: {e}")
+
+            expected = {'format': INDEX_FORMAT, 'model': self.model_name, 'dim': self.embedding_dim}
+            if meta != expected:
+                if meta is not None or self.vectors_path.exists():
+                    logger.warning("Embedding cache belongs to a different model or format, starting empty")
+                self._reset()
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(expected, f)
+
+            self._read_index_tail()
+
+        logger.info(f"Embedding cache loaded: {len(self._rows)} vectors")
+
+    def _reset(self):
+        """Remove all cached vectors (caller holds the file lock)"""
+        self._rows = {}
+        self._vectors = None
+        self._index_offset = 0
+        for path in (self.vectors_path, self.index_path, self.cache_dir / "index.json"):
+            if path.exists():
+                path.unlink()
+
+    def _read_index_tail(self):
+        """Add index entries appended since the last read (by any process)"""
+        if not self.index_path.exists() or self.index_path.stat().st_size <= self._index_offset:
+            return
+
+        num_rows = self._num_stored_rows()
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            data = f.read()
+
+        # Only consume complete lines; a torn final line is re-read later
+        complete = data[:data.rfind(b"\n") + 1]
+        self._index_offset += len(complete)
+
+        for line in complete.decode('ascii', errors='replace').splitlines():
+            parts = line.split()
+            if (len(parts) == 2 and len(parts[0]) == KEY_LENGTH and parts[1].isdigit()
+                    and int(parts[1]) < num_rows):
+                self._rows[parts[0]] = int(parts[1])
+
+    def _num_stored_rows(self) -> int:
+        """Number of complete vectors in the vectors file"""
+        if not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.embedding_dim * 4)
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-mapped view of all stored vectors"""
+        if self._vectors is None or len(self._vectors) < self._num_stored_rows():
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode='r',
+                shape=(self._num_stored_rows(), self.embedding_dim)
+            )
+        return self._vectors
+
+    def make_key(self, text: str) -> str:
+        """Content hash for a text under this cache's model"""
+        payload = f"{self.model_name}\x00{text}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings
+
+        Args:
+            keys: Content hashes from make_key
+
+        Returns:
+            List aligned with keys: embedding or None when not cached
+        """
+        with self._lock:
+            if any(k not in self._rows for k in keys):
+                self._read_index_tail()
+
+            positions = [i for i, k in enumerate(keys) if k in self._rows]
+            results = [None] * len(keys)
+
+            if positions:
+                rows = [self._rows[keys[i]] for i in positions]
+                vectors = np.array(self._matrix()[rows])
+                for i, vector in zip(positions, vectors):
+                    results[i] = vector
+
+            return results
+
+    def add_many(self, keys: List[str], embeddings: np.ndarray):
+        """
+        Append new embeddings and their index entries
+
+        Args:
+            keys: Content hashes from make_key
+            embeddings: Array of shape (len(keys), embedding_dim)
+        """
+        with self._lock, _locked_file(self.lock_path):
+            # Another process may have appended since our last look
+            self._read_index_tail()
+
+            new_keys = []
+            new_vectors = []
+            seen = set()
+            for key, vector in zip(keys, embeddings):
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_vectors.append(vector)
+
+            if not new_keys:
+                return
+
+            start_row = self._num_stored_rows()
+            data = np.asarray(new_vectors, dtype=np.float32)
+
+            # Vectors first, index second: a crash in between only leaves
+            # unreferenced rows behind. A crash mid-vector leaves a partial
+            # row, which is cut off so the append lands at start_row.
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(start_row * self.embedding_dim * 4)
+                f.write(data.tobytes())
+
+            lines = "".join(f"{key} {start_row + offset}\n" for offset, key in enumerate(new_keys))
+            if self.index_path.exists() and self.index_path.stat().st_size > self._index_offset:
+                # Terminate a line torn by an earlier crash
+                lines = "\n" + lines
+            with open(self.index_path, 'ab') as f:
+                f.write(lines.encode('ascii'))
+
+            self._read_index_tail()
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -1,47 +1,145 @@
 """
 Embedding Generator
-Generates embeddings using sentence-transformers
+Generates embeddings using sentence-transformers or an exported ONNX graph
 """
 
-from typing import List, Union
-from sentence_transformers import SentenceTransformer
+from typing import Dict, List, Union
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+import multiprocessing
 import numpy as np
 from pathlib import Path
+import math
 import sys
+import threading
+from tqdm import tqdm
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
+from src.utils.text import normalize_text
+from src.rag.embedding_cache import EmbeddingCache
 
 logger = setup_logger("embeddings")
 
+# Smallest shard worth sending to a pool worker
+MIN_SHARD_SIZE = 8
+
 
 class EmbeddingGenerator:
-    """Generate embeddings for text using sentence-transformers"""
+    """
+    Generate embeddings for text using sentence-transformers or ONNX Runtime
+    
+    Embeddings are L2-normalized at encode time, so vector stores can rank
+    by a plain dot product (cosine similarity) without re-normalizing.
+    """
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, use_cache: bool = None,
+                 query_cache_size: int = None, backend: str = None,
+                 num_threads: int = None):
         """
         Initialize embedding generator
         
         Args:
             model_name: Model name (default from config)
+            use_cache: Use the on-disk embedding cache (default from config)
+            query_cache_size: Max entries in the query LRU cache (default from config)
+            backend: 'torch' or 'onnx' (default from config)
+            num_threads: Limit intra-op CPU threads (default: library default)
         """
         self.model_name = model_name or Config.EMBEDDING_MODEL
-        logger.info(f"Loading embedding model: {self.model_name}")
+        self.backend = backend or Config.EMBEDDING_BACKEND
+        self.num_threads = num_threads
+        # sentence-transformers already sorts each encode() call by length;
+        # only the ONNX encoder batches in input order
+        self.length_bucketing = Config.EMBEDDING_LENGTH_BUCKETING and self.backend == "onnx"
+        logger.info(f"Loading embedding model: {self.model_name} ({self.backend} backend)")
         
         try:
-            self.model = SentenceTransformer(self.model_name)
+            self.model = self._load_model()
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
             logger.info(f"✅ Model loaded. Embedding dimension: {self.embedding_dim}")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
+        
+        # On-disk cache for document embeddings
+        if use_cache is None:
+            use_cache = Config.EMBEDDING_CACHE_ENABLED
+        
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = EmbeddingCache(self.cache_model_id, self.embedding_dim)
+            except Exception as e:
+                logger.warning(f"Embedding cache unavailable: {e}")
+        
+        # In-memory LRU cache for single-text (query) embeddings
+        self.query_cache_size = (
+            query_cache_size if query_cache_size is not None else Config.QUERY_CACHE_SIZE
+        )
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_stats = {
+            'hits': 0,
+            'misses': 0
+        }
+        
+        # Multi-process pool (created lazily once enabled)
+        self._pool = None
+        self._pool_processes = 0
+    
+    def _load_model(self):
+        """Load the encoder for the configured backend"""
+        if self.backend == "torch":
+            from sentence_transformers import SentenceTransformer
+            if self.num_threads:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            return SentenceTransformer(self.model_name)
+        
+        if self.backend == "onnx":
+            from src.rag.onnx_encoder import OnnxEncoder
+            encoder = OnnxEncoder(
+                Config.ONNX_MODEL_PATH,
+                quantized=Config.ONNX_QUANTIZED,
+                num_threads=self.num_threads or 0
+            )
+            exported_model = encoder.config.get('model_name')
+            if exported_model != self.model_name:
+                raise ValueError(
+                    f"ONNX export is for '{exported_model}', expected '{self.model_name}'"
+                )
+            return encoder
+        
+        raise ValueError(f"Unknown embedding backend: {self.backend}")
+    
+    @property
+    def cache_model_id(self) -> str:
+        """
+        Model identifier for cache keys and snapshots
+        
+        Covers everything that changes the stored vectors: ONNX output
+        differs slightly from torch, and vectors cached before encode-time
+        normalization must not be mixed with normalized ones.
+        """
+        model_id = self.model_name
+        if self.backend == "onnx":
+            model_id += f"-onnx{'-int8' if Config.ONNX_QUANTIZED else ''}"
+        return f"{model_id}-norm"
     
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
         
+        Results are kept in a bounded LRU cache keyed on the normalized
+        text (whitespace collapsed, case folded), so repeated queries
+        skip the model.
+        
         Args:
             text: Input text
         
@@ -51,22 +149,55 @@ class EmbeddingGenerator:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
         
+        key = normalize_text(text)
+        
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(key)
+            if embedding is not None:
+                self._query_cache.move_to_end(key)
+                self.query_cache_stats['hits'] += 1
+                return embedding.copy()
+            self.query_cache_stats['misses'] += 1
+        
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            return embedding
+            # The normalized text is only the cache key; the model sees the original
+            embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
+        
+        if self.query_cache_size > 0:
+            with self._query_cache_lock:
+                self._query_cache[key] = embedding
+                self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        
+        return embedding.copy()
+    
+    def get_query_cache_stats(self) -> Dict:
+        """Get query cache hit/miss statistics"""
+        with self._query_cache_lock:
+            stats = self.query_cache_stats.copy()
+            stats['size'] = len(self._query_cache)
+        
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
     
     def generate_embeddings(self, texts: List[str], batch_size: int = 32, 
-                          show_progress: bool = True) -> np.ndarray:
+                          show_progress: bool = True,
+                          use_cache: bool = True) -> np.ndarray:
         """
         Generate embeddings for multiple texts
         
+        Texts already present in the embedding cache are not re-encoded.
+        
         Args:
             texts: List of input texts
             batch_size: Batch size for processing
             show_progress: Show progress bar
+            use_cache: Read from and write to the embedding cache
         
         Returns:
             Array of embeddings
@@ -77,34 +208,185 @@ class EmbeddingGenerator:
         try:
             logger.info(f"Generating embeddings for {len(texts)} texts...")
             
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                show_progress_bar=show_progress,
-                convert_to_numpy=True
-            )
+            if not (use_cache and self.cache is not None):
+                embeddings = self._encode(texts, batch_size, show_progress)
+                logger.info(f"✅ Generated {len(embeddings)} embeddings")
+                return embeddings
             
-            logger.info(f"✅ Generated {len(embeddings)} embeddings")
+            keys = [self.cache.make_key(text) for text in texts]
+            cached = self.cache.get_many(keys)
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+            
+            embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+            for i, vector in enumerate(cached):
+                if vector is not None:
+                    embeddings[i] = vector
+            
+            if missing:
+                new_embeddings = self._encode(
+                    [texts[i] for i in missing],
+                    batch_size,
+                    show_progress
+                )
+                embeddings[missing] = new_embeddings
+                self.cache.add_many([keys[i] for i in missing], new_embeddings)
+            
+            logger.info(
+                f"✅ Generated {len(embeddings)} embeddings "
+                f"({len(texts) - len(missing)} cached, {len(missing)} encoded)"
+            )
             return embeddings
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise
     
+    def _encode(self, texts: List[str], batch_size: int,
+                show_progress: bool) -> np.ndarray:
+        """
+        Run the model over texts
+        
+        With length bucketing enabled (ONNX backend), texts are sorted by
+        token count so each batch pads only to similar lengths, then results
+        are put back in input order. Large inputs are sharded across the
+        pool when enabled.
+        """
+        order = None
+        if self.length_bucketing and len(texts) > batch_size:
+            order = np.argsort(self._token_lengths(texts), kind='stable')
+            texts = [texts[i] for i in order]
+        
+        if self._pool_processes > 1 and len(texts) >= 2 * MIN_SHARD_SIZE:
+            embeddings = self._encode_multi_process(texts, batch_size)
+        elif order is not None:
+            embeddings = np.concatenate([
+                self.model.encode(
+                    texts[start:start + batch_size],
+                    batch_size=batch_size,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                for start in tqdm(
+                    range(0, len(texts), batch_size),
+                    desc="Encoding batches",
+                    disable=not show_progress
+                )
+            ], axis=0)
+        else:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        
+        if order is None:
+            return embeddings
+        
+        restored = np.empty_like(embeddings)
+        restored[order] = embeddings
+        return restored
+    
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count of each text after truncation, including special tokens"""
+        if hasattr(self.model, 'token_lengths'):
+            return self.model.token_lengths(texts)
+        
+        encoded = self.model.tokenizer(
+            texts,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=self.model.max_seq_length
+        )
+        return np.array([len(ids) for ids in encoded['input_ids']])
+    
+    def _encode_multi_process(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode contiguous shards in worker processes, preserving input order"""
+        if self._pool is None:
+            logger.info(f"Starting embedding pool with {self._pool_processes} processes")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._pool_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_worker,
+                initargs=(self.model_name, self.backend)
+            )
+        
+        num_shards = min(self._pool_processes, len(texts) // MIN_SHARD_SIZE)
+        shard_size = math.ceil(len(texts) / num_shards)
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        
+        # map() yields results in submission order
+        results = self._pool.map(_encode_shard, shards, repeat(batch_size))
+        return np.concatenate(list(results), axis=0)
+    
+    def start_pool(self, processes: int = None):
+        """
+        Enable multi-process encoding for generate_embeddings
+        
+        Worker processes are spawned on the first call that needs them,
+        so fully cached builds never pay the startup cost.
+        
+        Args:
+            processes: Number of worker processes (default from config)
+        """
+        self._pool_processes = processes or Config.EMBEDDING_WORKERS
+    
+    def stop_pool(self):
+        """Shut down worker processes and return to in-process encoding"""
+        self._pool_processes = 0
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Embedding pool stopped")
+    
+    @contextmanager
+    def multi_process_pool(self, processes: int = None):
+        """
+        Context manager that enables the worker pool and always tears it down
+        
+        Args:
+            processes: Number of worker processes (default from config)
+        """
+        self.start_pool(processes)
+        try:
+            yield self
+        finally:
+            self.stop_pool()
+    
     def get_embedding_dim(self) -> int:
         """Get embedding dimension"""
         return self.embedding_dim
 
 
-# Singleton instance
-_embedding_generator = None
+# Worker-process state for the multi-process pool
+_worker_generator = None
+
+
+def _init_pool_worker(model_name: str, backend: str):
+    """Load one single-threaded model per worker process"""
+    global _worker_generator
+    _worker_generator = EmbeddingGenerator(
+        model_name=model_name,
+        use_cache=False,
+        query_cache_size=0,
+        backend=backend,
+        num_threads=1
+    )
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode one shard inside a worker process"""
+    return _worker_generator.model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
 
 
 def get_embedding_generator() -> EmbeddingGenerator:
-    """Get or create embedding generator singleton"""
-    global _embedding_generator
-    
-    if _embedding_generator is None:
-        _embedding_generator = EmbeddingGenerator()
-    
-    return _embedding_generator
+    """Get or create embedding generator singleton (shared, thread-safe)"""
+    return get_registry().get("embedding_generator", EmbeddingGenerator)
@@ -3,17 +3,22 @@ Response Generator
 Combines retrieval and LLM to generate responses
 """
 
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 import sys
+import threading
+import time
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
 from src.rag.retriever import get_retriever
+from src.rag.response_cache import ResponseCache
 from src.llm.api_manager import get_api_manager
 from src.llm.prompts import get_system_prompt, format_query_prompt
+from src.llm.tokens import count_tokens, token_counts_are_exact, ESTIMATE_SAFETY_FACTOR
 
 logger = setup_logger("generator")
 
@@ -26,9 +31,127 @@ class ResponseGenerator:
         self.retriever = get_retriever()
         self.api_manager = get_api_manager()
         self.system_prompt = get_system_prompt()
+        self._first_query_done = False
+        
+        # Cross-process response cache
+        self.response_cache = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            try:
+                self.response_cache = ResponseCache()
+            except Exception as e:
+                logger.warning(f"Response cache unavailable: {e}")
         
         logger.info("Response generator initialized")
     
+    def _context_token_budget(self, query: str) -> int:
+        """
+        Tokens left for context in the model's budget
+        
+        The answer (LLM_MAX_TOKENS), system prompt and template are taken
+        off first. When token counts are only estimated, the prompt is
+        kept to a safety share of what is left.
+        """
+        available = self.api_manager.get_prompt_token_budget() - Config.LLM_MAX_TOKENS
+        if not token_counts_are_exact():
+            available = int(available * ESTIMATE_SAFETY_FACTOR)
+        
+        overhead = count_tokens(self.system_prompt) + count_tokens(format_query_prompt(query, ""))
+        return max(0, available - overhead)
+    
+    def _prepare_messages(self, query: str, faculty: Optional[str],
+                          top_k: int) -> Tuple[List[Dict], List[Dict], int]:
+        """
+        Retrieve context and build the chat messages
+        
+        Returns:
+            Tuple of (messages, sources, context tokens)
+        """
+        # Step 1: Retrieve relevant documents within the model's prompt budget
+        retrieval_result = self.retriever.retrieve_with_context(
+            query=query,
+            faculty=faculty,
+            top_k=top_k,
+            max_tokens=self._context_token_budget(query)
+        )
+        
+        context = retrieval_result['context']
+        sources = retrieval_result['sources']
+        context_tokens = retrieval_result['context_tokens']
+        
+        logger.info(f"Retrieved {len(sources)} sources ({context_tokens} context tokens)")
+        
+        # Step 2: Format prompt
+        user_prompt = format_query_prompt(query, context)
+        
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        return messages, sources, context_tokens
+    
+    def _cache_key(self, query: str, faculty: Optional[str], top_k: int,
+                   temperature: float) -> Optional[str]:
+        """Response cache key, or None when caching is off or unavailable"""
+        if self.response_cache is None:
+            return None
+        
+        try:
+            return self.response_cache.make_key(
+                query=query,
+                faculty=faculty,
+                top_k=top_k or Config.TOP_K_RESULTS,
+                temperature=temperature,
+                model=self.api_manager.get_primary_model()
+            )
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+    
+    def _get_cached(self, cache_key: Optional[str]) -> Optional[Dict]:
+        """Cached response for a key, marked as cached"""
+        if cache_key is None:
+            return None
+        
+        try:
+            response = self.response_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+        
+        if response is not None:
+            response['metadata']['cached'] = True
+            logger.info("✅ Response served from cache")
+        
+        return response
+    
+    def _store_cached(self, cache_key: Optional[str], response: Dict):
+        """
+        Store a response, never failing the request
+        
+        The key names the primary model, so answers from the fallback
+        provider are not stored under it.
+        """
+        if cache_key is None:
+            return
+        
+        model = response['metadata'].get('model')
+        if model != self.api_manager.get_primary_model():
+            logger.info(f"Not caching answer from fallback model {model}")
+            return
+        
+        try:
+            self.response_cache.set(cache_key, response)
+        except Exception as e:
+            logger.warning(f"Could not cache response: {e}")
+    
+    def _log_latency(self, provider: str, elapsed: float):
+        """Log request latency, flagging the first query of the process"""
+        logger.info(f"✅ Response generated using {provider} in {elapsed:.2f}s")
+        if not self._first_query_done:
+            self._first_query_done = True
+            logger.info(f"First query latency: {elapsed:.2f}s")
+    
     def generate(self, query: str, faculty: Optional[str] = None,
                 top_k: int = None, temperature: float = 0.7) -> Dict:
         """
@@ -44,33 +167,21 @@ class ResponseGenerator:
             Dictionary with response and metadata
         """
         logger.info(f"Generating response for: '{query}'")
+        start_time = time.perf_counter()
+        
+        cache_key = self._cache_key(query, faculty, top_k, temperature)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            # Step 1: Retrieve relevant documents
-            retrieval_result = self.retriever.retrieve_with_context(
-                query=query,
-                faculty=faculty,
-                top_k=top_k
-            )
-            
-            context = retrieval_result['context']
-            sources = retrieval_result['sources']
-            
-            logger.info(f"Retrieved {len(sources)} sources")
-            
-            # Step 2: Format prompt
-            user_prompt = format_query_prompt(query, context)
+            messages, sources, context_tokens = self._prepare_messages(query, faculty, top_k)
             
             # Step 3: Generate response with LLM
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
             llm_response = self.api_manager.generate_response(
                 messages=messages,
                 temperature=temperature,
-                max_tokens=1000
+                max_tokens=Config.LLM_MAX_TOKENS
             )
             
             # Step 4: Format final response
@@ -83,11 +194,16 @@ class ResponseGenerator:
                     'num_sources': len(sources),
                     'model': llm_response['model'],
                     'provider': llm_response['provider'],
-                    'usage': llm_response['usage']
+                    'usage': llm_response['usage'],
+                    'context_tokens': context_tokens
                 }
             }
             
-            logger.info(f"✅ Response generated using {llm_response['provider']}")
+            elapsed = time.perf_counter() - start_time
+            response['metadata']['latency_seconds'] = round(elapsed, 3)
+            self._log_latency(llm_response['provider'], elapsed)
+            
+            self._store_cached(cache_key, response)
             
             return response
             
@@ -95,6 +211,92 @@ class ResponseGenerator:
             logger.error(f"Error generating response: {e}")
             raise
     
+    def generate_stream(self, query: str, faculty: Optional[str] = None,
+                        top_k: int = None, temperature: float = 0.7) -> Iterator[Dict]:
+        """
+        Generate a response for a query, streaming tokens as they arrive
+        
+        Args:
+            query: User query
+            faculty: Filter by faculty
+            top_k: Number of documents to retrieve
+            temperature: LLM temperature
+        
+        Yields:
+            {'type': 'sources', 'sources': [...]} once retrieval is done,
+            {'type': 'delta', 'content': str} for each text delta, and finally
+            {'type': 'done', 'answer': str, 'metadata': {...}}
+        
+        'time_to_first_token' in the metadata is measured from this call,
+        so it includes retrieval and is comparable between cache hits and
+        live answers.
+        """
+        logger.info(f"Streaming response for: '{query}'")
+        start_time = time.perf_counter()
+        
+        cache_key = self._cache_key(query, faculty, top_k, temperature)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            cached['metadata']['time_to_first_token'] = round(time.perf_counter() - start_time, 3)
+            yield {'type': 'sources', 'sources': cached['sources']}
+            yield {'type': 'delta', 'content': cached['answer']}
+            yield {'type': 'done', 'answer': cached['answer'], 'metadata': cached['metadata']}
+            return
+        
+        try:
+            messages, sources, context_tokens = self._prepare_messages(query, faculty, top_k)
+            yield {'type': 'sources', 'sources': sources}
+            
+            # Step 3: Stream response from LLM
+            answer_parts = []
+            time_to_first_token = None
+            for event in self.api_manager.generate_stream(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=Config.LLM_MAX_TOKENS
+            ):
+                if event['type'] == 'delta':
+                    if time_to_first_token is None:
+                        time_to_first_token = time.perf_counter() - start_time
+                        logger.info(f"Time to first token: {time_to_first_token:.2f}s")
+                    answer_parts.append(event['content'])
+                    yield event
+                    continue
+                
+                # Step 4: Final metadata
+                elapsed = time.perf_counter() - start_time
+                metadata = {
+                    'query': query,
+                    'faculty_filter': faculty,
+                    'num_sources': len(sources),
+                    'model': event['model'],
+                    'provider': event['provider'],
+                    'usage': event['usage'],
+                    'context_tokens': context_tokens,
+                    'time_to_first_token': (
+                        round(time_to_first_token, 3) if time_to_first_token is not None else None
+                    ),
+                    'latency_seconds': round(elapsed, 3)
+                }
+                self._log_latency(event['provider'], elapsed)
+                
+                answer = "".join(answer_parts)
+                self._store_cached(cache_key, {
+                    'answer': answer,
+                    'sources': sources,
+                    'metadata': metadata
+                })
+                
+                yield {
+                    'type': 'done',
+                    'answer': answer,
+                    'metadata': metadata
+                }
+                
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            raise
+    
     def format_response_for_display(self, response: Dict) -> str:
         """
         Format response for display in UI
@@ -129,15 +331,96 @@ class ResponseGenerator:
         return formatted
 
 
-# Singleton instance
-_generator = None
+def get_generator() -> ResponseGenerator:
+    """Get or create generator singleton (shared, thread-safe)"""
+    return get_registry().get("generator", ResponseGenerator)
+
 
+# Background warm-up state
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+_warm_up_timings = {}
+_warm_up_error = None
 
-def get_generator() -> ResponseGenerator:
-    """Get or create generator singleton"""
-    global _generator
+WARM_UP_QUERY = "University of Vavuniya"
+
+
+def warm_up() -> Dict:
+    """
+    Load the embedding model, open the collection and run one dummy query
+    
+    Returns:
+        Dictionary of timings in seconds
+    """
+    start = time.perf_counter()
+    
+    generator = get_generator()
+    init_done = time.perf_counter()
+    
+    generator.retriever.retrieve(WARM_UP_QUERY, top_k=1)
+    query_done = time.perf_counter()
+    
+    timings = {
+        'init_seconds': round(init_done - start, 3),
+        'dummy_query_seconds': round(query_done - init_done, 3),
+        'total_seconds': round(query_done - start, 3)
+    }
+    logger.info(
+        f"✅ Warm-up complete in {timings['total_seconds']:.2f}s "
+        f"(init {timings['init_seconds']:.2f}s, "
+        f"dummy query {timings['dummy_query_seconds']:.2f}s)"
+    )
+    return timings
+
+
+def _run_warm_up():
+    """Thread target: warm up and record timings or the failure"""
+    global _warm_up_error
+    
+    try:
+        _warm_up_timings.update(warm_up())
+    except Exception as e:
+        _warm_up_error = e
+        logger.error(f"Warm-up failed: {e}")
+
+
+def start_background_warm_up() -> threading.Thread:
+    """Start warm-up in a daemon thread (only once per process)"""
+    global _warm_up_thread
+    
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_run_warm_up,
+                name="rag-warm-up",
+                daemon=True
+            )
+            _warm_up_thread.start()
+    
+    return _warm_up_thread
+
+
+def get_warm_up_timings() -> Dict:
+    """Get warm-up timings (empty until warm-up succeeds)"""
+    return _warm_up_timings.copy()
+
+
+def get_warm_up_error() -> Optional[Exception]:
+    """Exception raised by the background warm-up (None if it succeeded or is running)"""
+    return _warm_up_error
+
+
+def wait_for_generator(timeout: float = None) -> ResponseGenerator:
+    """
+    Get the generator, waiting for background warm-up if it is running
+    
+    Args:
+        timeout: Max seconds to wait for warm-up
     
-    if _generator is None:
-        _generator = ResponseGenerator()
+    Returns:
+        ResponseGenerator (initialized here if warm-up failed or never ran)
+    """
+    if _warm_up_thread is not None:
+        _warm_up_thread.join(timeout)
     
-    return _generator
+    return get_generator()
@@ -0,0 +1,83 @@
+"""
+Knowledge Base Version
+Version stamp written by the builder and read by caches to detect new builds
+"""
+
+from typing import Dict
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import sys
+import threading
+import uuid
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("kb_version")
+
+# Parsed stamp cached by file modification time
+_cache_lock = threading.Lock()
+_cached_mtime = None
+_cached_info = {}
+
+
+def write_kb_version(version: str = None, **details) -> str:
+    """
+    Write a fresh version stamp after a successful build
+
+    Args:
+        version: Version to record (default: a new unique one); snapshot
+            restores pass the version of the build they came from
+        **details: Extra fields to record (e.g. document_count)
+
+    Returns:
+        The new version string
+    """
+    version = version or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    info = {
+        'version': version,
+        'built_at': datetime.now().isoformat(),
+        'embedding_model': Config.EMBEDDING_MODEL,
+        **details
+    }
+
+    path = Path(Config.KB_VERSION_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Knowledge base version: {version}")
+    return version
+
+
+def read_kb_version_info() -> Dict:
+    """Read the current version stamp (empty if no build has written one)"""
+    global _cached_mtime, _cached_info
+
+    path = Path(Config.KB_VERSION_PATH)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+
+    with _cache_lock:
+        if mtime != _cached_mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    _cached_info = json.load(f)
+                _cached_mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read knowledge base version: {e}")
+                return {}
+        return dict(_cached_info)
+
+
+def read_kb_version() -> str:
+    """Current knowledge base version string ('unversioned' before the first stamped build)"""
+    return read_kb_version_info().get('version', 'unversioned')
@@ -0,0 +1,750 @@
+"""
+NumPy Vector Store
+Exact in-process search over a memory-mapped embedding matrix
+"""
+
+from typing import List, Dict, Optional, Any
+from pathlib import Path
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.rag.embeddings import get_embedding_generator
+from src.rag.kb_version import read_kb_version
+from src.rag.vector_store import diff_documents, pipelined_write, DISTANCE_METRIC
+
+logger = setup_logger("numpy_store")
+
+# Metadata fields stored as NumPy columns for vectorized filtering
+FILTER_COLUMNS = ('faculty', 'source_type')
+
+VECTORS_FILE = "vectors.npy"
+COLUMNS_FILE = "columns.npz"
+RECORDS_FILE = "records.json"
+INFO_FILE = "info.json"
+CODES_FILE = "codes_int8.npy"
+SCALES_FILE = "scales_int8.npy"
+INDEX_FILES = (VECTORS_FILE, COLUMNS_FILE, RECORDS_FILE, INFO_FILE, CODES_FILE, SCALES_FILE)
+
+# Names the generation directory holding the live index files
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+# Rows dequantized per step in the int8 first pass (bounds temporary memory)
+QUANT_BLOCK_ROWS = 16384
+
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric per-dimension int8 scalar quantization
+
+    Args:
+        vectors: Float matrix (num_vectors, dim)
+
+    Returns:
+        (codes, scales) with vectors ~= codes * scales
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=0, initial=0.0) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+class NumpyVectorStore:
+    """
+    Vector store backed by a single float32 matrix of unit-length embeddings
+
+    For a corpus of a few thousand chunks one BLAS matrix-vector product is
+    faster than HNSW plus Chroma's SQLite layer and gives exact recall.
+    Files per collection: vectors.npy (memory-mapped on load), columns.npz
+    (IDs and filter columns), records.json (documents and metadata) and
+    info.json (distance metric).
+
+    Every save writes a complete new generation directory and then swaps
+    the CURRENT pointer file, so readers in other processes always load a
+    consistent set of files. The previous generation is kept until the
+    next save so a reader that just resolved it can finish loading.
+
+    With int8 quantization the first pass scans 1-byte codes instead of
+    the float matrix and only the shortlisted rows (top_k times the
+    re-score factor) are re-scored exactly, so the float vectors are paged
+    in on demand rather than held in memory.
+    """
+
+    def __init__(self, collection_name: str = "university_docs", read_only: bool = None,
+                 quantization: str = None):
+        """
+        Initialize vector store
+
+        Args:
+            collection_name: Name of the collection
+            read_only: Serve an existing index and refuse writes
+                (default Config.VECTOR_DB_READ_ONLY)
+            quantization: 'none' or 'int8' first-pass codes
+                (default Config.NUMPY_QUANTIZATION)
+        """
+        self.collection_name = collection_name
+        self.index_dir = Path(Config.NUMPY_INDEX_PATH) / collection_name
+        self.read_only = Config.VECTOR_DB_READ_ONLY if read_only is None else read_only
+        self.quantization = quantization or Config.NUMPY_QUANTIZATION
+        self.rescore_factor = max(1, Config.NUMPY_RESCORE_FACTOR)
+
+        if self.quantization not in ('none', 'int8'):
+            raise ValueError(f"Unknown quantization: {self.quantization}")
+        self._write_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.last_write_timings = {}
+
+        mode = " (read-only)" if self.read_only else ""
+        logger.info(f"Initializing NumPy index at {self.index_dir}{mode}")
+
+        try:
+            if self.read_only and self._current_dir() is None:
+                raise FileNotFoundError(f"No index built at {self.index_dir}")
+            # Read before loading so a build stamped meanwhile triggers another reload
+            self._kb_version = read_kb_version()
+            self._index = self._load()
+            logger.info(f"✅ Collection '{collection_name}' ready")
+            logger.info(f"   Current document count: {len(self._index['ids'])}")
+        except Exception as e:
+            logger.error(f"Error loading NumPy index: {e}")
+            raise
+
+        # Get embedding generator
+        self.embedding_generator = get_embedding_generator()
+
+    def _check_writable(self):
+        """Refuse writes on a read-only store"""
+        if self.read_only:
+            raise RuntimeError(
+                f"Vector store '{self.collection_name}' is read-only (VECTOR_DB_READ_ONLY=true)"
+            )
+
+    def _current_index(self) -> Dict:
+        """
+        The loaded index, reloaded first when a read-only store sees a new build
+
+        Writers swap in their own saves; serving processes only learn about
+        another process's build from the knowledge base version stamp.
+        """
+        if self.read_only and read_kb_version() != self._kb_version:
+            with self._reload_lock:
+                version = read_kb_version()
+                if version != self._kb_version:
+                    logger.info(f"Knowledge base version changed, reloading '{self.collection_name}'")
+                    self._index = self._load()
+                    self._kb_version = version
+        return self._index
+
+    @staticmethod
+    def _empty_index() -> Dict:
+        return {
+            'vectors': None,
+            'ids': [],
+            'id_to_row': {},
+            'documents': [],
+            'metadatas': [],
+            'columns': {name: np.array([], dtype=str) for name in FILTER_COLUMNS},
+            'distance_metric': DISTANCE_METRIC,
+            'codes': None,
+            'scales': None
+        }
+
+    def _current_dir(self) -> Optional[Path]:
+        """
+        Directory holding the live index files (None before the first save)
+
+        Indexes written before generations existed keep their files
+        directly in the collection directory.
+        """
+        pointer = self.index_dir / CURRENT_FILE
+        if pointer.exists():
+            return self.index_dir / pointer.read_text(encoding='utf-8').strip()
+        if (self.index_dir / VECTORS_FILE).exists():
+            return self.index_dir
+        return None
+
+    def _load(self) -> Dict:
+        """Load the index from disk (vectors are memory-mapped read-only)"""
+        try:
+            return self._load_from(self._current_dir())
+        except FileNotFoundError:
+            # A writer replaced and pruned the generation mid-load; resolve again
+            return self._load_from(self._current_dir())
+
+    def _load_from(self, index_dir: Optional[Path]) -> Dict:
+        """Load the index files of one generation"""
+        if index_dir is None:
+            return self._empty_index()
+
+        vectors = np.load(index_dir / VECTORS_FILE, mmap_mode='r')
+
+        with np.load(index_dir / COLUMNS_FILE) as columns_file:
+            ids = columns_file['ids'].tolist()
+            columns = {name: columns_file[name] for name in FILTER_COLUMNS}
+
+        with open(index_dir / RECORDS_FILE, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+        # Indexes written before info.json existed report squared L2
+        info_path = index_dir / INFO_FILE
+        info = {'distance_metric': 'l2'}
+        if info_path.exists():
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+
+        codes, scales = None, None
+        if self.quantization == 'int8':
+            if (index_dir / CODES_FILE).exists():
+                codes = np.load(index_dir / CODES_FILE, mmap_mode='r')
+                scales = np.load(index_dir / SCALES_FILE)
+            if codes is None or len(codes) != len(vectors):
+                logger.warning("int8 codes missing or stale, quantizing in memory")
+                codes, scales = quantize_int8(vectors)
+
+        return {
+            'vectors': vectors,
+            'ids': ids,
+            'id_to_row': {doc_id: row for row, doc_id in enumerate(ids)},
+            'documents': records['documents'],
+            'metadatas': records['metadatas'],
+            'columns': columns,
+            'distance_metric': info['distance_metric'],
+            'codes': codes,
+            'scales': scales
+        }
+
+    def _save(self, index: Dict):
+        """Write the index as a new generation and switch CURRENT to it"""
+        previous = self._current_dir()
+        generation = f"{GENERATION_PREFIX}{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        generation_dir = self.index_dir / generation
+        generation_dir.mkdir(parents=True)
+
+        def write(name: str, writer):
+            with open(generation_dir / name, 'wb') as f:
+                writer(f)
+
+        write(VECTORS_FILE, lambda f: np.save(f, index['vectors']))
+        write(COLUMNS_FILE, lambda f: np.savez(
+            f,
+            ids=np.array(index['ids'], dtype=str),
+            **index['columns']
+        ))
+        write(RECORDS_FILE, lambda f: f.write(json.dumps({
+            'documents': index['documents'],
+            'metadatas': index['metadatas']
+        }).encode('utf-8')))
+        write(INFO_FILE, lambda f: f.write(json.dumps({
+            'distance_metric': DISTANCE_METRIC
+        }).encode('utf-8')))
+
+        if self.quantization == 'int8':
+            codes, scales = quantize_int8(index['vectors'])
+            write(SCALES_FILE, lambda f: np.save(f, scales))
+            write(CODES_FILE, lambda f: np.save(f, codes))
+
+        # The pointer swap is the single atomic step readers can observe
+        tmp_pointer = self.index_dir / f"{CURRENT_FILE}.tmp"
+        tmp_pointer.write_text(generation, encoding='utf-8')
+        os.replace(tmp_pointer, self.index_dir / CURRENT_FILE)
+
+        self._prune_generations(keep={generation, previous.name if previous else None})
+
+        # Searches hold a reference to the previous index, so swap in one step
+        self._index = self._load_from(generation_dir)
+
+    def _prune_generations(self, keep: set):
+        """Remove superseded generations and files of the pre-generation layout"""
+        for path in self.index_dir.iterdir():
+            if path.name.startswith(GENERATION_PREFIX) and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.name in INDEX_FILES:
+                path.unlink(missing_ok=True)
+
+    @property
+    def distance_metric(self) -> str:
+        """Distance reported by searches ('cosine', or 'l2' for legacy indexes)"""
+        return self._current_index()['distance_metric']
+
+    def _upsert(self, ids: List[str], embeddings: np.ndarray, texts: List[str],
+                metadatas: List[Dict]):
+        """Insert new rows and overwrite existing ones, then persist"""
+        with self._write_lock:
+            current = self._index
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+
+            if current['vectors'] is None:
+                vectors = np.empty((0, embeddings.shape[1]), dtype=np.float32)
+            else:
+                vectors = np.array(current['vectors'])
+
+            index_ids = list(current['ids'])
+            id_to_row = dict(current['id_to_row'])
+            documents = list(current['documents'])
+            index_metadatas = list(current['metadatas'])
+
+            new_rows = []
+            for position, doc_id in enumerate(ids):
+                row = id_to_row.get(doc_id)
+                if row is None:
+                    id_to_row[doc_id] = len(index_ids)
+                    index_ids.append(doc_id)
+                    documents.append(texts[position])
+                    index_metadatas.append(metadatas[position])
+                    new_rows.append(position)
+                else:
+                    vectors[row] = embeddings[position]
+                    documents[row] = texts[position]
+                    index_metadatas[row] = metadatas[position]
+
+            if new_rows:
+                vectors = np.concatenate([vectors, embeddings[new_rows]], axis=0)
+
+            self._save({
+                'vectors': vectors,
+                'ids': index_ids,
+                'documents': documents,
+                'metadatas': index_metadatas,
+                'columns': self._build_columns(index_metadatas)
+            })
+
+    def _delete(self, ids: List[str]):
+        """Remove rows by ID, then persist"""
+        with self._write_lock:
+            current = self._index
+            remove = {current['id_to_row'][i] for i in ids if i in current['id_to_row']}
+            if not remove:
+                return
+
+            keep = [row for row in range(len(current['ids'])) if row not in remove]
+            metadatas = [current['metadatas'][row] for row in keep]
+
+            self._save({
+                'vectors': np.array(current['vectors'][keep]),
+                'ids': [current['ids'][row] for row in keep],
+                'documents': [current['documents'][row] for row in keep],
+                'metadatas': metadatas,
+                'columns': self._build_columns(metadatas)
+            })
+
+    @staticmethod
+    def _build_columns(metadatas: List[Dict]) -> Dict[str, np.ndarray]:
+        return {
+            name: np.array([m.get(name, '') for m in metadatas], dtype=str)
+            for name in FILTER_COLUMNS
+        }
+
+    def add_documents(self, documents: List[Dict], batch_size: int = 100):
+        """
+        Add documents to vector store
+
+        Args:
+            documents: List of document dictionaries with 'content' and 'metadata'
+            batch_size: Batch size for embedding documents
+        """
+        self._check_writable()
+        if not documents:
+            logger.warning("No documents to add")
+            return
+
+        logger.info(f"Adding {len(documents)} documents to vector store...")
+
+        try:
+            self._write_documents(documents, batch_size)
+
+            logger.info(f"✅ Successfully added {len(documents)} documents")
+            logger.info(f"   Total documents in collection: {len(self._index['ids'])}")
+
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            raise
+
+    def _write_documents(self, documents: List[Dict], batch_size: int):
+        """
+        Embed documents on a pipeline thread and upsert them in one write
+
+        Every save rewrites the index files, so batches are collected while
+        the next one is encoded and persisted together at the end.
+        """
+        ids, texts, metadatas, embeddings = [], [], [], []
+
+        def collect(batch_ids, batch_texts, batch_metadatas, batch_embeddings):
+            ids.extend(batch_ids)
+            texts.extend(batch_texts)
+            metadatas.extend(batch_metadatas)
+            embeddings.append(batch_embeddings)
+
+        timings = pipelined_write(documents, batch_size, self.embedding_generator, collect)
+
+        start = time.perf_counter()
+        self._upsert(ids, np.concatenate(embeddings, axis=0), texts, metadatas)
+        elapsed = round(time.perf_counter() - start, 3)
+        timings['write_seconds'] = round(timings['write_seconds'] + elapsed, 3)
+        timings['total_seconds'] = round(timings['total_seconds'] + elapsed, 3)
+
+        self.last_write_timings = timings
+
+    def sync_documents(self, documents: List[Dict], batch_size: int = 100) -> Dict[str, int]:
+        """
+        Incrementally bring the index in line with a full document set
+
+        Args:
+            documents: Complete list of documents with deterministic 'id's
+            batch_size: Batch size for embedding documents
+
+        Returns:
+            Counts of added, updated, removed and unchanged chunks
+        """
+        self._check_writable()
+        logger.info(f"Syncing {len(documents)} documents with collection...")
+
+        try:
+            index = self._index
+            existing_hashes = {
+                doc_id: metadata.get('content_hash')
+                for doc_id, metadata in zip(index['ids'], index['metadatas'])
+            }
+
+            diff = diff_documents(documents, existing_hashes)
+
+            if diff['removed_ids']:
+                self._delete(diff['removed_ids'])
+
+            changed = diff['added'] + diff['updated']
+            if changed:
+                self._write_documents(changed, batch_size)
+
+            counts = {
+                'added': len(diff['added']),
+                'updated': len(diff['updated']),
+                'removed': len(diff['removed_ids']),
+                'unchanged': diff['unchanged']
+            }
+            logger.info(
+                f"✅ Sync complete: {counts['added']} added, {counts['updated']} updated, "
+                f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+            )
+
+            return counts
+
+        except Exception as e:
+            logger.error(f"Error syncing documents: {e}")
+            raise
+
+    def search(self, query: str, top_k: int = None,
+               filters: Dict[str, Any] = None) -> List[Dict]:
+        """
+        Search for similar documents
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filters: Metadata filters (e.g., {'faculty': 'FTS'})
+
+        Returns:
+            List of search results with documents and metadata
+        """
+        logger.info(f"Searching for: '{query}' (top_k={top_k or Config.TOP_K_RESULTS})")
+
+        query_embedding = self.embedding_generator.generate_embedding(query)
+
+        return self.search_by_embedding(query_embedding, top_k, filters)
+
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = None,
+                            filters: Dict[str, Any] = None,
+                            include_embeddings: bool = False) -> List[Dict]:
+        """
+        Exact search with a precomputed query embedding
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            filters: Metadata filters (e.g., {'faculty': 'FTS'})
+            include_embeddings: Also return each result's stored 'embedding'
+
+        Returns:
+            List of search results with documents and metadata
+        """
+        results = self.search_many_by_embedding(
+            [query_embedding], top_k, filters, include_embeddings
+        )[0]
+        logger.info(f"✅ Found {len(results)} results")
+        return results
+
+    def search_many(self, queries: List[str], top_k: int = None,
+                    filters: Dict[str, Any] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once
+
+        All queries are embedded in one batch and scored with one
+        matrix-matrix product.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+
+        Returns:
+            One result list per query, in the same format as search()
+        """
+        if not queries:
+            return []
+
+        logger.info(f"Searching for {len(queries)} queries (top_k={top_k or Config.TOP_K_RESULTS})")
+
+        query_embeddings = self.embedding_generator.generate_embeddings(
+            queries,
+            show_progress=False,
+            use_cache=False
+        )
+
+        return self.search_many_by_embedding(query_embeddings, top_k, filters)
+
+    def search_many_by_embedding(self, query_embeddings, top_k: int = None,
+                                 filters: Dict[str, Any] = None,
+                                 include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Exact search for several precomputed query embeddings
+
+        Args:
+            query_embeddings: Array or list of query embedding vectors
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+            include_embeddings: Also return each result's stored 'embedding'
+
+        Returns:
+            One result list per query
+        """
+        top_k = top_k or Config.TOP_K_RESULTS
+        # Embeddings are unit-length from the encoder, so dot product == cosine
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        index = self._current_index()
+
+        if index['vectors'] is None or not index['ids']:
+            return [[] for _ in range(len(queries))]
+
+        try:
+            mask = self._filter_mask(index, filters)
+            available = int(mask.sum()) if mask is not None else len(index['ids'])
+            top_k = min(top_k, available)
+            if top_k == 0:
+                return [[] for _ in range(len(queries))]
+
+            if index['codes'] is not None:
+                rows, row_scores = self._search_quantized(index, queries, mask, top_k, available)
+            else:
+                # (num_queries, num_documents) similarity matrix
+                scores = queries @ index['vectors'].T
+                if mask is not None:
+                    scores = np.where(mask[None, :], scores, -np.inf)
+                rows = self._top_rows(scores, top_k)
+                row_scores = np.take_along_axis(scores, rows, axis=1)
+
+            if index['distance_metric'] == 'l2':
+                distances = 2.0 - 2.0 * row_scores
+            else:
+                distances = 1.0 - row_scores
+
+            all_results = []
+            for query_rows, query_distances in zip(rows, distances):
+                results = []
+                for row, distance in zip(query_rows, query_distances):
+                    result = {
+                        'id': index['ids'][row],
+                        'document': index['documents'][row],
+                        'metadata': index['metadatas'][row],
+                        'distance': float(distance)
+                    }
+                    if include_embeddings:
+                        result['embedding'] = np.array(index['vectors'][row], dtype=np.float32)
+                    results.append(result)
+                all_results.append(results)
+
+            return all_results
+
+        except Exception as e:
+            logger.error(f"Error searching: {e}")
+            raise
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of the k highest scores per row, best first"""
+        rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, rows, axis=1), axis=1)
+        return np.take_along_axis(rows, order, axis=1)
+
+    def _search_quantized(self, index: Dict, queries: np.ndarray, mask: Optional[np.ndarray],
+                          top_k: int, available: int):
+        """
+        Shortlist with int8 codes, then re-score the shortlist exactly
+
+        Returns:
+            (rows, scores) of the top_k results per query, best first
+        """
+        # q . (codes * scales) == (q * scales) . codes
+        scaled = queries * index['scales']
+        codes = index['codes']
+        approx = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), QUANT_BLOCK_ROWS):
+            block = np.asarray(codes[start:start + QUANT_BLOCK_ROWS], dtype=np.float32)
+            approx[:, start:start + len(block)] = scaled @ block.T
+
+        if mask is not None:
+            approx = np.where(mask[None, :], approx, -np.inf)
+
+        num_candidates = min(top_k * self.rescore_factor, available)
+        candidates = self._top_rows(approx, num_candidates)
+
+        # Exact float scores for the shortlisted rows only
+        vectors = np.asarray(index['vectors'][candidates.ravel()], dtype=np.float32)
+        vectors = vectors.reshape(len(queries), num_candidates, -1)
+        exact = np.einsum('qcd,qd->qc', vectors, queries)
+
+        best = self._top_rows(exact, top_k)
+        return (
+            np.take_along_axis(candidates, best, axis=1),
+            np.take_along_axis(exact, best, axis=1)
+        )
+
+    @staticmethod
+    def _filter_mask(index: Dict, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Boolean row mask for equality filters
+
+        Accepts {'field': value, ...} or Chroma's {'$and': [{...}, ...]} form.
+        Indexed columns are compared vectorized; other fields fall back to
+        a scan of the metadata.
+        """
+        if not filters:
+            return None
+
+        conditions = {}
+        for key, value in filters.items():
+            if key == '$and':
+                for clause in value:
+                    conditions.update(clause)
+            else:
+                conditions[key] = value
+
+        mask = np.ones(len(index['ids']), dtype=bool)
+        for key, value in conditions.items():
+            if key in index['columns']:
+                mask &= index['columns'][key] == str(value)
+            else:
+                mask &= np.array([m.get(key) == str(value) for m in index['metadatas']])
+
+        return mask
+
+    def get_documents(self, ids: List[str], include_embeddings: bool = False) -> List[Dict]:
+        """
+        Fetch stored chunks by ID
+
+        Args:
+            ids: Chunk IDs
+            include_embeddings: Also return each chunk's stored 'embedding'
+
+        Returns:
+            Results with 'id', 'document' and 'metadata', in the order of ids
+            (unknown IDs are skipped)
+        """
+        index = self._current_index()
+        results = []
+        for doc_id in ids:
+            row = index['id_to_row'].get(doc_id)
+            if row is None:
+                continue
+            result = {
+                'id': doc_id,
+                'document': index['documents'][row],
+                'metadata': index['metadatas'][row]
+            }
+            if include_embeddings:
+                result['embedding'] = np.array(index['vectors'][row], dtype=np.float32)
+            results.append(result)
+        return results
+
+    def export_records(self) -> Dict[str, Any]:
+        """
+        Read back every stored chunk with its embedding
+
+        Returns:
+            Dictionary with 'ids', 'embeddings' (float32 array),
+            'documents' and 'metadatas'
+        """
+        index = self._current_index()
+        dim = self.embedding_generator.get_embedding_dim()
+        return {
+            'ids': list(index['ids']),
+            'embeddings': (
+                np.array(index['vectors'], dtype=np.float32) if index['vectors'] is not None
+                else np.empty((0, dim), dtype=np.float32)
+            ),
+            'documents': list(index['documents']),
+            'metadatas': list(index['metadatas'])
+        }
+
+    def add_records(self, ids: List[str], embeddings: np.ndarray, documents: List[str],
+                    metadatas: List[Dict]):
+        """
+        Upsert precomputed records without re-embedding
+
+        Args:
+            ids: Chunk IDs
+            embeddings: Embedding matrix, one row per chunk
+            documents: Chunk texts
+            metadatas: Chunk metadata
+        """
+        self._check_writable()
+        self._upsert(list(ids), np.asarray(embeddings, dtype=np.float32),
+                     list(documents), list(metadatas))
+        logger.info(f"✅ Restored {len(ids)} records")
+
+    def list_ids(self) -> List[str]:
+        """IDs of every stored chunk"""
+        return list(self._current_index()['ids'])
+
+    def delete_records(self, ids: List[str]):
+        """
+        Delete chunks by ID
+
+        Args:
+            ids: Chunk IDs (unknown IDs are ignored)
+        """
+        self._check_writable()
+        self._delete(list(ids))
+
+    def delete_collection(self):
+        """Delete the entire collection"""
+        self._check_writable()
+        logger.warning(f"Deleting collection '{self.collection_name}'")
+        try:
+            with self._write_lock:
+                if self.index_dir.exists():
+                    shutil.rmtree(self.index_dir)
+                self._index = self._empty_index()
+            logger.info("✅ Collection deleted")
+        except Exception as e:
+            logger.error(f"Error deleting collection: {e}")
+            raise
+
+    def get_stats(self) -> Dict:
+        """Get collection statistics"""
+        return {
+            'collection_name': self.collection_name,
+            'document_count': len(self._current_index()['ids']),
+            'embedding_dimension': self.embedding_generator.get_embedding_dim(),
+            'distance_metric': self.distance_metric,
+            'quantization': self.quantization
+        }
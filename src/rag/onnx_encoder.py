@@ -0,0 +1,146 @@
+"""
+ONNX Sentence Encoder
+Runs an exported sentence-transformers model with ONNX Runtime on CPU
+"""
+
+from typing import List, Union
+from pathlib import Path
+import json
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger("onnx_encoder")
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model_int8.onnx"
+ONNX_CONFIG_FILE = "encoder_config.json"
+
+
+class OnnxEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode backed by ONNX Runtime
+
+    Expects a directory produced by scripts/05_export_onnx_model.py holding
+    the transformer graph, its tokenizer.json and an encoder_config.json
+    describing pooling and normalization.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: int = 0):
+        """
+        Initialize ONNX encoder
+
+        Args:
+            model_dir: Directory with the exported model
+            quantized: Load the dynamic int8 graph instead of float32
+            num_threads: Intra-op threads (0 lets ONNX Runtime decide)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / (ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        config_file = model_dir / ONNX_CONFIG_FILE
+
+        if not model_file.exists() or not config_file.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_file}. "
+                "Run scripts/05_export_onnx_model.py first"
+            )
+
+        with open(config_file, 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        self.embedding_dim = self.config['embedding_dim']
+        self.normalize = self.config.get('normalize', True)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config.get('max_seq_length', 256))
+        pad_token = self.config.get('pad_token', '[PAD]')
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id(pad_token) or 0,
+            pad_token=pad_token
+        )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        logger.info(f"✅ ONNX model loaded: {model_file.name}")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get embedding dimension"""
+        return self.embedding_dim
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        Encode sentences into embeddings
+
+        Args:
+            sentences: Single text or list of texts
+            batch_size: Batch size for inference
+            show_progress_bar: Accepted for API compatibility (ignored)
+            convert_to_numpy: Accepted for API compatibility (always numpy)
+            normalize_embeddings: Force unit-length output even if the
+                exported config disables normalization
+
+        Returns:
+            1-D embedding for a single text, otherwise (n, dim) array
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        embeddings = np.empty((len(sentences), self.embedding_dim), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            embeddings[start:start + len(batch)] = self._encode_batch(
+                batch, self.normalize or normalize_embeddings
+            )
+
+        return embeddings[0] if single else embeddings
+
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count of each text after truncation, without padding"""
+        encodings = self.tokenizer.encode_batch(texts)
+        return np.array([sum(e.attention_mask) for e in encodings])
+
+    def _encode_batch(self, texts: List[str], normalize: bool) -> np.ndarray:
+        """Tokenize, run the graph, mean-pool and optionally L2-normalize one batch"""
+        encodings = self.tokenizer.encode_batch(texts)
+
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'token_type_ids': np.zeros_like(input_ids)
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        return embeddings.astype(np.float32)
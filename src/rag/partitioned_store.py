@@ -0,0 +1,497 @@
+"""
+Partitioned Vector Store
+One index per (faculty, source_type) with routed and fan-out search
+"""
+
+from typing import List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import json
+import os
+import re
+import sys
+import threading
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.rag.embeddings import get_embedding_generator
+from src.rag.kb_version import read_kb_version
+from src.rag.vector_store import create_vector_store, DISTANCE_METRIC
+
+logger = setup_logger("partitioned_store")
+
+# Metadata fields that decide which partition a chunk lives in
+PARTITION_FIELDS = ('faculty', 'source_type')
+
+
+def partition_name(collection_name: str, faculty: str, source_type: str) -> str:
+    """
+    Backend collection name for one partition
+
+    Values are slugged so the name is valid for Chroma (alphanumerics,
+    underscores and dashes).
+    """
+    def slug(value: str) -> str:
+        return re.sub(r'[^a-z0-9]+', '_', (value or '').lower()).strip('_') or 'none'
+
+    return f"{collection_name}-{slug(faculty)}-{slug(source_type)}"
+
+
+class PartitionedVectorStore:
+    """
+    Vector store split into one backend index per faculty and source type
+
+    Filtered searches only touch the matching partitions, so a small
+    faculty is searched on its own instead of being post-filtered out of
+    the full corpus. Unfiltered searches query every partition in parallel
+    and merge the results by distance. A JSON manifest records which
+    partitions exist and what they hold.
+    """
+
+    def __init__(self, collection_name: str = "university_docs", read_only: bool = None):
+        """
+        Initialize vector store
+
+        Args:
+            collection_name: Name of the logical collection
+            read_only: Serve existing partitions and refuse writes
+                (default Config.VECTOR_DB_READ_ONLY)
+        """
+        self.collection_name = collection_name
+        self.read_only = Config.VECTOR_DB_READ_ONLY if read_only is None else read_only
+        self.manifest_path = Path(Config.PARTITION_MANIFEST_DIR) / f"{collection_name}.json"
+        self.last_write_timings = {}
+
+        self._lock = threading.Lock()
+        self._stores = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.PARTITION_SEARCH_WORKERS,
+            thread_name_prefix="partition-search"
+        )
+
+        # Read before loading so a build stamped meanwhile triggers another reload
+        self._kb_version = read_kb_version()
+        self.manifest = self._load_manifest()
+        if self.read_only and not self.manifest['partitions']:
+            raise FileNotFoundError(f"No partition manifest at {self.manifest_path}")
+        for name in self.manifest['partitions']:
+            self._get_store(name)
+
+        logger.info(
+            f"✅ Partitioned collection '{collection_name}' ready "
+            f"({len(self.manifest['partitions'])} partitions)"
+        )
+
+        # Get embedding generator
+        self.embedding_generator = get_embedding_generator()
+
+    @property
+    def distance_metric(self) -> str:
+        """Distance reported by searches (shared by all partitions)"""
+        for store in list(self._stores.values()):
+            return store.distance_metric
+        return DISTANCE_METRIC
+
+    def _check_writable(self):
+        """Refuse writes on a read-only store"""
+        if self.read_only:
+            raise RuntimeError(
+                f"Vector store '{self.collection_name}' is read-only (VECTOR_DB_READ_ONLY=true)"
+            )
+
+    def _load_manifest(self) -> Dict:
+        """Read the partition manifest (empty if nothing was built yet)"""
+        if not self.manifest_path.exists():
+            return {'collection_name': self.collection_name, 'partitions': {}}
+
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _partitions(self) -> Dict[str, Dict]:
+        """
+        Partitions in the manifest, re-read first when a read-only store sees a new build
+
+        Open partition stores reload themselves; partitions the new build
+        dropped are closed and new ones open on first use.
+        """
+        if self.read_only and read_kb_version() != self._kb_version:
+            with self._lock:
+                version = read_kb_version()
+                if version != self._kb_version:
+                    logger.info(f"Knowledge base version changed, reloading '{self.collection_name}'")
+                    self.manifest = self._load_manifest()
+                    for name in set(self._stores) - set(self.manifest['partitions']):
+                        del self._stores[name]
+                    self._kb_version = version
+        return self.manifest['partitions']
+
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _get_store(self, name: str):
+        """Backend store for a partition, opened on first use"""
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = create_vector_store(name, partitioned=False, read_only=self.read_only)
+                self._stores[name] = store
+            return store
+
+    def _group_documents(self, documents: List[Dict]) -> Dict[str, Tuple[Dict, List[Dict]]]:
+        """Split documents by partition: name -> (partition fields, documents)"""
+        groups = {}
+        for doc in documents:
+            metadata = doc.get('metadata', {})
+            fields = {key: metadata.get(key, '') for key in PARTITION_FIELDS}
+            name = partition_name(self.collection_name, fields['faculty'], fields['source_type'])
+            groups.setdefault(name, (fields, []))[1].append(doc)
+        return groups
+
+    def _record_partition(self, name: str, fields: Dict):
+        self.manifest['partitions'][name] = {
+            **fields,
+            'document_count': self._get_store(name).get_stats()['document_count']
+        }
+
+    def _merge_timings(self, stores: List) -> Dict[str, float]:
+        """Sum per-stage write timings over the partitions that were written"""
+        merged = {}
+        for store in stores:
+            for key, value in store.last_write_timings.items():
+                merged[key] = round(merged.get(key, 0) + value, 3)
+        return merged
+
+    def add_documents(self, documents: List[Dict], batch_size: int = 100):
+        """
+        Add documents to their partitions
+
+        Args:
+            documents: List of document dictionaries with 'content' and 'metadata'
+            batch_size: Batch size for embedding and writing
+        """
+        self._check_writable()
+        if not documents:
+            logger.warning("No documents to add")
+            return
+
+        groups = self._group_documents(documents)
+        logger.info(f"Adding {len(documents)} documents to {len(groups)} partitions...")
+
+        written = []
+        for name, (fields, docs) in groups.items():
+            store = self._get_store(name)
+            store.add_documents(docs, batch_size=batch_size)
+            self._record_partition(name, fields)
+            written.append(store)
+
+        self.last_write_timings = self._merge_timings(written)
+        self._save_manifest()
+
+    def sync_documents(self, documents: List[Dict], batch_size: int = 100) -> Dict[str, int]:
+        """
+        Incrementally bring every partition in line with a full document set
+
+        Partitions that no longer receive any document are dropped.
+
+        Args:
+            documents: Complete list of documents with deterministic 'id's
+            batch_size: Batch size for embedding and writing
+
+        Returns:
+            Counts of added, updated, removed and unchanged chunks
+        """
+        self._check_writable()
+        groups = self._group_documents(documents)
+        logger.info(f"Syncing {len(documents)} documents across {len(groups)} partitions...")
+
+        totals = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        written = []
+
+        for name, (fields, docs) in groups.items():
+            store = self._get_store(name)
+            counts = store.sync_documents(docs, batch_size=batch_size)
+            for key in totals:
+                totals[key] += counts[key]
+            if counts['added'] or counts['updated']:
+                written.append(store)
+            self._record_partition(name, fields)
+
+        for name in list(self.manifest['partitions']):
+            if name not in groups:
+                store = self._get_store(name)
+                totals['removed'] += store.get_stats()['document_count']
+                store.delete_collection()
+                del self.manifest['partitions'][name]
+                self._stores.pop(name, None)
+                logger.info(f"Dropped empty partition '{name}'")
+
+        self.last_write_timings = self._merge_timings(written)
+        self._save_manifest()
+
+        return totals
+
+    def _route(self, filters: Optional[Dict[str, Any]]) -> Tuple[List[str], Optional[Dict]]:
+        """
+        Pick the partitions a filtered search must visit
+
+        Returns:
+            Partition names and the filters that still need to be applied
+            inside each partition (partition fields are implied)
+        """
+        filters = dict(filters or {})
+        routing = {key: filters.pop(key) for key in PARTITION_FIELDS if key in filters}
+
+        names = [
+            name for name, info in self._partitions().items()
+            if all(info.get(key) == value for key, value in routing.items())
+        ]
+
+        return names, (filters or None)
+
+    def search(self, query: str, top_k: int = None,
+               filters: Dict[str, Any] = None) -> List[Dict]:
+        """
+        Search for similar documents
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filters: Metadata filters (e.g., {'faculty': 'FTS'})
+
+        Returns:
+            List of search results with documents and metadata
+        """
+        logger.info(f"Searching for: '{query}' (top_k={top_k or Config.TOP_K_RESULTS})")
+
+        query_embedding = self.embedding_generator.generate_embedding(query)
+        return self.search_by_embedding(query_embedding, top_k, filters)
+
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = None,
+                            filters: Dict[str, Any] = None,
+                            include_embeddings: bool = False) -> List[Dict]:
+        """
+        Search the matching partitions with a precomputed query embedding
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            filters: Metadata filters (e.g., {'faculty': 'FTS'})
+            include_embeddings: Also return each result's stored 'embedding'
+
+        Returns:
+            List of search results with documents and metadata
+        """
+        results = self.search_many_by_embedding(
+            [query_embedding], top_k, filters, include_embeddings
+        )[0]
+        logger.info(f"✅ Found {len(results)} results")
+        return results
+
+    def search_many(self, queries: List[str], top_k: int = None,
+                    filters: Dict[str, Any] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once
+
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+
+        Returns:
+            One result list per query, in the same format as search()
+        """
+        if not queries:
+            return []
+
+        query_embeddings = self.embedding_generator.generate_embeddings(
+            queries,
+            show_progress=False,
+            use_cache=False
+        )
+
+        return self.search_many_by_embedding(query_embeddings, top_k, filters)
+
+    def search_many_by_embedding(self, query_embeddings, top_k: int = None,
+                                 filters: Dict[str, Any] = None,
+                                 include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Search several precomputed query embeddings across partitions
+
+        Each partition returns its own top_k; the lists are merged per
+        query by distance.
+
+        Args:
+            query_embeddings: Array or list of query embedding vectors
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+            include_embeddings: Also return each result's stored 'embedding'
+
+        Returns:
+            One result list per query
+        """
+        top_k = top_k or Config.TOP_K_RESULTS
+        names, remaining = self._route(filters)
+        num_queries = len(query_embeddings)
+
+        if not names:
+            return [[] for _ in range(num_queries)]
+
+        def search_partition(name: str) -> List[List[Dict]]:
+            return self._get_store(name).search_many_by_embedding(
+                query_embeddings, top_k, remaining, include_embeddings
+            )
+
+        try:
+            if len(names) == 1:
+                partition_results = [search_partition(names[0])]
+            else:
+                partition_results = list(self._executor.map(search_partition, names))
+
+            merged = []
+            for q in range(num_queries):
+                candidates = [r for results in partition_results for r in results[q]]
+                candidates.sort(key=lambda r: r['distance'])
+                merged.append(candidates[:top_k])
+
+            return merged
+
+        except Exception as e:
+            logger.error(f"Error searching: {e}")
+            raise
+
+    def get_documents(self, ids: List[str], include_embeddings: bool = False) -> List[Dict]:
+        """
+        Fetch stored chunks by ID from whichever partitions hold them
+
+        Args:
+            ids: Chunk IDs
+            include_embeddings: Also return each chunk's stored 'embedding'
+
+        Returns:
+            Results with 'id', 'document' and 'metadata', in the order of ids
+            (unknown IDs are skipped)
+        """
+        by_id = {}
+        for name in self._partitions():
+            missing = [doc_id for doc_id in ids if doc_id not in by_id]
+            if not missing:
+                break
+            for result in self._get_store(name).get_documents(missing, include_embeddings):
+                by_id[result['id']] = result
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def export_records(self) -> Dict[str, Any]:
+        """
+        Read back every stored chunk from all partitions
+
+        Returns:
+            Dictionary with 'ids', 'embeddings' (float32 array),
+            'documents' and 'metadatas'
+        """
+        parts = [self._get_store(name).export_records() for name in self._partitions()]
+        dim = self.embedding_generator.get_embedding_dim()
+        return {
+            'ids': [i for part in parts for i in part['ids']],
+            'embeddings': (
+                np.concatenate([part['embeddings'] for part in parts], axis=0) if parts
+                else np.empty((0, dim), dtype=np.float32)
+            ),
+            'documents': [d for part in parts for d in part['documents']],
+            'metadatas': [m for part in parts for m in part['metadatas']]
+        }
+
+    def add_records(self, ids: List[str], embeddings: np.ndarray, documents: List[str],
+                    metadatas: List[Dict]):
+        """
+        Upsert precomputed records into their partitions without re-embedding
+
+        Args:
+            ids: Chunk IDs
+            embeddings: Embedding matrix, one row per chunk
+            documents: Chunk texts
+            metadatas: Chunk metadata
+        """
+        self._check_writable()
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        groups = {}
+        for row, metadata in enumerate(metadatas):
+            fields = {key: metadata.get(key, '') for key in PARTITION_FIELDS}
+            name = partition_name(self.collection_name, fields['faculty'], fields['source_type'])
+            groups.setdefault(name, (fields, []))[1].append(row)
+
+        for name, (fields, rows) in groups.items():
+            self._get_store(name).add_records(
+                [ids[row] for row in rows],
+                embeddings[rows],
+                [documents[row] for row in rows],
+                [metadatas[row] for row in rows]
+            )
+            self._record_partition(name, fields)
+
+        self._save_manifest()
+
+    def list_ids(self) -> List[str]:
+        """IDs of every stored chunk across partitions"""
+        return [
+            doc_id
+            for name in self._partitions()
+            for doc_id in self._get_store(name).list_ids()
+        ]
+
+    def delete_records(self, ids: List[str]):
+        """
+        Delete chunks by ID from whichever partitions hold them
+
+        Args:
+            ids: Chunk IDs (unknown IDs are ignored)
+        """
+        self._check_writable()
+        wanted = set(ids)
+
+        for name, info in list(self.manifest['partitions'].items()):
+            store = self._get_store(name)
+            held = [doc_id for doc_id in store.list_ids() if doc_id in wanted]
+            if held:
+                store.delete_records(held)
+                self._record_partition(name, {key: info[key] for key in PARTITION_FIELDS})
+
+        self._save_manifest()
+
+    def delete_collection(self):
+        """Delete every partition and the manifest"""
+        self._check_writable()
+        logger.warning(f"Deleting partitioned collection '{self.collection_name}'")
+        try:
+            for name in list(self.manifest['partitions']):
+                self._get_store(name).delete_collection()
+            self._stores.clear()
+            self.manifest = {'collection_name': self.collection_name, 'partitions': {}}
+            if self.manifest_path.exists():
+                self.manifest_path.unlink()
+            logger.info("✅ Collection deleted")
+        except Exception as e:
+            logger.error(f"Error deleting collection: {e}")
+            raise
+
+    def get_stats(self) -> Dict:
+        """Get collection statistics"""
+        partitions = {
+            name: info['document_count']
+            for name, info in self._partitions().items()
+        }
+        return {
+            'collection_name': self.collection_name,
+            'document_count': sum(partitions.values()),
+            'embedding_dimension': self.embedding_generator.get_embedding_dim(),
+            'distance_metric': self.distance_metric,
+            'partitions': partitions
+        }
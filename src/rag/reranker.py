@@ -0,0 +1,175 @@
+"""
+Cross-Encoder Reranker
+Reorders retrieved chunks by query-chunk relevance within a latency budget
+"""
+
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+import sys
+import threading
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
+from src.utils.text import normalize_text
+
+logger = setup_logger("reranker")
+
+
+class CrossEncoderReranker:
+    """
+    Score (query, chunk) pairs with a small CPU cross-encoder
+
+    All uncached pairs are scored in one batch on a worker thread. If the
+    batch does not finish within the time budget the candidates keep their
+    retrieval order; the batch still completes in the background and its
+    scores land in the cache for the next identical query.
+
+    At most one batch is in flight: while the worker is busy, queries keep
+    their retrieval order instead of queueing behind it, so a slow batch
+    never makes later requests wait longer than the budget.
+    """
+
+    def __init__(self, model_name: str = None, time_budget_ms: int = None,
+                 cache_size: int = None):
+        """
+        Initialize reranker (the model loads on the worker thread on first use)
+
+        Args:
+            model_name: Cross-encoder model (default from config)
+            time_budget_ms: Max time to wait for scores (default from config)
+            cache_size: Max cached (query, chunk) scores (default from config)
+        """
+        self.model_name = model_name or Config.RERANKER_MODEL
+        self.time_budget = (
+            time_budget_ms if time_budget_ms is not None else Config.RERANK_TIME_BUDGET_MS
+        ) / 1000.0
+        self.cache_size = cache_size if cache_size is not None else Config.RERANK_CACHE_SIZE
+
+        self._model = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self.stats = {
+            'reranked': 0,
+            'fallbacks': 0,
+            'busy_skips': 0,
+            'cached_pairs': 0,
+            'scored_pairs': 0
+        }
+
+        # Start loading right away so the first query is less likely to fall back
+        self._in_flight = self._executor.submit(self._load_model)
+
+    def _load_model(self):
+        """Load the cross-encoder (runs on the worker thread)"""
+        if self._model is None:
+            # Imported here so importing this module stays cheap
+            from sentence_transformers import CrossEncoder
+
+            start = time.perf_counter()
+            self._model = CrossEncoder(self.model_name, device="cpu")
+            logger.info(f"✅ Cross-encoder {self.model_name} loaded in {time.perf_counter() - start:.2f}s")
+        return self._model
+
+    def _score(self, query: str, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Score pairs in one batch and remember the results"""
+        model = self._load_model()
+        scores = model.predict([[query, text] for _, text in pairs], show_progress_bar=False)
+
+        with self._cache_lock:
+            for (chunk_id, _), score in zip(pairs, scores):
+                self._cache[(query, chunk_id)] = float(score)
+                self._cache.move_to_end((query, chunk_id))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return [float(score) for score in scores]
+
+    def _submit(self, key: str, pairs: List[Tuple[str, str]]) -> Optional[Future]:
+        """Start scoring pairs, or return None while the worker is still busy"""
+        with self._submit_lock:
+            if not self._in_flight.done():
+                return None
+            self._in_flight = self._executor.submit(self._score, key, pairs)
+            return self._in_flight
+
+    def rerank(self, query: str, results: List[Dict], top_n: int) -> List[Dict]:
+        """
+        Reorder results by cross-encoder score and keep the best top_n
+
+        Args:
+            query: User query
+            results: Search results with 'id' and 'document', in retrieval order
+            top_n: Number of results to keep
+
+        Returns:
+            Best top_n results with 'rerank_score', or the first top_n in
+            retrieval order if the time budget ran out
+        """
+        if not results:
+            return results
+
+        key = normalize_text(query)
+        scores: Dict[str, Optional[float]] = {}
+
+        with self._cache_lock:
+            for result in results:
+                score = self._cache.get((key, result['id']))
+                if score is not None:
+                    self._cache.move_to_end((key, result['id']))
+                scores[result['id']] = score
+
+        pairs = [(r['id'], r['document']) for r in results if scores[r['id']] is None]
+        self.stats['cached_pairs'] += len(results) - len(pairs)
+
+        if pairs:
+            start = time.perf_counter()
+            future = self._submit(key, pairs)
+            if future is None:
+                self.stats['fallbacks'] += 1
+                self.stats['busy_skips'] += 1
+                logger.warning("Reranker busy with an earlier batch, keeping retrieval order")
+                return results[:top_n]
+            try:
+                for (chunk_id, _), score in zip(pairs, future.result(timeout=self.time_budget)):
+                    scores[chunk_id] = score
+            except FutureTimeoutError:
+                self.stats['fallbacks'] += 1
+                logger.warning(
+                    f"Reranking {len(pairs)} pairs exceeded {self.time_budget * 1000:.0f}ms, "
+                    "keeping retrieval order"
+                )
+                return results[:top_n]
+            except Exception as e:
+                self.stats['fallbacks'] += 1
+                logger.error(f"Reranking failed, keeping retrieval order: {e}")
+                return results[:top_n]
+
+            self.stats['scored_pairs'] += len(pairs)
+            logger.info(f"Reranked {len(pairs)} pairs in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        self.stats['reranked'] += 1
+        ranked = sorted(results, key=lambda r: scores[r['id']], reverse=True)
+
+        return [{**result, 'rerank_score': round(scores[result['id']], 4)} for result in ranked[:top_n]]
+
+    def get_stats(self) -> Dict:
+        """Reranking and score cache statistics"""
+        with self._cache_lock:
+            return {
+                **self.stats,
+                'cache_entries': len(self._cache),
+                'time_budget_ms': round(self.time_budget * 1000)
+            }
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """Get or create reranker singleton (shared, thread-safe)"""
+    return get_registry().get("reranker", CrossEncoderReranker)
@@ -0,0 +1,175 @@
+"""
+Response Cache
+SQLite-backed cache of generated answers shared by all app processes
+"""
+
+from typing import Dict, Optional
+from pathlib import Path
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.utils.text import normalize_text
+from src.rag.kb_version import read_kb_version
+
+logger = setup_logger("response_cache")
+
+
+class ResponseCache:
+    """
+    Persistent response cache keyed on query, filters, model and KB version
+
+    Entries expire after a TTL, the least recently used entries are evicted
+    beyond a size limit, and entries from older knowledge-base versions are
+    purged as soon as a new build's version stamp is seen.
+    """
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None,
+                 max_entries: int = None):
+        """
+        Initialize response cache
+
+        Args:
+            db_path: SQLite database path (default from config)
+            ttl_seconds: Entry lifetime (default from config)
+            max_entries: Max number of cached responses (default from config)
+        """
+        self.db_path = str(db_path or Config.RESPONSE_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.RESPONSE_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else Config.RESPONSE_CACHE_MAX_ENTRIES
+
+        self._local = threading.local()
+        self._known_version = None
+        self.stats = {
+            'hits': 0,
+            'misses': 0
+        }
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kb_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+
+        logger.info(f"Response cache ready at {self.db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One autocommit connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _current_version(self) -> str:
+        """Current KB version, purging entries from older builds when it changes"""
+        version = read_kb_version()
+        if version != self._known_version:
+            deleted = self._connection().execute(
+                "DELETE FROM responses WHERE kb_version != ?", (version,)
+            ).rowcount
+            if deleted:
+                logger.info(f"Knowledge base changed, dropped {deleted} cached responses")
+            self._known_version = version
+        return version
+
+    def make_key(self, query: str, faculty: Optional[str], top_k: int,
+                 temperature: float, model: str) -> str:
+        """
+        Build the cache key for a request
+
+        Args:
+            query: User query (normalized before hashing)
+            faculty: Faculty filter
+            top_k: Number of documents retrieved
+            temperature: LLM temperature
+            model: LLM model name
+
+        Returns:
+            Hex digest identifying the request under the current KB version
+        """
+        payload = json.dumps({
+            'query': normalize_text(query),
+            'faculty': faculty,
+            'top_k': top_k,
+            'temperature': round(float(temperature), 3),
+            'model': model,
+            'kb_version': self._current_version()
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached response dictionary or None
+        """
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND kb_version = ? AND created_at >= ?",
+            (key, self._current_version(), now - self.ttl_seconds)
+        ).fetchone()
+
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, response: Dict):
+        """
+        Store a response and apply TTL and size eviction
+
+        Args:
+            key: Key from make_key
+            response: JSON-serializable response dictionary
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, kb_version, response, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, self._current_version(), json.dumps(response), now, now)
+        )
+
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        """Remove all cached responses"""
+        self._connection().execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        count = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            **self.stats,
+            'entries': count,
+            'kb_version': self._known_version
+        }
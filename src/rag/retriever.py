@@ -3,15 +3,27 @@ Document Retriever
 Handles intelligent retrieval of relevant documents
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import json
 import sys
+import threading
+
+import numpy as np
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
 from src.rag.vector_store import get_vector_store
+from src.rag.semantic_cache import SemanticQueryCache
+from src.rag.bm25_index import BM25Index, get_bm25_index_path
+from src.rag.kb_version import read_kb_version
+from src.rag.reranker import get_reranker
+from src.rag.compressor import ContextCompressor
+from src.llm.tokens import count_tokens, truncate_to_tokens
 
 logger = setup_logger("retriever")
 
@@ -22,6 +34,33 @@ class DocumentRetriever:
     def __init__(self):
         """Initialize retriever"""
         self.vector_store = get_vector_store()
+        
+        # Reuse results for paraphrased queries
+        self.semantic_cache = SemanticQueryCache() if Config.SEMANTIC_CACHE_ENABLED else None
+        
+        # Sparse (BM25) retrieval fused with dense results; the index is
+        # loaded lazily and reloaded when a new build lands
+        self.hybrid_enabled = Config.HYBRID_SEARCH_ENABLED
+        self._bm25_index = None
+        self._bm25_version = None
+        self._bm25_lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="retrieval")
+            if self.hybrid_enabled else None
+        )
+        
+        # Optional cross-encoder pass over an over-fetched candidate set
+        self.reranker = get_reranker() if Config.RERANKER_ENABLED else None
+        
+        # Maximal Marginal Relevance over the candidates' stored embeddings
+        self.mmr_enabled = Config.MMR_ENABLED
+        
+        # Optional query-focused sentence extraction before prompting
+        self.compressor = (
+            ContextCompressor(self.vector_store.embedding_generator)
+            if Config.CONTEXT_COMPRESSION_ENABLED else None
+        )
+        
         logger.info("Document retriever initialized")
     
     def retrieve(self, query: str, top_k: int = None, 
@@ -50,12 +89,25 @@ class DocumentRetriever:
         if source_type:
             filters['source_type'] = source_type
         
-        # Search vector store
-        results = self.vector_store.search(
-            query=query,
-            top_k=top_k,
-            filters=filters if filters else None
-        )
+        query_embedding = self.vector_store.embedding_generator.generate_embedding(query)
+        
+        # Over-fetch when reranking or diversifying so later stages have candidates
+        fetch_k = top_k
+        if self.reranker is not None:
+            fetch_k = max(fetch_k, Config.RERANK_CANDIDATES)
+        if self.mmr_enabled:
+            fetch_k = max(fetch_k, Config.MMR_CANDIDATES)
+        
+        # Search vector store (or reuse results of a near-identical query)
+        results = self._search(query, query_embedding, fetch_k, filters if filters else None)
+        
+        if self.reranker is not None:
+            # MMR takes its relevance from the rerank scores, so it gets the whole pool
+            keep = max(top_k, Config.MMR_CANDIDATES) if self.mmr_enabled else top_k
+            results = self.reranker.rerank(query, results, keep)
+        
+        if self.mmr_enabled:
+            results = self._diversify(query_embedding, results, top_k)
         
         # Enhance results with relevance scores
         enhanced_results = []
@@ -67,12 +119,170 @@ class DocumentRetriever:
                 'distance': result.get('distance', 0),
                 'relevance_score': self._calculate_relevance_score(result)
             }
+            if 'rerank_score' in result:
+                enhanced_result['rerank_score'] = result['rerank_score']
             enhanced_results.append(enhanced_result)
         
         logger.info(f"✅ Retrieved {len(enhanced_results)} documents")
         
         return enhanced_results
     
+    def _search(self, query: str, query_embedding: np.ndarray, top_k: int,
+                filters: Optional[Dict]) -> List[Dict]:
+        """
+        Dense or hybrid search through the semantic cache
+        
+        Hybrid results depend on the exact query terms as well as the
+        embedding, so the BM25 terms join the filters in the cache key:
+        "modules in IT1113" must not be answered with IT1114's hits.
+        """
+        bm25_index = self._get_bm25_index() if self.hybrid_enabled else None
+        if bm25_index is None:
+            filter_key = json.dumps(filters or {}, sort_keys=True)
+        else:
+            filter_key = json.dumps(
+                {'filters': filters or {}, 'terms': bm25_index.query_terms(query)},
+                sort_keys=True
+            )
+        
+        if self.semantic_cache is not None:
+            results = self.semantic_cache.lookup(query_embedding, filter_key, top_k)
+            if results is not None:
+                logger.info("Semantic cache hit, skipping vector search")
+                return results
+        
+        if bm25_index is None:
+            results = self.vector_store.search_by_embedding(
+                query_embedding, top_k, filters, include_embeddings=self.mmr_enabled
+            )
+        else:
+            results = self._hybrid_search(query, query_embedding, top_k, filters, bm25_index)
+        
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(query_embedding, filter_key, top_k, results)
+        
+        return results
+    
+    def _get_bm25_index(self) -> Optional[BM25Index]:
+        """BM25 index for the current build (None if the builder has not written one)"""
+        version = read_kb_version()
+        
+        with self._bm25_lock:
+            if version != self._bm25_version:
+                path = get_bm25_index_path(self.vector_store.collection_name)
+                self._bm25_index = None
+                try:
+                    if path.exists():
+                        self._bm25_index = BM25Index.load(path)
+                        logger.info(f"Loaded BM25 index ({len(self._bm25_index.ids)} chunks)")
+                    else:
+                        logger.warning("No BM25 index found, using dense retrieval only")
+                except Exception as e:
+                    logger.warning(f"Could not load BM25 index: {e}")
+                self._bm25_version = version
+            
+            return self._bm25_index
+    
+    def _hybrid_search(self, query: str, query_embedding: np.ndarray, top_k: int,
+                       filters: Optional[Dict], bm25_index: BM25Index) -> List[Dict]:
+        """
+        Run dense and BM25 retrieval concurrently and fuse them with RRF
+        
+        Both retrievers return top_k * HYBRID_CANDIDATE_FACTOR candidates.
+        Chunks found only by BM25 are fetched from the vector store and get
+        their dense distance from the stored chunk embedding, so relevance
+        scores stay comparable.
+        """
+        num_candidates = top_k * Config.HYBRID_CANDIDATE_FACTOR
+        
+        dense_future = self._executor.submit(
+            self.vector_store.search_by_embedding, query_embedding, num_candidates, filters,
+            self.mmr_enabled
+        )
+        sparse_hits = bm25_index.search(query, num_candidates, filters)
+        dense_results = dense_future.result()
+        
+        fused = reciprocal_rank_fusion([
+            [result['id'] for result in dense_results],
+            [doc_id for doc_id, _ in sparse_hits]
+        ])[:top_k]
+        
+        by_id = {result['id']: result for result in dense_results}
+        sparse_only = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if sparse_only:
+            for result in self._with_dense_distance(
+                query_embedding,
+                self.vector_store.get_documents(sparse_only, include_embeddings=True)
+            ):
+                by_id[result['id']] = result
+        
+        logger.info(
+            f"Hybrid search: {len(dense_results)} dense, {len(sparse_hits)} sparse candidates, "
+            f"{len(sparse_only)} of top {top_k} found only by BM25"
+        )
+        
+        return [
+            {**by_id[doc_id], 'rrf_score': round(score, 5)}
+            for doc_id, score in fused if doc_id in by_id
+        ]
+    
+    def _with_dense_distance(self, query_embedding: np.ndarray,
+                             results: List[Dict]) -> List[Dict]:
+        """Add the vector-store distance (and embedding) to results that came from BM25 only"""
+        if not results:
+            return results
+        
+        # Stored embeddings are read back, never re-encoded (and never written
+        # to the embedding cache, which read-only replicas must not touch)
+        embeddings = np.stack([result['embedding'] for result in results])
+        similarities = embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        
+        if getattr(self.vector_store, 'distance_metric', 'cosine') == 'l2':
+            distances = 2.0 - 2.0 * similarities
+        else:
+            distances = 1.0 - similarities
+        
+        return [
+            {**result, 'distance': float(distance), 'embedding': embedding}
+            for result, distance, embedding in zip(results, distances, embeddings)
+        ]
+    
+    def _diversify(self, query_embedding: np.ndarray, results: List[Dict],
+                   top_k: int) -> List[Dict]:
+        """
+        Pick a relevant but non-redundant subset of the candidates with MMR
+        
+        Relevance is the best upstream ranking signal (rerank score, then
+        RRF score), so diversification refines the reranked or fused order
+        instead of falling back to plain dense similarity.
+        """
+        if len(results) <= top_k or any('embedding' not in r for r in results):
+            return results[:top_k]
+        
+        embeddings = np.stack([r['embedding'] for r in results])
+        selected = mmr_select(
+            query_embedding, embeddings, top_k, Config.MMR_LAMBDA,
+            relevance=upstream_relevance(results)
+        )
+        
+        logger.info(
+            f"MMR kept {len(selected)} of {len(results)} candidates "
+            f"(original ranks {[i + 1 for i in selected]})"
+        )
+        
+        return [results[i] for i in selected]
+    
+    def get_cache_stats(self) -> Dict:
+        """Get query embedding, semantic cache and reranker statistics"""
+        stats = {
+            'query_embedding_cache': self.vector_store.embedding_generator.get_query_cache_stats()
+        }
+        if self.semantic_cache is not None:
+            stats['semantic_cache'] = self.semantic_cache.get_stats()
+        if self.reranker is not None:
+            stats['reranker'] = self.reranker.get_stats()
+        return stats
+    
     def _calculate_relevance_score(self, result: Dict) -> float:
         """
         Calculate relevance score from distance
@@ -85,15 +295,20 @@ class DocumentRetriever:
         """
         distance = result.get('distance', 1.0)
         
-        # Convert distance to similarity score
-        # Lower distance = higher similarity
-        # Using exponential decay
-        relevance = max(0, 1 - (distance / 2))
+        # Cosine distance is 1 - similarity; legacy L2 collections store
+        # squared L2 between unit vectors, i.e. 2 - 2 * similarity
+        if getattr(self.vector_store, 'distance_metric', 'cosine') == 'l2':
+            relevance = 1 - distance / 2
+        else:
+            relevance = 1 - distance
+        
+        relevance = max(0, relevance)
         
         return round(relevance, 3)
     
     def retrieve_with_context(self, query: str, top_k: int = None,
-                            faculty: Optional[str] = None) -> Dict:
+                            faculty: Optional[str] = None,
+                            max_tokens: Optional[int] = None) -> Dict:
         """
         Retrieve documents with formatted context for LLM
         
@@ -101,19 +316,61 @@ class DocumentRetriever:
             query: User query
             top_k: Number of documents to retrieve
             faculty: Filter by faculty
+            max_tokens: Token budget for the context (None for no limit)
         
         Returns:
             Dictionary with context and sources
         """
         results = self.retrieve(query, top_k, faculty)
         
-        # Format context for LLM
+        # Stitch consecutive chunks of the same source back together
+        blocks = merge_adjacent_chunks(results)
+        
+        # What the same results would have cost as separate blocks
+        chars_saved, tokens_saved = 0, 0
+        if len(blocks) < len(results):
+            unmerged_context, _ = self._format_context(results)
+            merged_context, _ = self._format_context(blocks)
+            chars_saved = len(unmerged_context) - len(merged_context)
+            tokens_saved = count_tokens(unmerged_context) - count_tokens(merged_context)
+            logger.info(
+                f"Merged {len(results)} chunks into {len(blocks)} blocks, "
+                f"saved {chars_saved} chars / {tokens_saved} tokens"
+            )
+        
+        # Keep only the sentences closest to the query
+        if self.compressor is not None and blocks:
+            query_embedding = self.vector_store.embedding_generator.generate_embedding(query)
+            blocks = self.compressor.compress(query_embedding, blocks)
+        
+        if max_tokens is not None:
+            packed = pack_context(blocks, max_tokens)
+            if len(packed) < len(blocks) or any(block.get('truncated') for block in packed):
+                logger.info(
+                    f"Packed {len(packed)} of {len(blocks)} blocks into "
+                    f"{max_tokens} context tokens"
+                )
+            blocks = packed
+        
+        context, sources = self._format_context(blocks)
+        
+        return {
+            'context': context,
+            'sources': sources,
+            'num_sources': len(sources),
+            'context_tokens': count_tokens(context),
+            'context_chars_saved': chars_saved,
+            'context_tokens_saved': tokens_saved
+        }
+    
+    def _format_context(self, blocks: List[Dict]) -> Tuple[str, List[Dict]]:
+        """Format retrieved blocks as [Source i] context and source entries"""
         context_parts = []
         sources = []
         
-        for i, result in enumerate(results, 1):
-            content = result['content']
-            metadata = result['metadata']
+        for i, block in enumerate(blocks, 1):
+            content = block['content']
+            metadata = block['metadata']
             
             # Add source reference
             source_ref = f"[Source {i}]"
@@ -129,28 +386,248 @@ class DocumentRetriever:
                 'url': metadata.get('url', ''),
                 'faculty': metadata.get('faculty', ''),
                 'source_type': metadata.get('source_type', ''),
-                'relevance_score': result['relevance_score']
+                'relevance_score': block['relevance_score'],
+                'chunks': block.get('chunks', 1)
             }
             sources.append(source_info)
         
-        context = "\n\n".join(context_parts)
+        return "\n\n".join(context_parts), sources
+
+
+def _chunk_source(metadata: Dict) -> Optional[str]:
+    """Identifier of the document a chunk was cut from"""
+    return metadata.get('source_key') or metadata.get('url') or metadata.get('title')
+
+
+def strip_overlap(previous: str, following: str, max_overlap: int = None,
+                  min_overlap: int = 20) -> str:
+    """
+    Remove the start of following that repeats the end of previous
+    
+    Chunks are cut with CHUNK_OVERLAP shared characters and then
+    whitespace-stripped, so the overlap is found by matching a suffix of
+    previous against a prefix of following.
+    
+    Args:
+        previous: Earlier chunk
+        following: Next chunk of the same document
+        max_overlap: Longest overlap to look for (default 2 * CHUNK_OVERLAP)
+        min_overlap: Shorter matches are treated as coincidence
+    
+    Returns:
+        following without the repeated region
+    """
+    max_overlap = max_overlap or 2 * Config.CHUNK_OVERLAP
+    longest = min(max_overlap, len(previous), len(following))
+    
+    for size in range(longest, min_overlap - 1, -1):
+        if previous.endswith(following[:size]):
+            return following[size:]
+    
+    return following
+
+
+def merge_adjacent_chunks(results: List[Dict]) -> List[Dict]:
+    """
+    Merge retrieved chunks with consecutive chunk_index from the same document
+    
+    Blocks keep the rank, metadata and relevance score of their best
+    chunk; the merged text drops the overlap repeated between neighbouring
+    chunks.
+    
+    Args:
+        results: Retrieved results (retrieve() format), best first
+    
+    Returns:
+        Blocks with 'content', 'metadata', 'relevance_score' and 'chunks'
+    """
+    groups = {}
+    for position, result in enumerate(results):
+        metadata = result['metadata']
+        source = _chunk_source(metadata)
+        chunk_index = metadata.get('chunk_index')
         
-        return {
-            'context': context,
-            'sources': sources,
-            'num_sources': len(sources)
-        }
+        if source is None or chunk_index is None:
+            key = ('__single__', position)
+        else:
+            key = source
+        groups.setdefault(key, []).append((position, result))
+    
+    blocks = []
+    for members in groups.values():
+        members.sort(key=lambda member: int(member[1]['metadata'].get('chunk_index') or 0))
+        
+        current = None
+        for position, result in members:
+            chunk_index = int(result['metadata'].get('chunk_index') or 0)
+            
+            if current is not None and chunk_index == current['last_index'] + 1:
+                remainder = strip_overlap(current['content'], result['content'])
+                # A found overlap ends exactly where the text continues
+                separator = "" if len(remainder) < len(result['content']) else " "
+                current['content'] += separator + remainder
+                current['last_index'] = chunk_index
+                current['chunks'] += 1
+                current['relevance_score'] = max(current['relevance_score'], result['relevance_score'])
+                if position < current['position']:
+                    # The block is cited with its best-ranked chunk's metadata
+                    current['position'] = position
+                    current['metadata'] = result['metadata']
+                continue
+            
+            current = {
+                'content': result['content'],
+                'metadata': result['metadata'],
+                'relevance_score': result['relevance_score'],
+                'chunks': 1,
+                'position': position,
+                'last_index': chunk_index
+            }
+            blocks.append(current)
+    
+    blocks.sort(key=lambda block: block['position'])
+    
+    return [
+        {key: value for key, value in block.items() if key not in ('position', 'last_index')}
+        for block in blocks
+    ]
 
 
-# Singleton instance
-_retriever = None
+def pack_context(blocks: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Greedily fit ranked blocks into a context token budget
+    
+    Blocks are taken best first. One that does not fit whole is cut at a
+    sentence boundary to the remaining budget (and marked 'truncated');
+    if not even one sentence fits it is skipped and smaller blocks
+    further down may still be packed.
+    
+    Args:
+        blocks: Context blocks (merge_adjacent_chunks() format), best first
+        max_tokens: Token budget for the formatted context
+    
+    Returns:
+        Blocks that fit, in rank order
+    """
+    separator_tokens = count_tokens("\n\n")
+    packed = []
+    remaining = max_tokens
+    
+    for block in blocks:
+        # Cost of the entry exactly as _format_context() renders it
+        header_tokens = count_tokens(f"[Source {len(packed) + 1}]\n") + count_tokens("\n")
+        if packed:
+            header_tokens += separator_tokens
+        
+        budget = remaining - header_tokens
+        if budget <= 0:
+            break
+        
+        content = block['content']
+        content_tokens = count_tokens(content)
+        if content_tokens > budget:
+            content = truncate_to_tokens(content, budget)
+            if not content:
+                continue
+            block = {**block, 'content': content, 'truncated': True}
+            content_tokens = count_tokens(content)
+        
+        packed.append(block)
+        remaining -= header_tokens + content_tokens
+    
+    return packed
 
 
-def get_retriever() -> DocumentRetriever:
-    """Get or create retriever singleton"""
-    global _retriever
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = None) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists with reciprocal-rank fusion
+    
+    Args:
+        rankings: ID lists, best first
+        k: Rank smoothing constant (default from config)
+    
+    Returns:
+        (ID, fused score) pairs, best first
+    """
+    k = k if k is not None else Config.RRF_K
+    scores = {}
+    
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def upstream_relevance(results: List[Dict]) -> Optional[np.ndarray]:
+    """
+    Relevance of ranked candidates from their rerank or RRF scores
     
-    if _retriever is None:
-        _retriever = DocumentRetriever()
+    Scores are min-max scaled to [0, 1] so they are on the same scale as
+    the cosine similarities MMR subtracts for redundancy.
     
-    return _retriever
+    Args:
+        results: Candidates, best first
+    
+    Returns:
+        One relevance value per candidate, or None if the candidates carry
+        no upstream score (dense-only retrieval)
+    """
+    for field in ('rerank_score', 'rrf_score'):
+        if results and all(field in result for result in results):
+            scores = np.array([result[field] for result in results], dtype=np.float32)
+            spread = float(scores.max() - scores.min())
+            if spread == 0.0:
+                return np.ones(len(scores), dtype=np.float32)
+            return (scores - scores.min()) / spread
+    return None
+
+
+def mmr_select(query_embedding: np.ndarray, embeddings: np.ndarray, k: int,
+               lambda_mult: float = None, relevance: np.ndarray = None) -> List[int]:
+    """
+    Maximal Marginal Relevance selection over unit-length embeddings
+    
+    Each step picks the candidate maximizing
+    lambda * relevance(d) - (1 - lambda) * max sim(d, already selected).
+    
+    Args:
+        query_embedding: Query embedding
+        embeddings: Candidate embeddings (n, dim)
+        k: Number of candidates to select
+        lambda_mult: Relevance/diversity trade-off, 1.0 = pure relevance
+            (default from config)
+        relevance: Relevance per candidate on a [0, 1] scale, e.g. from
+            upstream_relevance() (default: cosine similarity to the query)
+    
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    lambda_mult = lambda_mult if lambda_mult is not None else Config.MMR_LAMBDA
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    
+    if relevance is None:
+        relevance = embeddings @ np.asarray(query_embedding, dtype=np.float32)
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = embeddings @ embeddings.T
+    
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = np.zeros(len(embeddings), dtype=np.float32)
+    available = np.ones(len(embeddings), dtype=bool)
+    selected = []
+    
+    for _ in range(min(k, len(embeddings))):
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    
+    return selected
+
+
+def get_retriever() -> DocumentRetriever:
+    """Get or create retriever singleton (shared, thread-safe)"""
+    return get_registry().get("retriever", DocumentRetriever)
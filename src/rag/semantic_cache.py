@@ -0,0 +1,164 @@
+"""
+Semantic Query Cache
+Reuses retrieval results for paraphrased queries
+"""
+
+from typing import Dict, List, Optional
+from collections import deque
+from pathlib import Path
+import sys
+import threading
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.utils.logger import setup_logger
+from src.rag.kb_version import read_kb_version
+
+logger = setup_logger("semantic_cache")
+
+
+class SemanticQueryCache:
+    """
+    In-memory cache of recent query embeddings and their search results
+
+    A lookup hits when a cached query with the same filters (and at least
+    as many results) lies within max_distance cosine distance. The cache
+    holds a few hundred entries, so one exact matrix-vector product over
+    the ring buffer is cheaper than maintaining an ANN structure.
+    """
+
+    def __init__(self, max_entries: int = None, max_distance: float = None):
+        """
+        Initialize semantic cache
+
+        Args:
+            max_entries: Ring buffer size (default from config)
+            max_distance: Max cosine distance for a hit (default from config)
+        """
+        self.max_entries = max_entries or Config.SEMANTIC_CACHE_SIZE
+        self.max_distance = (
+            max_distance if max_distance is not None else Config.SEMANTIC_CACHE_MAX_DISTANCE
+        )
+
+        self._lock = threading.Lock()
+        self._hit_distances = deque(maxlen=1000)
+        self.stats = {
+            'hits': 0,
+            'misses': 0
+        }
+        self._clear()
+
+    def _clear(self):
+        """Drop all entries"""
+        self._embeddings = None
+        self._filter_keys = np.empty(self.max_entries, dtype=object)
+        self._top_ks = np.zeros(self.max_entries, dtype=np.int32)
+        self._results = [None] * self.max_entries
+        self._size = 0
+        self._next = 0
+        self._kb_version = read_kb_version()
+
+    def _check_version(self):
+        """Clear the cache when a new knowledge base build lands"""
+        if read_kb_version() != self._kb_version:
+            logger.info("Knowledge base changed, clearing semantic cache")
+            self._clear()
+
+    def lookup(self, embedding: np.ndarray, filter_key: str,
+               top_k: int) -> Optional[List[Dict]]:
+        """
+        Find cached results for a semantically equivalent query
+
+        Args:
+            embedding: Query embedding
+            filter_key: Canonical representation of the search filters
+            top_k: Number of results needed
+
+        Returns:
+            Cached results (first top_k) or None on a miss
+        """
+        with self._lock:
+            self._check_version()
+
+            if self._size == 0:
+                self.stats['misses'] += 1
+                return None
+
+            # Query embeddings are unit-length, so the dot product is cosine
+            query = np.asarray(embedding, dtype=np.float32)
+            similarities = self._embeddings[:self._size] @ query
+
+            eligible = (
+                (self._filter_keys[:self._size] == filter_key)
+                & (self._top_ks[:self._size] >= top_k)
+            )
+            similarities = np.where(eligible, similarities, -np.inf)
+
+            best = int(np.argmax(similarities))
+            distance = 1.0 - float(similarities[best])
+
+            if distance > self.max_distance:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self._hit_distances.append(distance)
+            return list(self._results[best][:top_k])
+
+    def add(self, embedding: np.ndarray, filter_key: str, top_k: int,
+            results: List[Dict]):
+        """
+        Remember the results of a query
+
+        Args:
+            embedding: Query embedding
+            filter_key: Canonical representation of the search filters
+            top_k: Number of results requested
+            results: Search results
+        """
+        with self._lock:
+            query = np.asarray(embedding, dtype=np.float32)
+
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.max_entries, len(query)), dtype=np.float32)
+
+            slot = self._next
+            self._embeddings[slot] = query
+            self._filter_keys[slot] = filter_key
+            self._top_ks[slot] = top_k
+            self._results[slot] = list(results)
+
+            self._next = (self._next + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def get_stats(self) -> Dict:
+        """Hit rate and distance distribution of hits, for threshold tuning"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            distances = np.array(self._hit_distances)
+
+            stats = {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0,
+                'size': self._size,
+                'max_distance': self.max_distance
+            }
+
+            if len(distances):
+                stats['hit_distance'] = {
+                    'p50': round(float(np.percentile(distances, 50)), 4),
+                    'p90': round(float(np.percentile(distances, 90)), 4),
+                    'max': round(float(distances.max()), 4)
+                }
+                counts, edges = np.histogram(
+                    distances, bins=5, range=(0.0, max(self.max_distance, 1e-6))
+                )
+                stats['hit_distance_histogram'] = {
+                    f"{edges[i]:.3f}-{edges[i + 1]:.3f}": int(counts[i])
+                    for i in range(len(counts))
+                }
+
+            return stats
@@ -0,0 +1,248 @@
+"""
+Index Snapshots
+Export a built index to one checksummed archive and restore it without re-embedding
+"""
+
+from typing import Dict
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import io
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.logger import setup_logger
+from src.rag.kb_version import read_kb_version_info, write_kb_version
+from src.rag.bm25_index import BM25Index, get_bm25_index_path
+
+logger = setup_logger("snapshot")
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Older formats that read_snapshot() still accepts
+READABLE_FORMAT_VERSIONS = (1, 2)
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.json"
+BM25_FILE = "bm25.npz"
+
+SUPPORTED_DTYPES = ('float16', 'float32')
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def export_snapshot(store, path: str, dtype: str = "float16") -> Dict:
+    """
+    Write every chunk of a vector store to a snapshot archive
+
+    The archive is a zip holding the embedding matrix (.npy), the IDs,
+    documents and metadata (JSON), the BM25 index when the build wrote
+    one, and a manifest with the model name, knowledge-base version and
+    a SHA-256 per member.
+
+    Args:
+        store: Any vector store with export_records()
+        path: Output archive path
+        dtype: Vector precision, 'float16' (half the size) or 'float32'
+
+    Returns:
+        The snapshot manifest
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported snapshot dtype: {dtype}")
+
+    records = store.export_records()
+    vectors = np.ascontiguousarray(records['embeddings'], dtype=dtype)
+
+    vectors_buffer = io.BytesIO()
+    np.save(vectors_buffer, vectors)
+    members = {
+        VECTORS_FILE: vectors_buffer.getvalue(),
+        RECORDS_FILE: json.dumps({
+            'ids': records['ids'],
+            'documents': records['documents'],
+            'metadatas': records['metadatas']
+        }, ensure_ascii=False).encode('utf-8')
+    }
+
+    bm25_path = get_bm25_index_path(store.collection_name)
+    if bm25_path.exists():
+        members[BM25_FILE] = bm25_path.read_bytes()
+
+    manifest = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'collection_name': store.collection_name,
+        'embedding_model': store.embedding_generator.model_name,
+        'embedding_model_id': store.embedding_generator.cache_model_id,
+        'embedding_dimension': int(vectors.shape[1]),
+        'dtype': dtype,
+        'document_count': len(records['ids']),
+        'kb_version': read_kb_version_info(),
+        'checksums': {name: _sha256(data) for name, data in members.items()}
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with zipfile.ZipFile(tmp_path, 'w') as archive:
+        # Vectors barely compress, JSON compresses well
+        archive.writestr(VECTORS_FILE, members[VECTORS_FILE], zipfile.ZIP_STORED)
+        archive.writestr(RECORDS_FILE, members[RECORDS_FILE], zipfile.ZIP_DEFLATED)
+        if BM25_FILE in members:
+            # Already a compressed .npz
+            archive.writestr(BM25_FILE, members[BM25_FILE], zipfile.ZIP_STORED)
+        archive.writestr(MANIFEST_FILE, json.dumps(manifest, indent=2), zipfile.ZIP_DEFLATED)
+    os.replace(tmp_path, path)
+
+    logger.info(f"✅ Exported {manifest['document_count']} records to {path} ({dtype})")
+    return manifest
+
+
+def read_snapshot(path: str) -> Dict:
+    """
+    Read and verify a snapshot archive
+
+    Args:
+        path: Archive path
+
+    Returns:
+        Dictionary with 'manifest', 'ids', 'embeddings' (float32, float16
+        archives re-normalized to unit length),
+        'documents', 'metadatas' and 'bm25' (the .npz bytes, or None)
+
+    Raises:
+        ValueError: If the archive is corrupt or from an unknown format
+    """
+    with zipfile.ZipFile(path, 'r') as archive:
+        manifest = json.loads(archive.read(MANIFEST_FILE))
+        if manifest.get('format_version') not in READABLE_FORMAT_VERSIONS:
+            raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+
+        members = {}
+        for name, expected in manifest['checksums'].items():
+            data = archive.read(name)
+            if _sha256(data) != expected:
+                raise ValueError(f"Checksum mismatch for {name} in {path}")
+            members[name] = data
+
+    vectors = np.load(io.BytesIO(members[VECTORS_FILE]), allow_pickle=False)
+    records = json.loads(members[RECORDS_FILE])
+
+    if len(vectors) != len(records['ids']):
+        raise ValueError(f"Snapshot {path} has {len(vectors)} vectors for {len(records['ids'])} IDs")
+
+    embeddings = vectors.astype(np.float32)
+    if vectors.dtype == np.float16:
+        # Rounding to half precision moves rows slightly off unit length;
+        # restore it so cosine scores match the exporting build
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms > 0, norms, 1.0)
+
+    return {
+        'manifest': manifest,
+        'ids': records['ids'],
+        'embeddings': embeddings,
+        'documents': records['documents'],
+        'metadatas': records['metadatas'],
+        'bm25': members.get(BM25_FILE)
+    }
+
+
+def _restore_bm25_index(store, snapshot: Dict, merge: bool):
+    """
+    Install the BM25 index matching the restored store
+
+    The archived index is used when the store now holds exactly the
+    snapshot; after a merge, or for archives without one, it is rebuilt
+    from the stored chunks (this takes seconds, no embedding involved).
+    """
+    path = get_bm25_index_path(store.collection_name)
+
+    if snapshot['bm25'] is not None and not merge:
+        index = BM25Index.load(io.BytesIO(snapshot['bm25']))
+    else:
+        records = store.get_documents(store.list_ids())
+        index = BM25Index.build(
+            [record['id'] for record in records],
+            [record['document'] for record in records],
+            [record['metadata'] for record in records]
+        )
+
+    index.save(path)
+
+
+def import_snapshot(store, path: str, merge: bool = False) -> Dict:
+    """
+    Restore a snapshot into a vector store without re-embedding
+
+    The embedding model, backend and precision (the generator's
+    cache_model_id) must match the ones the store encodes queries with.
+    By default chunks missing from the snapshot are deleted, so the store
+    holds exactly the snapshot and its knowledge-base version is stamped
+    locally; every replica restored from it reports the same build. The
+    BM25 index is restored (or rebuilt) before the version is stamped, so
+    retrievers reload both together.
+
+    Args:
+        store: Any vector store with add_records(), list_ids() and delete_records()
+        path: Archive path
+        merge: Keep chunks that are not in the snapshot (a new local
+            version is stamped, since the store no longer matches any build)
+
+    Returns:
+        The snapshot manifest plus 'removed_count'
+    """
+    snapshot = read_snapshot(path)
+    manifest = snapshot['manifest']
+
+    model_id = store.embedding_generator.cache_model_id
+    snapshot_model_id = manifest.get('embedding_model_id')
+    if snapshot_model_id is None:
+        raise ValueError(
+            f"Snapshot {path} does not record its embedding backend; re-export it"
+        )
+    if snapshot_model_id != model_id:
+        raise ValueError(
+            f"Snapshot was built with {snapshot_model_id}, "
+            f"but the configured embedding model is {model_id}"
+        )
+
+    store.add_records(
+        snapshot['ids'],
+        snapshot['embeddings'],
+        snapshot['documents'],
+        snapshot['metadatas']
+    )
+
+    stale = []
+    if not merge:
+        restored = set(snapshot['ids'])
+        stale = [doc_id for doc_id in store.list_ids() if doc_id not in restored]
+        if stale:
+            store.delete_records(stale)
+            logger.info(f"Removed {len(stale)} chunks not in the snapshot")
+
+    _restore_bm25_index(store, snapshot, merge)
+
+    version_info = dict(manifest.get('kb_version') or {})
+    version_info.pop('built_at', None)
+    version_info.pop('embedding_model', None)
+    snapshot_version = version_info.pop('version', None)
+    write_kb_version(
+        version=None if merge else snapshot_version,
+        **{**version_info, 'restored_from': str(path), 'merged': merge}
+    )
+
+    logger.info(f"✅ Imported {manifest['document_count']} records from {path}")
+    return {**manifest, 'removed_count': len(stale)}
@@ -1,40 +1,80 @@
 """
 Vector Store using ChromaDB
-Stores and retrieves document embeddings
+Stores and retrieves document embeddings; create_vector_store picks the
+backend configured by VECTOR_DB_TYPE
 """
 
 from typing import List, Dict, Optional, Any
-import chromadb
-from chromadb.config import Settings
 from pathlib import Path
+import numpy as np
+import hashlib
+import json
+import queue
 import sys
+import threading
+import time
 import uuid
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
 from src.utils.logger import setup_logger
+from src.utils.service_registry import get_registry
+from src.rag.kb_version import read_kb_version
 from src.rag.embeddings import get_embedding_generator
 
 logger = setup_logger("vector_store")
 
+# Distance used by every backend: 1 - dot product of unit-length embeddings
+DISTANCE_METRIC = "cosine"
+
 
 class VectorStore:
     """ChromaDB-based vector store for document retrieval"""
     
-    def __init__(self, collection_name: str = "university_docs"):
+    def __init__(self, collection_name: str = "university_docs", read_only: bool = None):
         """
         Initialize vector store
         
         Args:
             collection_name: Name of the collection
+            read_only: Open an existing collection for serving only and refuse
+                writes (default Config.VECTOR_DB_READ_ONLY)
         """
         self.collection_name = collection_name
+        self.read_only = Config.VECTOR_DB_READ_ONLY if read_only is None else read_only
+        self.last_write_timings = {}
+        
+        self._reload_lock = threading.Lock()
         
         # Initialize ChromaDB
-        logger.info(f"Initializing ChromaDB at {Config.CHROMADB_PATH}")
+        mode = " (read-only)" if self.read_only else ""
+        logger.info(f"Initializing ChromaDB at {Config.CHROMADB_PATH}{mode}")
         
         try:
+            self._open()
+            logger.info(f"✅ Collection '{collection_name}' ready")
+            logger.info(f"   Current document count: {self.collection.count()}")
+            
+        except Exception as e:
+            logger.error(f"Error initializing ChromaDB: {e}")
+            raise
+        
+        # Get embedding generator
+        self.embedding_generator = get_embedding_generator()
+    
+    def _open(self):
+        """Open the client and collection and note the build they serve"""
+        # Imported here so importing this module stays cheap
+        import chromadb
+        from chromadb.config import Settings
+        
+        # Read before opening so a build stamped meanwhile triggers another reload
+        self._kb_version = read_kb_version()
+        
+        if self.read_only:
+            self.client = _read_only_client(Config.CHROMADB_PATH, self._kb_version)
+        else:
             self.client = chromadb.PersistentClient(
                 path=Config.CHROMADB_PATH,
                 settings=Settings(
@@ -42,22 +82,53 @@ class VectorStore:
                     allow_reset=True
                 )
             )
-            
-            # Get or create collection
+        
+        if self.read_only:
+            # Serving processes never create collections; fail if none was built
+            self.collection = self.client.get_collection(name=self.collection_name)
+        else:
+            # Get or create collection (cosine space over unit embeddings)
             self.collection = self.client.get_or_create_collection(
-                name=collection_name,
-                metadata={"description": "University documents and handbooks"}
+                name=self.collection_name,
+                metadata={
+                    "description": "University documents and handbooks",
+                    "hnsw:space": DISTANCE_METRIC
+                }
             )
-            
-            logger.info(f"✅ Collection '{collection_name}' ready")
-            logger.info(f"   Current document count: {self.collection.count()}")
-            
-        except Exception as e:
-            logger.error(f"Error initializing ChromaDB: {e}")
-            raise
         
-        # Get embedding generator
-        self.embedding_generator = get_embedding_generator()
+        # The space is fixed at creation; older collections use Chroma's L2 default
+        self.distance_metric = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        if self.distance_metric != DISTANCE_METRIC:
+            logger.warning(
+                f"Collection '{self.collection_name}' uses {self.distance_metric} distance; "
+                "rebuild the knowledge base to switch to cosine"
+            )
+    
+    def _refresh_if_stale(self):
+        """
+        Reopen a read-only collection once a new build has been stamped
+        
+        The client for the new version is shared by every store on the
+        path (see _read_only_client), so the partitions of a partitioned
+        store reload onto one System and searches still running on the
+        old one finish undisturbed.
+        """
+        if not self.read_only or read_kb_version() == self._kb_version:
+            return
+        
+        with self._reload_lock:
+            if read_kb_version() == self._kb_version:
+                return
+            
+            logger.info(f"Knowledge base version changed, reopening '{self.collection_name}'")
+            self._open()
+    
+    def _check_writable(self):
+        """Refuse writes on a read-only store"""
+        if self.read_only:
+            raise RuntimeError(
+                f"Vector store '{self.collection_name}' is read-only (VECTOR_DB_READ_ONLY=true)"
+            )
     
     def add_documents(self, documents: List[Dict], batch_size: int = 100):
         """
@@ -67,6 +138,7 @@ class VectorStore:
             documents: List of document dictionaries with 'content' and 'metadata'
             batch_size: Batch size for adding documents
         """
+        self._check_writable()
         if not documents:
             logger.warning("No documents to add")
             return
@@ -74,45 +146,7 @@ class VectorStore:
         logger.info(f"Adding {len(documents)} documents to vector store...")
         
         try:
-            # Process in batches
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                
-                # Prepare data
-                ids = []
-                texts = []
-                metadatas = []
-                
-                for doc in batch:
-                    # Generate unique ID
-                    doc_id = doc.get('id') or str(uuid.uuid4())
-                    ids.append(doc_id)
-                    
-                    # Get text content
-                    text = doc.get('content', '')
-                    texts.append(text)
-                    
-                    # Get metadata
-                    metadata = doc.get('metadata', {})
-                    # Convert all metadata values to strings (ChromaDB requirement)
-                    metadata = {k: str(v) for k, v in metadata.items()}
-                    metadatas.append(metadata)
-                
-                # Generate embeddings
-                embeddings = self.embedding_generator.generate_embeddings(
-                    texts,
-                    show_progress=False
-                )
-                
-                # Add to collection
-                self.collection.add(
-                    ids=ids,
-                    embeddings=embeddings.tolist(),
-                    documents=texts,
-                    metadatas=metadatas
-                )
-                
-                logger.info(f"  Added batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}")
+            self._write_documents(documents, batch_size, self.collection.add)
             
             logger.info(f"✅ Successfully added {len(documents)} documents")
             logger.info(f"   Total documents in collection: {self.collection.count()}")
@@ -121,6 +155,79 @@ class VectorStore:
             logger.error(f"Error adding documents: {e}")
             raise
     
+    def _write_documents(self, documents: List[Dict], batch_size: int, write):
+        """
+        Embed and write documents with overlapping encode/persist stages
+        
+        Args:
+            documents: List of document dictionaries with 'content' and 'metadata'
+            batch_size: Batch size for embedding and writing
+            write: collection.add or collection.upsert
+        """
+        def write_batch(ids, texts, metadatas, embeddings):
+            # Chroma accepts NumPy arrays directly, no list conversion needed
+            write(
+                ids=ids,
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas
+            )
+        
+        self.last_write_timings = pipelined_write(
+            documents, batch_size, self.embedding_generator, write_batch
+        )
+    
+    def sync_documents(self, documents: List[Dict], batch_size: int = 100) -> Dict[str, int]:
+        """
+        Incrementally bring the collection in line with a full document set
+        
+        New and changed chunks (by text and metadata hash) are embedded and upserted,
+        chunks whose ID no longer appears are deleted, the rest is untouched.
+        
+        Args:
+            documents: Complete list of documents with deterministic 'id's
+            batch_size: Batch size for embedding and writing
+        
+        Returns:
+            Counts of added, updated, removed and unchanged chunks
+        """
+        self._check_writable()
+        logger.info(f"Syncing {len(documents)} documents with collection...")
+        
+        try:
+            existing = self.collection.get(include=['metadatas'])
+            existing_hashes = {
+                doc_id: (metadata or {}).get('content_hash')
+                for doc_id, metadata in zip(existing['ids'], existing['metadatas'])
+            }
+            
+            diff = diff_documents(documents, existing_hashes)
+            
+            if diff['removed_ids']:
+                for i in range(0, len(diff['removed_ids']), batch_size):
+                    self.collection.delete(ids=diff['removed_ids'][i:i + batch_size])
+            
+            changed = diff['added'] + diff['updated']
+            if changed:
+                self._write_documents(changed, batch_size, self.collection.upsert)
+            
+            counts = {
+                'added': len(diff['added']),
+                'updated': len(diff['updated']),
+                'removed': len(diff['removed_ids']),
+                'unchanged': diff['unchanged']
+            }
+            logger.info(
+                f"✅ Sync complete: {counts['added']} added, {counts['updated']} updated, "
+                f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+            )
+            
+            return counts
+            
+        except Exception as e:
+            logger.error(f"Error syncing documents: {e}")
+            raise
+    
     def search(self, query: str, top_k: int = None, 
               filters: Dict[str, Any] = None) -> List[Dict]:
         """
@@ -134,49 +241,234 @@ class VectorStore:
         Returns:
             List of search results with documents and metadata
         """
-        top_k = top_k or Config.TOP_K_RESULTS
+        logger.info(f"Searching for: '{query}' (top_k={top_k or Config.TOP_K_RESULTS})")
+        
+        # Generate query embedding
+        query_embedding = self.embedding_generator.generate_embedding(query)
+        
+        return self.search_by_embedding(query_embedding, top_k, filters)
+    
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = None,
+                            filters: Dict[str, Any] = None,
+                            include_embeddings: bool = False) -> List[Dict]:
+        """
+        Search for similar documents with a precomputed query embedding
         
-        logger.info(f"Searching for: '{query}' (top_k={top_k})")
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            filters: Metadata filters (e.g., {'faculty': 'FTS'})
+            include_embeddings: Also return each result's stored 'embedding'
+        
+        Returns:
+            List of search results with documents and metadata
+        """
+        results = self.search_many_by_embedding(
+            [query_embedding], top_k, filters, include_embeddings
+        )[0]
+        logger.info(f"✅ Found {len(results)} results")
+        return results
+    
+    def search_many(self, queries: List[str], top_k: int = None,
+                    filters: Dict[str, Any] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once
+        
+        All queries are embedded in one batch and sent in one index query.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+        
+        Returns:
+            One result list per query, in the same format as search()
+        """
+        if not queries:
+            return []
+        
+        logger.info(f"Searching for {len(queries)} queries (top_k={top_k or Config.TOP_K_RESULTS})")
+        
+        query_embeddings = self.embedding_generator.generate_embeddings(
+            queries,
+            show_progress=False,
+            use_cache=False
+        )
+        
+        return self.search_many_by_embedding(query_embeddings, top_k, filters)
+    
+    def search_many_by_embedding(self, query_embeddings, top_k: int = None,
+                                 filters: Dict[str, Any] = None,
+                                 include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Search with several precomputed query embeddings in one index query
+        
+        Args:
+            query_embeddings: Array or list of query embedding vectors
+            top_k: Number of results per query
+            filters: Metadata filters applied to every query
+            include_embeddings: Also return each result's stored 'embedding'
+        
+        Returns:
+            One result list per query
+        """
+        top_k = top_k or Config.TOP_K_RESULTS
+        self._refresh_if_stale()
         
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_generator.generate_embedding(query)
-            
-            # Build where clause for filters
+            # Build where clause for filters (Chroma needs $and for several fields)
             where = None
-            if filters:
+            if filters and len(filters) > 1:
+                where = {'$and': [{key: value} for key, value in filters.items()]}
+            elif filters:
                 where = filters
             
+            include = ['documents', 'metadatas', 'distances']
+            if include_embeddings:
+                include.append('embeddings')
+            
             # Search
             results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
+                query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
                 n_results=top_k,
-                where=where
+                where=where,
+                include=include
             )
             
-            # Format results
-            formatted_results = []
+            # Format results per query
+            all_results = []
             
-            if results and results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
+            for q in range(len(results['ids'])):
+                formatted_results = []
+                for i in range(len(results['ids'][q])):
                     result = {
-                        'id': results['ids'][0][i],
-                        'document': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i],
-                        'distance': results['distances'][0][i] if 'distances' in results else None
+                        'id': results['ids'][q][i],
+                        'document': results['documents'][q][i],
+                        'metadata': results['metadatas'][q][i],
+                        'distance': results['distances'][q][i] if results.get('distances') else None
                     }
+                    if include_embeddings:
+                        result['embedding'] = np.asarray(results['embeddings'][q][i], dtype=np.float32)
                     formatted_results.append(result)
+                all_results.append(formatted_results)
             
-            logger.info(f"✅ Found {len(formatted_results)} results")
-            
-            return formatted_results
+            return all_results
             
         except Exception as e:
             logger.error(f"Error searching: {e}")
             raise
     
+    def get_documents(self, ids: List[str], include_embeddings: bool = False) -> List[Dict]:
+        """
+        Fetch stored chunks by ID
+        
+        Args:
+            ids: Chunk IDs
+            include_embeddings: Also return each chunk's stored 'embedding'
+        
+        Returns:
+            Results with 'id', 'document' and 'metadata', in the order of ids
+            (unknown IDs are skipped)
+        """
+        if not ids:
+            return []
+        
+        self._refresh_if_stale()
+        include = ['documents', 'metadatas']
+        if include_embeddings:
+            include.append('embeddings')
+        found = self.collection.get(ids=list(ids), include=include)
+        
+        by_id = {}
+        for i, doc_id in enumerate(found['ids']):
+            result = {
+                'id': doc_id,
+                'document': found['documents'][i],
+                'metadata': found['metadatas'][i]
+            }
+            if include_embeddings:
+                result['embedding'] = np.asarray(found['embeddings'][i], dtype=np.float32)
+            by_id[doc_id] = result
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+    
+    def export_records(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Read back every stored chunk with its embedding
+        
+        Args:
+            batch_size: Number of records fetched per request
+        
+        Returns:
+            Dictionary with 'ids', 'embeddings' (float32 array),
+            'documents' and 'metadatas'
+        """
+        self._refresh_if_stale()
+        records = {'ids': [], 'embeddings': [], 'documents': [], 'metadatas': []}
+        total = self.collection.count()
+        
+        for offset in range(0, total, batch_size):
+            batch = self.collection.get(
+                include=['embeddings', 'documents', 'metadatas'],
+                limit=batch_size,
+                offset=offset
+            )
+            records['ids'].extend(batch['ids'])
+            records['embeddings'].append(np.asarray(batch['embeddings'], dtype=np.float32))
+            records['documents'].extend(batch['documents'])
+            records['metadatas'].extend(batch['metadatas'])
+        
+        dim = self.embedding_generator.get_embedding_dim()
+        records['embeddings'] = (
+            np.concatenate(records['embeddings'], axis=0) if records['embeddings']
+            else np.empty((0, dim), dtype=np.float32)
+        )
+        return records
+    
+    def add_records(self, ids: List[str], embeddings: np.ndarray, documents: List[str],
+                    metadatas: List[Dict], batch_size: int = 1000):
+        """
+        Upsert precomputed records without re-embedding
+        
+        Args:
+            ids: Chunk IDs
+            embeddings: Embedding matrix, one row per chunk
+            documents: Chunk texts
+            metadatas: Chunk metadata
+        """
+        self._check_writable()
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        for i in range(0, len(ids), batch_size):
+            self.collection.upsert(
+                ids=ids[i:i + batch_size],
+                embeddings=embeddings[i:i + batch_size],
+                documents=documents[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size]
+            )
+        
+        logger.info(f"✅ Restored {len(ids)} records")
+    
+    def list_ids(self) -> List[str]:
+        """IDs of every stored chunk"""
+        self._refresh_if_stale()
+        return self.collection.get(include=[])['ids']
+    
+    def delete_records(self, ids: List[str], batch_size: int = 1000):
+        """
+        Delete chunks by ID
+        
+        Args:
+            ids: Chunk IDs (unknown IDs are ignored)
+            batch_size: Number of IDs per delete request
+        """
+        self._check_writable()
+        ids = list(ids)
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i:i + batch_size])
+    
     def delete_collection(self):
         """Delete the entire collection"""
+        self._check_writable()
         logger.warning(f"Deleting collection '{self.collection_name}'")
         try:
             self.client.delete_collection(self.collection_name)
@@ -187,22 +479,286 @@ class VectorStore:
     
     def get_stats(self) -> Dict:
         """Get collection statistics"""
+        self._refresh_if_stale()
         return {
             'collection_name': self.collection_name,
             'document_count': self.collection.count(),
-            'embedding_dimension': self.embedding_generator.get_embedding_dim()
+            'embedding_dimension': self.embedding_generator.get_embedding_dim(),
+            'distance_metric': self.distance_metric
         }
 
 
-# Singleton instance
-_vector_store = None
+# Read-only Chroma client per path: (knowledge base version, client)
+_read_only_clients = {}
+_read_only_clients_lock = threading.Lock()
 
 
-def get_vector_store() -> VectorStore:
-    """Get or create vector store singleton"""
-    global _vector_store
+def _read_only_client(path: str, version: str):
+    """
+    Chroma client serving one build of the index at path
+    
+    All read-only stores on the path share it. The first store to see a
+    new version replaces it once: the old System is only dropped from
+    Chroma's per-path cache, never stopped, so queries holding it keep
+    working until they finish, and the new client loads fresh segments.
+    """
+    # Imported here so importing this module stays cheap
+    import chromadb
+    from chromadb.config import Settings
+    
+    with _read_only_clients_lock:
+        cached = _read_only_clients.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        if cached is not None:
+            old_client = cached[1]
+            systems = getattr(type(old_client), '_identifier_to_system', None)
+            identifier = getattr(old_client, '_identifier', None)
+            if isinstance(systems, dict):
+                systems.pop(identifier, None)
+        
+        client = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(anonymized_telemetry=False, allow_reset=False)
+        )
+        _read_only_clients[path] = (version, client)
+        return client
+
+
+def content_hash(text: str) -> str:
+    """Short, stable hash of chunk text"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def record_hash(text: str, metadata: Dict) -> str:
+    """
+    Short, stable hash of chunk text and metadata
     
-    if _vector_store is None:
-        _vector_store = VectorStore()
+    Stored as the chunk's 'content_hash', so a sync also rewrites chunks
+    whose title, faculty or URL changed while the text did not.
+    """
+    fields = {k: str(v) for k, v in metadata.items() if k != 'content_hash'}
+    payload = json.dumps([text, fields], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def make_chunk_id(source_key: str, chunk_index: int) -> str:
+    """
+    Deterministic chunk ID from its source and position
     
-    return _vector_store
+    Args:
+        source_key: URL, source file (and page) or content hash of the source
+        chunk_index: Position of the chunk within its source
+    
+    Returns:
+        ID that stays stable across rebuilds
+    """
+    source_hash = hashlib.sha1(source_key.encode('utf-8')).hexdigest()[:16]
+    return f"{source_hash}-{chunk_index:04d}"
+
+
+def prepare_records(documents: List[Dict]):
+    """
+    Split documents into parallel ID, text and metadata lists
+    
+    Args:
+        documents: List of document dictionaries with 'content' and 'metadata'
+    
+    Returns:
+        Tuple of (ids, texts, metadatas)
+    """
+    ids = []
+    texts = []
+    metadatas = []
+    
+    for doc in documents:
+        # Use the deterministic ID when the builder assigned one
+        doc_id = doc.get('id') or str(uuid.uuid4())
+        ids.append(doc_id)
+        
+        # Get text content
+        text = doc.get('content', '')
+        texts.append(text)
+        
+        # Get metadata
+        metadata = doc.get('metadata', {})
+        # Convert all metadata values to strings (ChromaDB requirement)
+        metadata = {k: str(v) for k, v in metadata.items()}
+        metadata.setdefault('content_hash', record_hash(text, metadata))
+        metadatas.append(metadata)
+    
+    return ids, texts, metadatas
+
+
+def diff_documents(documents: List[Dict], existing_hashes: Dict[str, Optional[str]]) -> Dict:
+    """
+    Compare a full document set with what is already stored
+    
+    Args:
+        documents: Documents with deterministic 'id's
+        existing_hashes: Stored chunk ID -> content_hash
+    
+    Returns:
+        Dictionary with 'added' and 'updated' documents, 'removed_ids'
+        and the 'unchanged' count
+    """
+    added = []
+    updated = []
+    unchanged = 0
+    seen = set()
+    
+    for doc in documents:
+        doc_id = doc['id']
+        seen.add(doc_id)
+        
+        if doc_id not in existing_hashes:
+            added.append(doc)
+        elif existing_hashes[doc_id] != record_hash(doc.get('content', ''), doc.get('metadata', {})):
+            updated.append(doc)
+        else:
+            unchanged += 1
+    
+    removed_ids = [doc_id for doc_id in existing_hashes if doc_id not in seen]
+    
+    return {
+        'added': added,
+        'updated': updated,
+        'removed_ids': removed_ids,
+        'unchanged': unchanged
+    }
+
+
+def pipelined_write(documents: List[Dict], batch_size: int, embedding_generator,
+                    write_batch, queue_size: int = None) -> Dict[str, float]:
+    """
+    Embed batches on a producer thread while the caller persists them
+    
+    The producer encodes batch N+1 while write_batch stores batch N. The
+    bounded queue applies back-pressure so at most queue_size encoded
+    batches wait in memory when writes are the slower stage.
+    
+    Args:
+        documents: List of document dictionaries with 'content' and 'metadata'
+        batch_size: Batch size for embedding and writing
+        embedding_generator: EmbeddingGenerator used for encoding
+        write_batch: Callable(ids, texts, metadatas, embeddings) persisting one batch
+        queue_size: Max encoded batches waiting to be written (default from config)
+    
+    Returns:
+        Seconds spent per stage, wall-clock total and number of batches
+    """
+    queue_size = queue_size or Config.WRITE_PIPELINE_DEPTH
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+    num_batches = (len(documents) - 1) // batch_size + 1 if documents else 0
+    timings = {
+        'embed_seconds': 0.0,
+        'write_seconds': 0.0,
+        'wait_seconds': 0.0,
+        'total_seconds': 0.0,
+        'batches': num_batches
+    }
+    
+    def put(item) -> bool:
+        # Poll so a failed consumer can stop a producer blocked on a full queue
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for i in range(0, len(documents), batch_size):
+                ids, texts, metadatas = prepare_records(documents[i:i + batch_size])
+                
+                start = time.perf_counter()
+                embeddings = embedding_generator.generate_embeddings(
+                    texts,
+                    show_progress=False
+                )
+                timings['embed_seconds'] += time.perf_counter() - start
+                
+                if not put((ids, texts, metadatas, embeddings)):
+                    return
+            put(done)
+        except BaseException as e:
+            put(e)
+    
+    total_start = time.perf_counter()
+    producer = threading.Thread(target=produce, name="embed-producer", daemon=True)
+    producer.start()
+    
+    try:
+        for batch_number in range(1, num_batches + 2):
+            start = time.perf_counter()
+            item = batches.get()
+            timings['wait_seconds'] += time.perf_counter() - start
+            
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            
+            start = time.perf_counter()
+            write_batch(*item)
+            timings['write_seconds'] += time.perf_counter() - start
+            
+            logger.info(f"  Wrote batch {batch_number}/{num_batches}")
+    finally:
+        stop.set()
+        producer.join()
+    
+    timings['total_seconds'] = time.perf_counter() - total_start
+    timings = {
+        key: round(value, 3) if isinstance(value, float) else value
+        for key, value in timings.items()
+    }
+    logger.info(
+        f"Write pipeline: embed {timings['embed_seconds']}s, write {timings['write_seconds']}s, "
+        f"total {timings['total_seconds']}s"
+    )
+    
+    return timings
+
+
+def create_vector_store(collection_name: str = "university_docs", partitioned: bool = None,
+                        read_only: bool = None):
+    """
+    Create the vector store backend selected by Config.VECTOR_DB_TYPE
+    
+    Args:
+        collection_name: Name of the collection
+        partitioned: Split into per-faculty/source partitions
+            (default Config.VECTOR_DB_PARTITIONED)
+        read_only: Serve an existing index and refuse writes
+            (default Config.VECTOR_DB_READ_ONLY)
+    
+    Returns:
+        VectorStore (chromadb), NumpyVectorStore (numpy) or a
+        PartitionedVectorStore over either
+    """
+    if partitioned is None:
+        partitioned = Config.VECTOR_DB_PARTITIONED
+    
+    if partitioned:
+        from src.rag.partitioned_store import PartitionedVectorStore
+        return PartitionedVectorStore(collection_name, read_only=read_only)
+    
+    if Config.VECTOR_DB_TYPE == "chromadb":
+        return VectorStore(collection_name, read_only=read_only)
+    
+    if Config.VECTOR_DB_TYPE == "numpy":
+        from src.rag.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(collection_name, read_only=read_only)
+    
+    raise ValueError(f"Unknown vector database type: {Config.VECTOR_DB_TYPE}")
+
+
+def get_vector_store() -> VectorStore:
+    """Get or create vector store singleton (shared, thread-safe)"""
+    return get_registry().get("vector_store", create_vector_store)
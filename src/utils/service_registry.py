@@ -0,0 +1,95 @@
+"""
+Service Registry
+Process-wide, thread-safe home for the shared RAG components
+"""
+
+from typing import Any, Callable, Dict
+import threading
+import time
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger("service_registry")
+
+
+class ServiceRegistry:
+    """
+    Create each named service exactly once per process
+
+    Every service has its own lock, so concurrent first requests wait for
+    a single initialization instead of building duplicates, while a
+    factory may still fetch other services (e.g. the retriever asking for
+    the vector store) without deadlocking.
+    """
+
+    def __init__(self):
+        """Initialize empty registry"""
+        self._services = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        self._timings = {}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Get a service, creating it with factory on first use
+
+        Args:
+            name: Service name
+            factory: Zero-argument callable that builds the service
+
+        Returns:
+            The shared service instance
+        """
+        service = self._services.get(name)
+        if service is not None:
+            return service
+
+        with self._registry_lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            service = self._services.get(name)
+            if service is not None:
+                return service
+
+            start = time.perf_counter()
+            service = factory()
+            elapsed = time.perf_counter() - start
+
+            self._services[name] = service
+            self._timings[name] = round(elapsed, 3)
+            logger.info(f"Initialized {name} in {elapsed:.2f}s")
+
+            return service
+
+    def is_initialized(self, name: str) -> bool:
+        """Whether a service has been created"""
+        return name in self._services
+
+    def reset(self, name: str = None):
+        """
+        Drop a service (or all services) so the next get() rebuilds it
+
+        Args:
+            name: Service name, or None for everything
+        """
+        with self._registry_lock:
+            if name is None:
+                self._services.clear()
+                self._timings.clear()
+            else:
+                self._services.pop(name, None)
+                self._timings.pop(name, None)
+
+    def get_timings(self) -> Dict[str, float]:
+        """Initialization time in seconds per service (includes nested services)"""
+        return self._timings.copy()
+
+
+# Process-wide registry
+_registry = ServiceRegistry()
+
+
+def get_registry() -> ServiceRegistry:
+    """Get the process-wide service registry"""
+    return _registry
@@ -0,0 +1,38 @@
+"""
+Text helpers shared across the RAG pipeline
+"""
+
+from typing import List
+import re
+
+# Sentence end: terminal punctuation (optionally closed by a quote or
+# bracket) followed by whitespace, or a line break
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"')\]])\s+|\n+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for use as a cache key
+
+    Collapses runs of whitespace and folds case.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Normalized text
+    """
+    return " ".join(text.split()).casefold()
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences
+
+    Args:
+        text: Input text
+
+    Returns:
+        Non-empty sentences with surrounding whitespace removed
+    """
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
@@ -0,0 +1,87 @@
+"""
+Shared test setup: repository root on the import path and a fake encoder
+"""
+
+from pathlib import Path
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import Config
+from src.rag.embeddings import EmbeddingGenerator
+
+
+@pytest.fixture(autouse=True)
+def isolated_kb_version(tmp_path, monkeypatch):
+    """Keep version stamps and BM25 indexes written by tests out of the real data directory"""
+    monkeypatch.setattr(Config, "KB_VERSION_PATH", str(tmp_path / "kb_version.json"))
+    monkeypatch.setattr(Config, "BM25_INDEX_DIR", str(tmp_path / "bm25_index"))
+
+
+class FakeEncoder:
+    """
+    Deterministic stand-in for a sentence-transformers model
+
+    Embeds text as normalized character-trigram hash counts, so similar
+    texts get similar vectors. Records every call to encode().
+    """
+
+    dim = 32
+    max_seq_length = 128
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for i in range(max(1, len(text) - 2)):
+            vector[zlib.crc32(text[i:i + 3].encode()) % self.dim] += 1.0
+        return vector
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False,
+               convert_to_numpy=True, normalize_embeddings=False):
+        self.calls.append(texts)
+        single = isinstance(texts, str)
+        vectors = np.stack([self._embed(t) for t in ([texts] if single else texts)])
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[0] if single else vectors
+
+    def token_lengths(self, texts):
+        return np.array([min(len(t.split()) + 2, self.max_seq_length) for t in texts])
+
+
+@pytest.fixture
+def make_generator(monkeypatch):
+    """Factory for EmbeddingGenerators backed by FakeEncoder"""
+    monkeypatch.setattr(EmbeddingGenerator, "_load_model", lambda self: FakeEncoder())
+
+    def make(**kwargs):
+        kwargs.setdefault('model_name', "fake-model")
+        kwargs.setdefault('use_cache', False)
+        return EmbeddingGenerator(**kwargs)
+
+    return make
+
+
+@pytest.fixture
+def fake_generator(make_generator):
+    """EmbeddingGenerator backed by FakeEncoder, without the disk cache"""
+    return make_generator(query_cache_size=2)
+
+
+@pytest.fixture
+def numpy_index_dir(tmp_path, monkeypatch, fake_generator):
+    """Temporary NUMPY_INDEX_PATH with stores using the fake generator"""
+    from src.rag import numpy_store
+
+    monkeypatch.setattr(Config, "NUMPY_INDEX_PATH", str(tmp_path / "numpy_index"))
+    monkeypatch.setattr(numpy_store, "get_embedding_generator", lambda: fake_generator)
+    return tmp_path / "numpy_index"
@@ -0,0 +1,68 @@
+"""
+Tests for streaming fallback between LLM providers
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm.api_manager import LLMAPIManager
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))], usage=None)
+
+
+class StubClient:
+    """Chat client whose stream yields the given deltas, then optionally fails"""
+
+    def __init__(self, deltas, error=None):
+        self.deltas = deltas
+        self.error = error
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+
+        def stream():
+            for delta in self.deltas:
+                yield _chunk(delta)
+            if self.error is not None:
+                raise self.error
+
+        return stream()
+
+
+def _manager(groq, openai):
+    manager = LLMAPIManager.__new__(LLMAPIManager)
+    manager.groq_client = groq
+    manager.openai_client = openai
+    manager.stats = {'groq_calls': 0, 'openai_calls': 0, 'groq_errors': 0, 'openai_errors': 0}
+    return manager
+
+
+def test_falls_back_when_primary_fails_before_first_token():
+    groq = StubClient([], error=RuntimeError("rate limited"))
+    openai = StubClient(["Hello", " there"])
+    manager = _manager(groq, openai)
+
+    events = list(manager.generate_stream([{'role': 'user', 'content': "hi"}]))
+
+    assert [e['content'] for e in events if e['type'] == 'delta'] == ["Hello", " there"]
+    assert events[-1]['provider'] == "openai"
+    assert manager.stats['groq_errors'] == 1 and manager.stats['openai_calls'] == 1
+
+
+def test_raises_when_primary_fails_after_first_token():
+    groq = StubClient(["Partial"], error=RuntimeError("connection reset"))
+    openai = StubClient(["Should not be used"])
+    manager = _manager(groq, openai)
+
+    stream = manager.generate_stream([{'role': 'user', 'content': "hi"}])
+    assert next(stream) == {'type': 'delta', 'content': "Partial"}
+    with pytest.raises(RuntimeError, match="connection reset"):
+        next(stream)
+
+    # Mixing two providers' text in one answer is never attempted
+    assert openai.calls == 0
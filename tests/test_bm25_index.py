@@ -0,0 +1,59 @@
+"""
+Tests for the BM25 sparse index
+"""
+
+import pytest
+
+from src.rag.bm25_index import BM25Index, tokenize
+
+IDS = ["a", "b", "c", "d"]
+TEXTS = [
+    "Room DICT1234 is on the second floor",
+    "The library opens at eight",
+    "Library cards are issued at the library desk",
+    "Enrolment closes in August",
+]
+METADATAS = [
+    {'faculty': "FTS", 'source_type': "web"},
+    {'faculty': "FAS", 'source_type': "web"},
+    {'faculty': "FTS", 'source_type': "handbook_pdf"},
+    {'faculty': "FBS", 'source_type': "web"},
+]
+
+
+@pytest.fixture
+def index():
+    return BM25Index.build(IDS, TEXTS, METADATAS)
+
+
+def test_tokenize_keeps_codes_and_drops_stopwords():
+    assert tokenize("Where is DICT1234?") == ["dict1234"]
+
+
+def test_exact_term_match_ranks_first(index):
+    hits = index.search("dict1234", top_k=3)
+
+    assert [doc_id for doc_id, _ in hits] == ["a"]
+    assert hits[0][1] > 0
+
+
+def test_term_frequency_and_unmatched_chunks(index):
+    hits = index.search("library", top_k=4)
+
+    # Chunks without any query term are not returned
+    assert [doc_id for doc_id, _ in hits] == ["c", "b"]
+    assert hits[0][1] > hits[1][1] > 0
+
+
+def test_filters_restrict_rows(index):
+    assert [doc_id for doc_id, _ in index.search("library", 4, {'faculty': "FAS"})] == ["b"]
+    assert index.search("library", 4, {'source_type': "pdf"}) == []
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = tmp_path / "bm25" / "kb.npz"
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    assert loaded.ids == IDS
+    assert loaded.search("library", 4, {'faculty': "FTS"}) == index.search("library", 4, {'faculty': "FTS"})
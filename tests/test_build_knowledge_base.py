@@ -0,0 +1,50 @@
+"""
+Tests for the knowledge-base builder's version stamping
+"""
+
+from pathlib import Path
+import importlib
+import sys
+
+import pytest
+
+from src.rag.kb_version import read_kb_version
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+builder_module = importlib.import_module("04_build_knowledge_base")
+
+
+class FakeStore:
+    def get_stats(self):
+        return {'document_count': 10}
+
+
+@pytest.fixture
+def builder():
+    instance = builder_module.KnowledgeBaseBuilder()
+    instance.vector_store = FakeStore()
+    return instance
+
+
+def test_first_build_is_stamped(builder):
+    assert builder.stamp_version(rebuild=False)
+    assert read_kb_version() != 'unversioned'
+
+
+def test_no_op_sync_keeps_version(builder):
+    builder.stamp_version(rebuild=True)
+    version = read_kb_version()
+
+    builder.stats.update(added=0, updated=0, removed=0, unchanged=10)
+    assert not builder.stamp_version(rebuild=False)
+    assert read_kb_version() == version
+
+
+@pytest.mark.parametrize("changed", ['added', 'updated', 'removed'])
+def test_any_change_stamps_new_version(builder, changed):
+    builder.stamp_version(rebuild=True)
+    version = read_kb_version()
+
+    builder.stats[changed] = 1
+    assert builder.stamp_version(rebuild=False)
+    assert read_kb_version() != version
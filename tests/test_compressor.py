@@ -0,0 +1,62 @@
+"""
+Tests for query-focused context compression
+"""
+
+import numpy as np
+import pytest
+
+from src.config import Config
+
+from src.rag.compressor import ContextCompressor, GAP_MARKER
+
+SENTENCES = [f"Sentence number {name} is here." for name in
+             ["one", "two", "three", "four", "five", "six", "seven"]]
+
+
+class KeywordGenerator:
+    """Embeds sentences containing the keyword along the query axis"""
+
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def generate_embeddings(self, texts, show_progress=False, use_cache=True):
+        return np.array([[1.0, 0.0] if self.keyword in text else [0.0, 1.0] for text in texts],
+                        dtype=np.float32)
+
+
+QUERY = np.array([1.0, 0.0], dtype=np.float32)
+
+
+def _compress(keyword, sentences=SENTENCES):
+    compressor = ContextCompressor(KeywordGenerator(keyword), sentences_per_block=1, neighbors=1)
+    return compressor.compress(QUERY, [{'content': " ".join(sentences), 'metadata': {}}])[0]['content']
+
+
+def test_middle_match_marks_both_cut_ends():
+    assert _compress("four") == (
+        GAP_MARKER.lstrip() + " ".join(SENTENCES[2:5]) + GAP_MARKER.rstrip()
+    )
+
+
+@pytest.mark.parametrize("keyword, expected", [
+    ("one", " ".join(SENTENCES[:2]) + GAP_MARKER.rstrip()),
+    ("seven", GAP_MARKER.lstrip() + " ".join(SENTENCES[5:])),
+])
+def test_only_the_cut_end_is_marked(keyword, expected):
+    assert _compress(keyword) == expected
+
+
+def test_short_blocks_are_left_alone():
+    assert _compress("two", SENTENCES[:3]) == " ".join(SENTENCES[:3])
+
+
+def test_block_under_worst_case_size_is_trimmed(monkeypatch):
+    monkeypatch.setattr(Config, "COMPRESSION_SENTENCES", 4)
+    monkeypatch.setattr(Config, "COMPRESSION_NEIGHBORS", 1)
+    sentences = [f"Fact {index} about the library." for index in range(4)] + SENTENCES[:4]
+    compressor = ContextCompressor(KeywordGenerator("library"))
+
+    # 8 sentences is under 4 * (2 * 1 + 1), but the overlapping windows only cover 5
+    block = compressor.compress(QUERY, [{'content': " ".join(sentences), 'metadata': {}}])[0]
+
+    assert block['content'] == " ".join(sentences[:5]) + GAP_MARKER.rstrip()
@@ -0,0 +1,114 @@
+"""
+Tests for the persistent embedding cache
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.rag.embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).random((n, DIM), dtype=np.float32)
+
+
+def _append_from_process(cache_dir: str, worker: int) -> None:
+    """Pool target: add 50 worker-specific embeddings in small batches"""
+    cache = EmbeddingCache("model", DIM, cache_dir=cache_dir)
+    texts = [f"worker {worker} text {i}" for i in range(50)]
+    vectors = np.full((50, DIM), worker, dtype=np.float32) + np.arange(50)[:, None]
+    for start in range(0, 50, 5):
+        keys = [cache.make_key(t) for t in texts[start:start + 5]]
+        cache.add_many(keys, vectors[start:start + 5])
+
+
+def test_round_trip_and_reload(tmp_path):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    keys = [cache.make_key(f"text {i}") for i in range(3)]
+    vectors = _vectors(3, 0)
+
+    assert cache.get_many(keys) == [None, None, None]
+    cache.add_many(keys, vectors)
+
+    reopened = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(np.stack(reopened.get_many(keys)), vectors)
+
+
+def test_duplicate_keys_are_stored_once(tmp_path):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    key = cache.make_key("same")
+    cache.add_many([key, key], _vectors(2, 1))
+    cache.add_many([key], _vectors(1, 2))
+
+    assert len(cache) == 1
+    assert cache._num_stored_rows() == 1
+
+
+def test_other_model_or_dim_starts_empty(tmp_path):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    cache.add_many([cache.make_key("a")], _vectors(1, 3))
+
+    assert len(EmbeddingCache("model", DIM * 2, cache_dir=str(tmp_path))) == 0
+
+
+def test_torn_index_line_is_ignored(tmp_path):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    first, second = cache.make_key("first"), cache.make_key("second")
+    cache.add_many([first], _vectors(1, 4))
+
+    # Simulate a crash in the middle of writing an index line
+    with open(cache.index_path, 'ab') as f:
+        f.write(second[:20].encode('ascii'))
+
+    reopened = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    assert len(reopened) == 1
+    reopened.add_many([second], _vectors(1, 5))
+
+    again = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    assert len(again) == 2
+    np.testing.assert_array_equal(again.get_many([second])[0], _vectors(1, 5)[0])
+
+
+def test_torn_vector_row_is_overwritten(tmp_path):
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    first, second = cache.make_key("first"), cache.make_key("second")
+    cache.add_many([first], np.full((1, DIM), 1, dtype=np.float32))
+
+    # Simulate a crash in the middle of writing a vector
+    with open(cache.vectors_path, 'ab') as f:
+        f.write(np.full(DIM // 2, 9, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    reopened.add_many([second], np.full((1, DIM), 2, dtype=np.float32))
+
+    again = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    assert again._num_stored_rows() == 2
+    np.testing.assert_array_equal(again.get_many([second])[0], np.full(DIM, 2, dtype=np.float32))
+    np.testing.assert_array_equal(again.get_many([first])[0], np.full(DIM, 1, dtype=np.float32))
+
+
+def test_concurrent_processes_keep_rows_aligned(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_append_from_process, [str(tmp_path)] * 4, range(4)))
+
+    cache = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    assert len(cache) == 200
+    assert cache._num_stored_rows() == 200
+
+    for worker in range(4):
+        keys = [cache.make_key(f"worker {worker} text {i}") for i in range(50)]
+        expected = np.full((50, DIM), worker, dtype=np.float32) + np.arange(50)[:, None]
+        np.testing.assert_array_equal(np.stack(cache.get_many(keys)), expected)
+
+
+def test_sees_entries_added_by_another_instance(tmp_path):
+    reader = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    writer = EmbeddingCache("model", DIM, cache_dir=str(tmp_path))
+    key = writer.make_key("late")
+    writer.add_many([key], _vectors(1, 6))
+
+    np.testing.assert_array_equal(reader.get_many([key])[0], _vectors(1, 6)[0])
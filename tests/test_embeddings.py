@@ -0,0 +1,116 @@
+"""
+Tests for the embedding generator: query cache, bucketing, pool order and cache ids
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.rag import embeddings
+
+
+def test_query_cache_hits_on_normalized_text(fake_generator):
+    first = fake_generator.generate_embedding("What  programs are offered?")
+    second = fake_generator.generate_embedding("what programs are OFFERED?")
+
+    np.testing.assert_array_equal(first, second)
+    assert fake_generator.query_cache_stats == {'hits': 1, 'misses': 1}
+
+
+def test_model_encodes_original_text(fake_generator):
+    fake_generator.generate_embedding("Faculty of  Technological Studies")
+
+    assert fake_generator.model.calls == ["Faculty of  Technological Studies"]
+
+
+def test_query_cache_is_bounded_lru(fake_generator):
+    for text in ("a query", "b query", "a query", "c query"):
+        fake_generator.generate_embedding(text)
+
+    # Capacity 2: "b query" was least recently used when "c query" arrived
+    assert list(fake_generator._query_cache) == ["a query", "c query"]
+
+
+def test_returned_embedding_is_a_copy(fake_generator):
+    embedding = fake_generator.generate_embedding("copy me")
+    embedding[:] = 0.0
+
+    assert np.any(fake_generator.generate_embedding("copy me"))
+
+
+def test_length_bucketing_only_for_onnx(make_generator, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_LENGTH_BUCKETING", True)
+
+    assert not make_generator(backend="torch").length_bucketing
+    assert make_generator(backend="onnx").length_bucketing
+
+
+def test_bucketed_encode_keeps_input_order(fake_generator):
+    texts = [" ".join(["word"] * n) + f" {n}" for n in (9, 1, 5, 12, 3, 7)]
+    fake_generator.length_bucketing = True
+
+    bucketed = fake_generator.generate_embeddings(texts, batch_size=2, show_progress=False,
+                                                  use_cache=False)
+
+    # Batches were formed from length-sorted texts
+    batches = fake_generator.model.calls
+    assert [len(t.split()) for batch in batches for t in batch] == sorted(
+        len(t.split()) for t in texts
+    )
+
+    fake_generator.length_bucketing = False
+    plain = fake_generator.generate_embeddings(texts, batch_size=2, show_progress=False,
+                                               use_cache=False)
+    np.testing.assert_allclose(bucketed, plain)
+
+
+def test_cache_model_id_covers_backend_and_normalization(make_generator, monkeypatch):
+    monkeypatch.setattr(Config, "ONNX_QUANTIZED", True)
+
+    assert make_generator(backend="torch").cache_model_id == "fake-model-norm"
+    assert make_generator(backend="onnx").cache_model_id == "fake-model-onnx-int8-norm"
+
+
+class OutOfOrderPool:
+    """Executor whose map() finishes later shards first but yields in submission order"""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.shards = []
+
+    def map(self, function, shards, batch_sizes):
+        shards = list(shards)
+        self.shards = shards
+
+        def run(index, shard, batch_size):
+            # Earlier shards sleep longest, so completion order is reversed
+            time.sleep(0.02 * (len(shards) - index))
+            return function(shard, batch_size)
+
+        return self.executor.map(run, range(len(shards)), shards, batch_sizes)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+@pytest.mark.parametrize("backend", ["torch", "onnx"])
+def test_pool_results_keep_input_order(make_generator, monkeypatch, backend):
+    monkeypatch.setattr(Config, "EMBEDDING_LENGTH_BUCKETING", True)
+    generator = make_generator(backend=backend)
+    monkeypatch.setattr(embeddings, "_worker_generator", generator, raising=False)
+    texts = [f"text {i} " + "word " * ((i * 7) % 13) for i in range(40)]
+    expected = generator.model.encode(texts, normalize_embeddings=True)
+
+    pool = OutOfOrderPool()
+    generator._pool = pool
+    generator.start_pool(4)
+    try:
+        result = generator.generate_embeddings(texts, batch_size=8, show_progress=False)
+    finally:
+        generator.stop_pool()
+
+    assert len(pool.shards) == 4
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
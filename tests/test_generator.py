@@ -0,0 +1,146 @@
+"""
+Tests for generator warm-up, response caching and the context budget
+"""
+
+import time
+
+import pytest
+
+from src.rag import generator
+
+
+@pytest.fixture
+def fresh_warm_up(monkeypatch):
+    monkeypatch.setattr(generator, "_warm_up_thread", None)
+    monkeypatch.setattr(generator, "_warm_up_error", None)
+    monkeypatch.setattr(generator, "_warm_up_timings", {})
+
+
+def test_warm_up_failure_is_recorded(fresh_warm_up, monkeypatch):
+    def fail():
+        raise RuntimeError("collection missing")
+
+    monkeypatch.setattr(generator, "warm_up", fail)
+    generator.start_background_warm_up().join(5)
+
+    assert str(generator.get_warm_up_error()) == "collection missing"
+    assert generator.get_warm_up_timings() == {}
+
+
+def test_warm_up_success_records_timings(fresh_warm_up, monkeypatch):
+    monkeypatch.setattr(generator, "warm_up", lambda: {'total_seconds': 1.5})
+    generator.start_background_warm_up().join(5)
+
+    assert generator.get_warm_up_error() is None
+    assert generator.get_warm_up_timings() == {'total_seconds': 1.5}
+
+
+class FakeApiManager:
+    def get_primary_model(self):
+        return "primary-model"
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = {}
+
+    def set(self, key, response):
+        self.stored[key] = response
+
+
+@pytest.fixture
+def bare_generator():
+    """ResponseGenerator with only the parts the cache helpers use"""
+    instance = generator.ResponseGenerator.__new__(generator.ResponseGenerator)
+    instance.api_manager = FakeApiManager()
+    instance.response_cache = RecordingCache()
+    return instance
+
+
+def test_primary_model_answer_is_cached(bare_generator):
+    bare_generator._store_cached("key", {'answer': "a", 'metadata': {'model': "primary-model"}})
+
+    assert "key" in bare_generator.response_cache.stored
+
+
+def test_fallback_answer_is_not_cached_under_primary_key(bare_generator):
+    bare_generator._store_cached("key", {'answer': "a", 'metadata': {'model': "fallback-model"}})
+
+    assert bare_generator.response_cache.stored == {}
+
+
+class BudgetApiManager:
+    def get_prompt_token_budget(self):
+        return 4000
+
+
+@pytest.fixture
+def budget_generator(monkeypatch):
+    monkeypatch.setattr(generator.Config, "LLM_MAX_TOKENS", 1000)
+    monkeypatch.setattr(generator, "count_tokens", lambda text: 0)
+    instance = generator.ResponseGenerator.__new__(generator.ResponseGenerator)
+    instance.api_manager = BudgetApiManager()
+    instance.system_prompt = ""
+    return instance
+
+
+def test_context_budget_reserves_answer_tokens(budget_generator, monkeypatch):
+    monkeypatch.setattr(generator, "token_counts_are_exact", lambda: True)
+
+    assert budget_generator._context_token_budget("q") == 3000
+
+
+def test_context_budget_keeps_margin_for_estimates(budget_generator, monkeypatch):
+    monkeypatch.setattr(generator, "token_counts_are_exact", lambda: False)
+
+    assert budget_generator._context_token_budget("q") == int(3000 * generator.ESTIMATE_SAFETY_FACTOR)
+
+
+class StreamingApiManager:
+    def get_primary_model(self):
+        return "primary-model"
+
+    def generate_stream(self, messages, temperature, max_tokens):
+        yield {'type': 'delta', 'content': "Answer"}
+        yield {'type': 'done', 'model': "primary-model", 'provider': "groq", 'usage': {}}
+
+
+class MemoryCache:
+    def __init__(self):
+        self.stored = {}
+
+    def get(self, key):
+        return self.stored.get(key)
+
+    def set(self, key, response):
+        self.stored[key] = response
+
+
+@pytest.fixture
+def streaming_generator(monkeypatch):
+    instance = generator.ResponseGenerator.__new__(generator.ResponseGenerator)
+    instance.api_manager = StreamingApiManager()
+    instance.response_cache = MemoryCache()
+    instance._first_query_done = True
+    monkeypatch.setattr(instance, "_cache_key", lambda *args: "key")
+
+    def slow_retrieval(query, faculty, top_k):
+        time.sleep(0.05)
+        return [], [], 0
+
+    monkeypatch.setattr(instance, "_prepare_messages", slow_retrieval)
+    return instance
+
+
+def test_time_to_first_token_includes_retrieval(streaming_generator):
+    events = list(streaming_generator.generate_stream("q"))
+
+    assert events[-1]['metadata']['time_to_first_token'] >= 0.05
+
+
+def test_cache_hit_time_to_first_token_uses_same_start(streaming_generator):
+    list(streaming_generator.generate_stream("q"))
+    events = list(streaming_generator.generate_stream("q"))
+
+    # Served from the cache: no retrieval, so far below the live answer's time
+    assert events[-1]['metadata']['time_to_first_token'] < 0.05
@@ -0,0 +1,201 @@
+"""
+Tests for the NumPy exact-search vector store
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.rag.kb_version import write_kb_version
+from src.rag.numpy_store import NumpyVectorStore, CURRENT_FILE, VECTORS_FILE, quantize_int8
+
+DIM = 4
+
+
+def _records(n, seed=0, faculty_cycle=("FTS", "FAS")):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"doc-{i}" for i in range(n)]
+    documents = [f"text {i}" for i in range(n)]
+    metadatas = [
+        {'faculty': faculty_cycle[i % len(faculty_cycle)],
+         'source_type': "web" if i % 3 else "handbook_pdf",
+         'title': f"T{i}"}
+        for i in range(n)
+    ]
+    return ids, vectors, documents, metadatas
+
+
+@pytest.fixture
+def store(numpy_index_dir):
+    instance = NumpyVectorStore("test", read_only=False, quantization="none")
+    ids, vectors, documents, metadatas = _records(12)
+    instance.add_records(ids, vectors, documents, metadatas)
+    return instance
+
+
+def test_exact_search_returns_nearest(store):
+    ids, vectors, _, _ = _records(12)
+    results = store.search_by_embedding(vectors[5], top_k=3)
+
+    assert results[0]['id'] == "doc-5"
+    assert results[0]['distance'] == pytest.approx(0.0, abs=1e-5)
+    assert [r['distance'] for r in results] == sorted(r['distance'] for r in results)
+
+
+def test_reload_from_disk(store):
+    reopened = NumpyVectorStore("test", read_only=True, quantization="none")
+
+    assert reopened.get_stats()['document_count'] == 12
+    assert reopened.get_documents(["doc-3"])[0]['metadata']['title'] == "T3"
+
+
+def test_equality_and_and_filters(store):
+    _, vectors, _, metadatas = _records(12)
+
+    fts = store.search_by_embedding(vectors[0], top_k=12, filters={'faculty': "FTS"})
+    assert {r['metadata']['faculty'] for r in fts} == {"FTS"}
+    assert len(fts) == 6
+
+    both = store.search_by_embedding(vectors[0], top_k=12, filters={
+        '$and': [{'faculty': "FTS"}, {'source_type': "handbook_pdf"}]
+    })
+    expected = {
+        f"doc-{i}" for i, m in enumerate(metadatas)
+        if m['faculty'] == "FTS" and m['source_type'] == "handbook_pdf"
+    }
+    assert {r['id'] for r in both} == expected
+
+    # Non-column fields fall back to a metadata scan
+    titled = store.search_by_embedding(vectors[0], top_k=12, filters={'title': "T7"})
+    assert [r['id'] for r in titled] == ["doc-7"]
+
+
+def test_upsert_overwrites_and_delete_removes(store):
+    store.add_records(["doc-0"], np.eye(DIM, dtype=np.float32)[:1], ["changed"], [{'faculty': "FBS"}])
+    store._delete(["doc-1"])
+
+    reopened = NumpyVectorStore("test", read_only=True, quantization="none")
+    assert reopened.get_stats()['document_count'] == 11
+    assert reopened.get_documents(["doc-0"])[0]['document'] == "changed"
+    assert reopened.get_documents(["doc-1"]) == []
+
+
+def test_read_only_store_reloads_on_new_build(store):
+    write_kb_version("v1")
+    reader = NumpyVectorStore("test", read_only=True, quantization="none")
+    store._delete(["doc-4"])
+
+    # Unstamped writes stay invisible until the build is stamped
+    assert reader.get_stats()['document_count'] == 12
+
+    write_kb_version("v2")
+    assert reader.get_stats()['document_count'] == 11
+    assert "doc-4" not in reader.list_ids()
+
+
+def test_saves_switch_generations_atomically(store, numpy_index_dir):
+    collection_dir = numpy_index_dir / "test"
+    first = (collection_dir / CURRENT_FILE).read_text()
+
+    # A reader that resolved the old generation can still load it
+    old_dir = collection_dir / first
+    store._delete(["doc-2"])
+    second = (collection_dir / CURRENT_FILE).read_text()
+    assert second != first
+    assert old_dir.exists()
+
+    store._delete(["doc-3"])
+    generations = sorted(p.name for p in collection_dir.iterdir() if p.is_dir())
+    assert first not in generations
+    assert len(generations) == 2
+
+    # Every file of the live generation describes the same rows
+    live = collection_dir / (collection_dir / CURRENT_FILE).read_text()
+    records = json.loads((live / "records.json").read_text())
+    assert len(np.load(live / VECTORS_FILE)) == len(records['documents']) == 10
+
+
+def test_legacy_layout_loads_and_migrates(store, numpy_index_dir):
+    collection_dir = numpy_index_dir / "test"
+    live = collection_dir / (collection_dir / CURRENT_FILE).read_text()
+
+    # Rewrite as the pre-generation layout: files directly in the collection dir
+    for path in live.iterdir():
+        path.rename(collection_dir / path.name)
+    live.rmdir()
+    (collection_dir / CURRENT_FILE).unlink()
+
+    legacy = NumpyVectorStore("test", read_only=False, quantization="none")
+    assert legacy.get_stats()['document_count'] == 12
+
+    legacy._delete(["doc-0"])
+    assert (collection_dir / CURRENT_FILE).exists()
+    assert not (collection_dir / VECTORS_FILE).exists()
+    assert NumpyVectorStore("test", read_only=True).get_stats()['document_count'] == 11
+
+
+def test_quantize_int8_round_trips_within_one_step():
+    _, vectors, _, _ = _records(50, seed=3)
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8 and scales.shape == (DIM,)
+    assert np.abs(codes.astype(np.float32) * scales - vectors).max() <= scales.max() / 2 + 1e-6
+
+    # All-zero columns get a unit scale instead of dividing by zero
+    codes, scales = quantize_int8(np.zeros((3, DIM), dtype=np.float32))
+    assert not codes.any() and np.all(scales == 1.0)
+
+
+def test_int8_search_matches_exact_top_k(numpy_index_dir, monkeypatch):
+    monkeypatch.setattr(Config, "NUMPY_RESCORE_FACTOR", 4)
+    ids, vectors, documents, metadatas = _records(200, seed=7)
+    exact = NumpyVectorStore("exact", read_only=False, quantization="none")
+    quantized = NumpyVectorStore("int8", read_only=False, quantization="int8")
+    exact.add_records(ids, vectors, documents, metadatas)
+    quantized.add_records(ids, vectors, documents, metadatas)
+
+    queries = _records(5, seed=11)[1]
+    expected = exact.search_many_by_embedding(queries, top_k=5, filters={'faculty': "FAS"})
+    found = quantized.search_many_by_embedding(queries, top_k=5, filters={'faculty': "FAS"})
+
+    for want, got in zip(expected, found):
+        assert [r['id'] for r in got] == [r['id'] for r in want]
+        # Shortlisted rows are re-scored with the float vectors
+        assert [r['distance'] for r in got] == pytest.approx([r['distance'] for r in want], abs=1e-5)
+
+
+def test_int8_search_on_empty_index(numpy_index_dir):
+    quantized = NumpyVectorStore("empty", read_only=False, quantization="int8")
+
+    assert quantized.search_many_by_embedding(np.ones((2, DIM), dtype=np.float32)) == [[], []]
+
+
+def test_search_many_matches_single_searches(numpy_index_dir, fake_generator):
+    store = NumpyVectorStore("batched", read_only=False, quantization="none")
+    texts = [f"{topic} rules for {faculty} students" for topic in ("exam", "library", "fees", "hostel")
+             for faculty in ("FTS", "FAS", "FBS")]
+    store.add_records(
+        [f"doc-{i}" for i in range(len(texts))],
+        fake_generator.generate_embeddings(texts, show_progress=False),
+        texts,
+        [{'faculty': text.split()[-2], 'source_type': "web"} for text in texts]
+    )
+    queries = ["exam rules", "library hours", "hostel fees"]
+
+    for filters in (None, {'faculty': "FAS"}, {'faculty': "FTS", 'source_type': "web"}):
+        batched = store.search_many(queries, top_k=4, filters=filters)
+        single = [
+            store.search_by_embedding(fake_generator.generate_embedding(query), 4, filters)
+            for query in queries
+        ]
+        assert [[r['id'] for r in results] for results in batched] == \
+            [[r['id'] for r in results] for results in single]
+        for batch_results, single_results in zip(batched, single):
+            assert [r['distance'] for r in batch_results] == \
+                pytest.approx([r['distance'] for r in single_results], abs=1e-5)
+
+    assert store.search_many([]) == []
@@ -0,0 +1,81 @@
+"""
+Tests for the ONNX encoder's pooling and normalization (stub session and tokenizer)
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.rag.onnx_encoder import OnnxEncoder
+
+DIM = 3
+
+
+class StubTokenizer:
+    """One token per word (id = word length), padded to the longest text"""
+
+    def encode_batch(self, texts):
+        ids = [[len(word) for word in text.split()] for text in texts]
+        width = max(len(row) for row in ids)
+        return [
+            SimpleNamespace(ids=row + [0] * (width - len(row)),
+                            attention_mask=[1] * len(row) + [0] * (width - len(row)))
+            for row in ids
+        ]
+
+
+class StubSession:
+    """Token embedding [id, 2 * id, 1]; padding tokens get large values that pooling must ignore"""
+
+    def __init__(self):
+        self.feeds = []
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        ids = feeds['input_ids'].astype(np.float32)
+        token_embeddings = np.stack([ids, 2 * ids, np.ones_like(ids)], axis=-1)
+        token_embeddings[feeds['attention_mask'] == 0] = 100.0
+        return [token_embeddings]
+
+
+def make_encoder(normalize):
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder.config = {'normalize': normalize}
+    encoder.embedding_dim = DIM
+    encoder.normalize = normalize
+    encoder.tokenizer = StubTokenizer()
+    encoder.session = StubSession()
+    encoder.input_names = {'input_ids', 'attention_mask'}
+    return encoder
+
+
+def test_mean_pools_over_real_tokens_only():
+    encoder = make_encoder(normalize=False)
+
+    embeddings = encoder.encode(["ab abcd", "abc"], batch_size=2)
+
+    np.testing.assert_allclose(embeddings, [[3.0, 6.0, 1.0], [3.0, 6.0, 1.0]])
+    # Inputs the graph does not declare are not fed
+    assert set(encoder.session.feeds[0]) == {'input_ids', 'attention_mask'}
+
+
+@pytest.mark.parametrize("normalize, force", [(True, False), (False, True)])
+def test_normalizes_when_configured_or_forced(normalize, force):
+    encoder = make_encoder(normalize)
+
+    embeddings = encoder.encode(["ab abcd", "a"], normalize_embeddings=force)
+
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
+
+
+def test_single_text_and_batching():
+    encoder = make_encoder(normalize=False)
+
+    single = encoder.encode("abc")
+    batched = encoder.encode(["abc", "ab", "abcd"], batch_size=2)
+
+    assert single.shape == (DIM,)
+    assert len(encoder.session.feeds) == 3
+    np.testing.assert_allclose(batched[0], single)
+    assert encoder.token_lengths(["a b c", "a"]).tolist() == [3, 1]
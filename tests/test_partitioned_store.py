@@ -0,0 +1,84 @@
+"""
+Tests for the partitioned vector store (over NumPy partitions)
+"""
+
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.rag import partitioned_store
+from src.rag.kb_version import write_kb_version
+from src.rag.partitioned_store import PartitionedVectorStore, partition_name
+
+DIM = 32
+
+
+@pytest.fixture
+def store(numpy_index_dir, tmp_path, monkeypatch, fake_generator):
+    monkeypatch.setattr(Config, "VECTOR_DB_TYPE", "numpy")
+    monkeypatch.setattr(Config, "PARTITION_MANIFEST_DIR", str(tmp_path / "partitions"))
+    monkeypatch.setattr(partitioned_store, "get_embedding_generator", lambda: fake_generator)
+
+    instance = PartitionedVectorStore("kb", read_only=False)
+    faculties = ["FTS", "FAS", "FTS", "FBS"]
+    vectors = np.eye(DIM, dtype=np.float32)[:len(faculties)]
+    instance.add_records(
+        [f"doc-{i}" for i in range(len(faculties))],
+        vectors,
+        [f"text {i}" for i in range(len(faculties))],
+        [{'faculty': faculty, 'source_type': "web"} for faculty in faculties]
+    )
+    return instance
+
+
+def test_partition_names_are_slugged():
+    assert partition_name("kb", "FTS", "faculty_web") == "kb-fts-faculty_web"
+    assert partition_name("kb", "", "Hand Book!") == "kb-none-hand_book"
+
+
+def test_records_are_routed_by_faculty(store):
+    assert store.get_stats()['partitions'] == {
+        "kb-fts-web": 2, "kb-fas-web": 1, "kb-fbs-web": 1
+    }
+
+    results = store.search_by_embedding(np.eye(DIM, dtype=np.float32)[2], top_k=4,
+                                        filters={'faculty': "FTS"})
+    assert [r['id'] for r in results] == ["doc-2", "doc-0"]
+
+
+def test_fan_out_merges_by_distance(store):
+    results = store.search_by_embedding(np.eye(DIM, dtype=np.float32)[3], top_k=2)
+
+    assert results[0]['id'] == "doc-3"
+    assert results[0]['distance'] <= results[1]['distance']
+
+
+def test_delete_records_updates_partitions(store):
+    store.delete_records(["doc-0", "doc-3", "unknown"])
+
+    assert sorted(store.list_ids()) == ["doc-1", "doc-2"]
+    assert store.get_stats()['partitions']["kb-fts-web"] == 1
+    assert store.get_stats()['partitions']["kb-fbs-web"] == 0
+
+
+def test_read_only_store_picks_up_new_partitions(store):
+    write_kb_version("v1")
+    reader = PartitionedVectorStore("kb", read_only=True)
+
+    store.add_records(["doc-9"], np.eye(DIM, dtype=np.float32)[9:10], ["text 9"],
+                      [{'faculty': "FEB", 'source_type': "web"}])
+    write_kb_version("v2")
+
+    assert "kb-feb-web" in reader.get_stats()['partitions']
+    results = reader.search_by_embedding(np.eye(DIM, dtype=np.float32)[9], top_k=1)
+    assert results[0]['id'] == "doc-9"
+
+
+def test_search_many_matches_single_searches(store):
+    queries = np.eye(DIM, dtype=np.float32)[[0, 2, 3]]
+
+    for filters in (None, {'faculty': "FTS"}):
+        batched = store.search_many_by_embedding(queries, top_k=2, filters=filters)
+        single = [store.search_by_embedding(query, 2, filters) for query in queries]
+        assert [[r['id'] for r in results] for results in batched] == \
+            [[r['id'] for r in results] for results in single]
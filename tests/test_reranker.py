@@ -0,0 +1,72 @@
+"""
+Tests for the cross-encoder reranker's cache and time budget
+"""
+
+import threading
+
+import pytest
+
+from src.rag.reranker import CrossEncoderReranker
+
+RESULTS = [
+    {'id': "a", 'document': "a"},
+    {'id': "b", 'document': "bb"},
+    {'id': "c", 'document': "ccc"},
+]
+
+
+class SlowCrossEncoder:
+    """Scores by document length once released; records every batch"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def predict(self, pairs, show_progress_bar=False):
+        self.batches.append(pairs)
+        self.release.wait(timeout=5)
+        return [len(text) for _, text in pairs]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    instance = SlowCrossEncoder()
+    monkeypatch.setattr(CrossEncoderReranker, "_load_model", lambda self: instance)
+    return instance
+
+
+def make_reranker(time_budget_ms):
+    reranker = CrossEncoderReranker(time_budget_ms=time_budget_ms)
+    # Queries arriving while the model loads fall back; wait for it here
+    reranker._in_flight.result(timeout=5)
+    return reranker
+
+
+def test_reranks_and_caches_scores(model):
+    model.release.set()
+    reranker = make_reranker(2000)
+
+    ranked = reranker.rerank("Query", RESULTS, top_n=2)
+    assert [r['id'] for r in ranked] == ["c", "b"]
+
+    reranker.rerank("query ", RESULTS, top_n=2)
+    assert len(model.batches) == 1
+    assert reranker.get_stats()['cached_pairs'] == 3
+
+
+def test_busy_worker_skips_instead_of_queueing(model):
+    reranker = make_reranker(20)
+
+    # The first batch overruns the budget and keeps running
+    assert [r['id'] for r in reranker.rerank("q1", RESULTS, top_n=2)] == ["a", "b"]
+
+    # Later queries fall back at once instead of queueing behind it
+    assert [r['id'] for r in reranker.rerank("q2", RESULTS, top_n=2)] == ["a", "b"]
+    assert len(model.batches) == 1
+    assert reranker.get_stats()['busy_skips'] == 1
+
+    model.release.set()
+    reranker._in_flight.result(timeout=5)
+
+    # The late batch still filled the cache
+    assert [r['id'] for r in reranker.rerank("q1", RESULTS, top_n=1)] == ["c"]
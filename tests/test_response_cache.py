@@ -0,0 +1,85 @@
+"""
+Tests for the SQLite response cache
+"""
+
+import pytest
+
+from src.rag import response_cache
+from src.rag.response_cache import ResponseCache
+
+
+@pytest.fixture
+def kb_version(monkeypatch):
+    """Mutable KB version seen by the cache"""
+    state = {'version': "v1"}
+    monkeypatch.setattr(response_cache, "read_kb_version", lambda: state['version'])
+    return state
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for TTL and LRU ordering"""
+    state = {'now': 1000.0}
+    monkeypatch.setattr(response_cache.time, "time", lambda: state['now'])
+    return state
+
+
+def _make_cache(tmp_path, **kwargs):
+    kwargs.setdefault('ttl_seconds', 100)
+    kwargs.setdefault('max_entries', 10)
+    return ResponseCache(db_path=tmp_path / "cache.sqlite3", **kwargs)
+
+
+def _key(cache, query, **overrides):
+    params = {'faculty': None, 'top_k': 5, 'temperature': 0.7, 'model': "m"}
+    params.update(overrides)
+    return cache.make_key(query, **params)
+
+
+def test_key_normalizes_query_and_separates_parameters(tmp_path, kb_version):
+    cache = _make_cache(tmp_path)
+
+    assert _key(cache, "How to  Apply?") == _key(cache, "how to apply?")
+    assert _key(cache, "q") != _key(cache, "q", faculty="FTS")
+    assert _key(cache, "q") != _key(cache, "q", model="other")
+
+
+def test_round_trip(tmp_path, kb_version, clock):
+    cache = _make_cache(tmp_path)
+    cache.set("k", {'answer': "yes"})
+
+    assert cache.get("k") == {'answer': "yes"}
+    assert cache.get("missing") is None
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_entries_expire_after_ttl(tmp_path, kb_version, clock):
+    cache = _make_cache(tmp_path, ttl_seconds=100)
+    cache.set("k", {'answer': "old"})
+
+    clock['now'] += 101
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, kb_version, clock):
+    cache = _make_cache(tmp_path, max_entries=2)
+    cache.set("a", {'n': 1})
+    clock['now'] += 1
+    cache.set("b", {'n': 2})
+    clock['now'] += 1
+    cache.get("a")
+    clock['now'] += 1
+    cache.set("c", {'n': 3})
+
+    assert cache.get("a") == {'n': 1}
+    assert cache.get("b") is None
+    assert cache.get("c") == {'n': 3}
+
+
+def test_new_kb_version_drops_entries(tmp_path, kb_version, clock):
+    cache = _make_cache(tmp_path)
+    cache.set("k", {'answer': "stale"})
+
+    kb_version['version'] = "v2"
+    assert cache.get("k") is None
+    assert cache.get_stats()['entries'] == 0
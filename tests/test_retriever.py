@@ -0,0 +1,212 @@
+"""
+Tests for retrieval helpers and the hybrid retriever
+"""
+
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.rag import retriever as retriever_module
+from src.rag.bm25_index import BM25Index, get_bm25_index_path
+from src.rag.numpy_store import NumpyVectorStore
+from src.rag.semantic_cache import SemanticQueryCache
+from src.rag.retriever import (
+    DocumentRetriever, merge_adjacent_chunks, mmr_select, reciprocal_rank_fusion,
+    strip_overlap, upstream_relevance
+)
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_rrf_of_single_ranking_keeps_order():
+    assert [doc_id for doc_id, _ in reciprocal_rank_fusion([["x", "y"]])] == ["x", "y"]
+
+
+def _unit(*rows):
+    vectors = np.array(rows, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_mmr_skips_near_duplicates():
+    query = _unit([1, 0, 0])[0]
+    # Two near-identical chunks closest to the query, one distinct chunk
+    embeddings = _unit([1, 0.1, 0], [1, 0.12, 0], [0.6, 0, 0.8])
+
+    assert mmr_select(query, embeddings, 2, lambda_mult=0.5) == [0, 2]
+    assert mmr_select(query, embeddings, 2, lambda_mult=1.0) == [0, 1]
+
+
+def test_mmr_uses_given_relevance():
+    query = _unit([1, 0, 0])[0]
+    embeddings = _unit([1, 0, 0], [0, 1, 0], [0, 0, 1])
+
+    # Upstream order wins over dense similarity to the query
+    assert mmr_select(query, embeddings, 3, lambda_mult=1.0,
+                      relevance=np.array([0.0, 1.0, 0.5])) == [1, 2, 0]
+    assert mmr_select(query, embeddings[:0], 3) == []
+
+
+def test_upstream_relevance_prefers_rerank_then_rrf():
+    reranked = [{'rerank_score': 4.0, 'rrf_score': 0.01}, {'rerank_score': -2.0, 'rrf_score': 0.03}]
+    fused = [{'rrf_score': 0.03}, {'rrf_score': 0.02}, {'rrf_score': 0.01}]
+
+    np.testing.assert_allclose(upstream_relevance(reranked), [1.0, 0.0])
+    np.testing.assert_allclose(upstream_relevance(fused), [1.0, 0.5, 0.0], atol=1e-6)
+    np.testing.assert_allclose(upstream_relevance([{'rrf_score': 0.1}] * 2), [1.0, 1.0])
+    assert upstream_relevance([{'distance': 0.2}]) is None
+
+
+@pytest.fixture
+def retriever(numpy_index_dir, fake_generator, monkeypatch):
+    monkeypatch.setattr(Config, "HYBRID_SEARCH_ENABLED", True)
+    monkeypatch.setattr(Config, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "RERANKER_ENABLED", False)
+    monkeypatch.setattr(Config, "MMR_ENABLED", False)
+    monkeypatch.setattr(Config, "CONTEXT_COMPRESSION_ENABLED", False)
+
+    store = NumpyVectorStore("kb", read_only=False, quantization="none")
+    texts = ["library opening hours", "library card desk", "room DICT1234 directions"]
+    store.add_records(
+        ["a", "b", "c"],
+        fake_generator.generate_embeddings(texts, show_progress=False),
+        texts,
+        [{'faculty': "FTS"} for _ in texts]
+    )
+    monkeypatch.setattr(retriever_module, "get_vector_store", lambda: store)
+    return DocumentRetriever()
+
+
+def test_sparse_only_hits_use_stored_embeddings(retriever):
+    store = retriever.vector_store
+    encoder = store.embedding_generator.model
+    query_embedding = store.embedding_generator.generate_embedding("where is DICT1234")
+    calls_before = len(encoder.calls)
+
+    hits = store.get_documents(["c", "a"], include_embeddings=True)
+    results = retriever._with_dense_distance(query_embedding, hits)
+
+    # Distances come from the stored vectors; no chunk text is re-encoded
+    assert len(encoder.calls) == calls_before
+    assert [r['id'] for r in results] == ["c", "a"]
+    for hit, result in zip(hits, results):
+        assert result['distance'] == pytest.approx(1.0 - float(hit['embedding'] @ query_embedding))
+
+
+def test_hybrid_search_fuses_dense_and_sparse(retriever, monkeypatch):
+    monkeypatch.setattr(Config, "HYBRID_CANDIDATE_FACTOR", 1)
+    store = retriever.vector_store
+    documents = store.get_documents(["a", "b", "c"])
+    bm25 = BM25Index.build(["a", "b", "c"], [d['document'] for d in documents], [{}] * 3)
+    query_embedding = store.embedding_generator.generate_embedding("library")
+
+    results = retriever._hybrid_search("DICT1234", query_embedding, 2, None, bm25)
+
+    assert "c" in [r['id'] for r in results]
+    assert all(r['rrf_score'] > 0 and r['distance'] is not None for r in results)
+
+
+def test_semantic_cache_keys_hybrid_results_on_query_terms(retriever, monkeypatch):
+    monkeypatch.setattr(Config, "HYBRID_CANDIDATE_FACTOR", 1)
+    store = retriever.vector_store
+    texts = ["modules in IT1113", "modules in IT1114"]
+    store.add_records(
+        ["d", "e"], store.embedding_generator.generate_embeddings(texts, show_progress=False),
+        texts, [{'faculty': "FTS"} for _ in texts]
+    )
+    documents = store.get_documents(["a", "b", "c", "d", "e"])
+    BM25Index.build(
+        [d['id'] for d in documents], [d['document'] for d in documents], [{}] * 5
+    ).save(get_bm25_index_path("kb"))
+    retriever.semantic_cache = SemanticQueryCache(max_distance=1.0)
+    # Near-identical queries: the cache would match them on the embedding alone
+    query_embedding = store.embedding_generator.generate_embedding("library")
+
+    first = retriever._search("modules in IT1113", query_embedding, 2, None)
+    second = retriever._search("modules in IT1114", query_embedding, 2, None)
+    repeated = retriever._search("IT1114 modules", query_embedding, 2, None)
+
+    assert "d" in [r['id'] for r in first] and "e" not in [r['id'] for r in first]
+    assert "e" in [r['id'] for r in second] and "d" not in [r['id'] for r in second]
+    assert repeated == second
+    assert retriever.semantic_cache.get_stats()['hits'] == 1
+
+
+def test_diversify_follows_rerank_order(retriever, monkeypatch):
+    monkeypatch.setattr(Config, "MMR_LAMBDA", 1.0)
+    query = _unit([1, 0, 0])[0]
+    embeddings = _unit([1, 0, 0], [0, 1, 0], [0, 0, 1])
+    results = [
+        {'id': doc_id, 'embedding': embedding, 'rerank_score': score}
+        for doc_id, embedding, score in zip("abc", embeddings, [0.1, 3.0, 2.0])
+    ]
+
+    # The candidate most similar to the query was ranked last by the cross-encoder
+    assert [r['id'] for r in retriever._diversify(query, results, 2)] == ["b", "c"]
+
+
+def test_strip_overlap_removes_repeated_region():
+    previous = "The library opens at eight on weekdays and closes at ten."
+    following = "on weekdays and closes at ten. On weekends it opens at nine."
+
+    assert strip_overlap(previous, following) == " On weekends it opens at nine."
+    # Short coincidental matches are kept
+    assert strip_overlap("ends with ten.", "ten. Next", min_overlap=20) == "ten. Next"
+
+
+def _chunk(source, index, content, score, **metadata):
+    return {
+        'content': content,
+        'metadata': {'url': source, 'chunk_index': index, **metadata},
+        'relevance_score': score
+    }
+
+
+def test_merge_keeps_best_ranked_chunk_metadata():
+    results = [
+        _chunk("page-a", 3, "third part.", 0.9, title="Section 3"),
+        _chunk("page-b", 0, "other page.", 0.8, title="Other"),
+        _chunk("page-a", 2, "second part.", 0.7, title="Section 2"),
+        _chunk("page-a", 5, "fifth part.", 0.6, title="Section 5"),
+    ]
+
+    blocks = merge_adjacent_chunks(results)
+
+    assert [block['content'] for block in blocks] == [
+        "second part. third part.", "other page.", "fifth part."
+    ]
+    assert blocks[0]['metadata']['title'] == "Section 3"
+    assert blocks[0]['relevance_score'] == 0.9
+    assert [block['chunks'] for block in blocks] == [2, 1, 1]
+
+
+def test_merge_leaves_chunks_without_position_alone():
+    results = [_chunk(None, None, "loose", 0.5), _chunk(None, None, "loose", 0.4)]
+
+    assert len(merge_adjacent_chunks(results)) == 2
+
+
+def test_context_savings_only_reported_for_merges(retriever, monkeypatch):
+    separate = [_chunk("page-a", 0, "first.", 0.9), _chunk("page-b", 4, "other.", 0.8)]
+    monkeypatch.setattr(retriever, "retrieve", lambda *args, **kwargs: separate)
+    monkeypatch.setattr(retriever, "_format_context", _counting(retriever._format_context))
+
+    context = retriever.retrieve_with_context("q")
+    assert context['context_chars_saved'] == 0
+    assert retriever._format_context.calls == 1
+
+    adjacent = [_chunk("page-a", 0, "first.", 0.9), _chunk("page-a", 1, "second.", 0.8)]
+    monkeypatch.setattr(retriever, "retrieve", lambda *args, **kwargs: adjacent)
+    assert retriever.retrieve_with_context("q")['context_chars_saved'] > 0
+
+
+def _counting(function):
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return function(*args, **kwargs)
+    wrapper.calls = 0
+    return wrapper
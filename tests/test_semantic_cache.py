@@ -0,0 +1,68 @@
+"""
+Tests for the semantic (paraphrase-aware) query cache
+"""
+
+import numpy as np
+import pytest
+
+from src.rag import semantic_cache
+from src.rag.semantic_cache import SemanticQueryCache
+
+
+@pytest.fixture
+def kb_version(monkeypatch):
+    state = {'version': "v1"}
+    monkeypatch.setattr(semantic_cache, "read_kb_version", lambda: state['version'])
+    return state
+
+
+def _unit(*values) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_hit_within_distance(kb_version):
+    cache = SemanticQueryCache(max_entries=4, max_distance=0.05)
+    cache.add(_unit(1, 0, 0), "all", 5, [{'id': str(i)} for i in range(5)])
+
+    assert cache.lookup(_unit(1, 0.1, 0), "all", 3) == [{'id': "0"}, {'id': "1"}, {'id': "2"}]
+    assert cache.lookup(_unit(1, 1, 0), "all", 3) is None
+
+
+def test_filters_and_top_k_must_match(kb_version):
+    cache = SemanticQueryCache(max_entries=4, max_distance=0.05)
+    cache.add(_unit(1, 0, 0), "faculty=FTS", 3, [{'id': "a"}])
+
+    assert cache.lookup(_unit(1, 0, 0), "all", 3) is None
+    assert cache.lookup(_unit(1, 0, 0), "faculty=FTS", 5) is None
+    assert cache.lookup(_unit(1, 0, 0), "faculty=FTS", 3) == [{'id': "a"}]
+
+
+def test_ring_buffer_overwrites_oldest(kb_version):
+    cache = SemanticQueryCache(max_entries=2, max_distance=0.01)
+    cache.add(_unit(1, 0, 0), "all", 1, [{'id': "x"}])
+    cache.add(_unit(0, 1, 0), "all", 1, [{'id': "y"}])
+    cache.add(_unit(0, 0, 1), "all", 1, [{'id': "z"}])
+
+    assert cache.lookup(_unit(1, 0, 0), "all", 1) is None
+    assert cache.lookup(_unit(0, 0, 1), "all", 1) == [{'id': "z"}]
+    assert cache.get_stats()['size'] == 2
+
+
+def test_new_kb_version_clears(kb_version):
+    cache = SemanticQueryCache(max_entries=2, max_distance=0.05)
+    cache.add(_unit(1, 0, 0), "all", 1, [{'id': "x"}])
+
+    kb_version['version'] = "v2"
+    assert cache.lookup(_unit(1, 0, 0), "all", 1) is None
+
+
+def test_stats_report_hit_distances(kb_version):
+    cache = SemanticQueryCache(max_entries=2, max_distance=0.05)
+    cache.add(_unit(1, 0, 0), "all", 1, [{'id': "x"}])
+    cache.lookup(_unit(1, 0, 0), "all", 1)
+    cache.lookup(_unit(0, 1, 0), "all", 1)
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_distance']['max'] == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,117 @@
+"""
+Tests for index snapshot export and import
+"""
+
+import zipfile
+
+import numpy as np
+import pytest
+
+from src.rag.bm25_index import BM25Index, get_bm25_index_path
+from src.rag.kb_version import read_kb_version, write_kb_version
+from src.rag.numpy_store import NumpyVectorStore
+from src.rag.snapshot import export_snapshot, import_snapshot, read_snapshot
+
+DIM = 32
+
+
+def _add(store, ids, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(len(ids), DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store.add_records(ids, vectors, [f"text {i}" for i in ids], [{'faculty': "FTS"} for _ in ids])
+    return vectors
+
+
+@pytest.fixture
+def snapshot_path(numpy_index_dir, tmp_path):
+    source = NumpyVectorStore("source", read_only=False, quantization="none")
+    _add(source, ["a", "b", "c"])
+    BM25Index.build(["a", "b", "c"], ["text a", "text b", "text c"], [{}] * 3).save(
+        get_bm25_index_path("source")
+    )
+    write_kb_version(version="build-1")
+    path = tmp_path / "kb.zip"
+    export_snapshot(source, path, dtype="float32")
+    return path
+
+
+def test_round_trip_preserves_records(snapshot_path):
+    snapshot = read_snapshot(snapshot_path)
+
+    assert snapshot['ids'] == ["a", "b", "c"]
+    assert snapshot['manifest']['kb_version']['version'] == "build-1"
+    assert snapshot['embeddings'].dtype == np.float32
+
+
+def test_float16_vectors_are_renormalized(numpy_index_dir, tmp_path):
+    source = NumpyVectorStore("half", read_only=False, quantization="none")
+    vectors = _add(source, [f"doc-{i}" for i in range(20)], seed=2)
+    path = tmp_path / "half.zip"
+    export_snapshot(source, path, dtype="float16")
+
+    embeddings = read_snapshot(path)['embeddings']
+
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, atol=1e-6)
+    np.testing.assert_allclose(embeddings, vectors, atol=1e-3)
+
+
+def test_import_removes_chunks_missing_from_snapshot(snapshot_path):
+    replica = NumpyVectorStore("replica", read_only=False, quantization="none")
+    _add(replica, ["a", "stale"], seed=1)
+    write_kb_version(version="local")
+
+    result = import_snapshot(replica, snapshot_path)
+
+    assert sorted(replica.list_ids()) == ["a", "b", "c"]
+    assert result['removed_count'] == 1
+    assert read_kb_version() == "build-1"
+
+
+def test_import_restores_bm25_index(snapshot_path):
+    replica = NumpyVectorStore("replica", read_only=False, quantization="none")
+    import_snapshot(replica, snapshot_path)
+
+    bm25 = BM25Index.load(get_bm25_index_path("replica"))
+    assert bm25.ids == ["a", "b", "c"]
+    assert bm25.search("text b", top_k=1)[0][0] == "b"
+
+
+def test_merge_rebuilds_bm25_over_all_chunks(snapshot_path):
+    replica = NumpyVectorStore("replica", read_only=False, quantization="none")
+    _add(replica, ["stale"], seed=1)
+    import_snapshot(replica, snapshot_path, merge=True)
+
+    assert sorted(BM25Index.load(get_bm25_index_path("replica")).ids) == ["a", "b", "c", "stale"]
+
+
+def test_merge_keeps_extra_chunks_and_stamps_new_version(snapshot_path):
+    replica = NumpyVectorStore("replica", read_only=False, quantization="none")
+    _add(replica, ["stale"], seed=1)
+
+    import_snapshot(replica, snapshot_path, merge=True)
+
+    assert sorted(replica.list_ids()) == ["a", "b", "c", "stale"]
+    assert read_kb_version() not in ("build-1", "unversioned")
+
+
+def test_rejects_other_backend_or_precision(snapshot_path, monkeypatch):
+    replica = NumpyVectorStore("replica", read_only=False, quantization="none")
+    monkeypatch.setattr(type(replica.embedding_generator), "cache_model_id",
+                        property(lambda self: "fake-model-onnx-int8"))
+
+    with pytest.raises(ValueError, match="onnx-int8"):
+        import_snapshot(replica, snapshot_path)
+    assert replica.list_ids() == []
+
+
+def test_detects_tampering(snapshot_path, tmp_path):
+    tampered = tmp_path / "tampered.zip"
+    with zipfile.ZipFile(snapshot_path) as source, zipfile.ZipFile(tampered, 'w') as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == "records.json":
+                data = data.replace(b"text a", b"text X")
+            target.writestr(item, data)
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        read_snapshot(tampered)
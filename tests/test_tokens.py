@@ -0,0 +1,66 @@
+"""
+Tests for token counting, truncation and context packing
+"""
+
+import pytest
+
+from src.llm import tokens
+from src.llm.tokens import count_tokens, truncate_to_tokens
+from src.rag.retriever import pack_context
+
+TEXT = "First sentence here. Second sentence follows. Third one ends it."
+
+
+def test_count_tokens_of_empty_text():
+    assert count_tokens("") == 0
+    assert count_tokens("word") >= 1
+
+
+def test_length_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokens, "_encoding", None)
+    monkeypatch.setattr(tokens, "_encoding_loaded", True)
+
+    assert not tokens.token_counts_are_exact()
+    assert count_tokens("x" * 40) == 10
+
+
+def test_truncate_ends_on_sentence_boundary():
+    assert truncate_to_tokens(TEXT, 1000) == TEXT
+
+    budget = count_tokens("First sentence here.") + 1
+    assert truncate_to_tokens(TEXT, budget) == "First sentence here."
+    assert truncate_to_tokens(TEXT, 1) == ""
+
+
+def _block(content, score=1.0):
+    return {'content': content, 'metadata': {}, 'relevance_score': score}
+
+
+def _formatted_tokens(blocks):
+    parts = [f"[Source {i}]\n{block['content']}\n" for i, block in enumerate(blocks, 1)]
+    return count_tokens("\n\n".join(parts))
+
+
+def test_pack_context_fits_budget_in_rank_order():
+    blocks = [_block(TEXT), _block("Short block."), _block(TEXT * 3)]
+    budget = _formatted_tokens(blocks[:2]) + 12
+
+    packed = pack_context(blocks, budget)
+
+    assert [block['content'] for block in packed[:2]] == [TEXT, "Short block."]
+    assert _formatted_tokens(packed) <= budget
+    if len(packed) == 3:
+        assert packed[2]['truncated']
+
+
+def test_pack_context_skips_blocks_that_cannot_fit():
+    blocks = [_block("Unbreakable" * 50), _block("Fits.")]
+
+    packed = pack_context(blocks, _formatted_tokens([_block("Fits.")]) + 2)
+
+    assert [block['content'] for block in packed] == ["Fits."]
+
+
+@pytest.mark.parametrize("budget", [0, -5])
+def test_pack_context_with_no_budget(budget):
+    assert pack_context([_block(TEXT)], budget) == []
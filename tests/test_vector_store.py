@@ -0,0 +1,115 @@
+"""
+Tests for chunk IDs, record hashing, incremental sync diffs and the write pipeline
+"""
+
+import threading
+
+import pytest
+
+from src.rag.vector_store import (
+    content_hash, record_hash, make_chunk_id, prepare_records, diff_documents, pipelined_write
+)
+
+
+def _doc(doc_id, content, **metadata):
+    return {'id': doc_id, 'content': content, 'metadata': metadata}
+
+
+def test_chunk_ids_are_deterministic_and_positional():
+    first = make_chunk_id("https://vau.ac.lk/page", 3)
+
+    assert first == make_chunk_id("https://vau.ac.lk/page", 3)
+    assert first.endswith("-0003")
+    assert first != make_chunk_id("https://vau.ac.lk/page", 4)
+    assert first != make_chunk_id("https://vau.ac.lk/other", 3)
+
+
+def test_record_hash_covers_metadata_but_not_itself():
+    base = record_hash("text", {'title': "A", 'faculty': "FTS"})
+
+    assert base == record_hash("text", {'faculty': "FTS", 'title': "A", 'content_hash': "x"})
+    assert base != record_hash("text", {'title': "B", 'faculty': "FTS"})
+    assert base != record_hash("other", {'title': "A", 'faculty': "FTS"})
+    assert base != content_hash("text")
+
+
+def test_record_hash_matches_after_string_conversion():
+    assert record_hash("t", {'page_number': 4}) == record_hash("t", {'page_number': "4"})
+
+
+def test_prepare_records_stringifies_and_hashes():
+    ids, texts, metadatas = prepare_records([_doc("a", "hello", page_number=2)])
+
+    assert ids == ["a"] and texts == ["hello"]
+    assert metadatas[0]['page_number'] == "2"
+    assert metadatas[0]['content_hash'] == record_hash("hello", {'page_number': 2})
+
+
+def test_diff_documents_classifies_chunks():
+    documents = [
+        _doc("same", "unchanged text", title="T"),
+        _doc("edited", "new text", title="T"),
+        _doc("renamed", "same text", title="New title"),
+        _doc("new", "brand new", title="T"),
+    ]
+    existing = {
+        "same": record_hash("unchanged text", {'title': "T"}),
+        "edited": record_hash("old text", {'title': "T"}),
+        "renamed": record_hash("same text", {'title': "Old title"}),
+        "gone": record_hash("deleted", {}),
+    }
+
+    diff = diff_documents(documents, existing)
+
+    assert [d['id'] for d in diff['added']] == ["new"]
+    assert [d['id'] for d in diff['updated']] == ["edited", "renamed"]
+    assert diff['removed_ids'] == ["gone"]
+    assert diff['unchanged'] == 1
+
+
+def _docs(n):
+    return [_doc(f"doc-{i}", f"text number {i}", faculty="FTS") for i in range(n)]
+
+
+def test_pipelined_write_keeps_batch_order(fake_generator):
+    written = []
+
+    timings = pipelined_write(
+        _docs(23), 5, fake_generator,
+        lambda ids, texts, metadatas, embeddings: written.append((ids, len(embeddings))),
+        queue_size=1
+    )
+
+    assert [doc_id for ids, _ in written for doc_id in ids] == [f"doc-{i}" for i in range(23)]
+    assert [count for _, count in written] == [5, 5, 5, 5, 3]
+    assert timings['batches'] == 5
+
+
+def test_pipelined_write_raises_producer_errors(fake_generator, monkeypatch):
+    encode = fake_generator.generate_embeddings
+    calls = []
+
+    def fail_on_third(texts, **kwargs):
+        calls.append(texts)
+        if len(calls) == 3:
+            raise RuntimeError("encoder crashed")
+        return encode(texts, **kwargs)
+
+    monkeypatch.setattr(fake_generator, "generate_embeddings", fail_on_third)
+    written = []
+
+    with pytest.raises(RuntimeError, match="encoder crashed"):
+        pipelined_write(_docs(30), 5, fake_generator, lambda *batch: written.append(batch))
+    assert len(written) == 2
+
+
+def test_pipelined_write_stops_producer_on_writer_error(fake_generator):
+    def fail(*batch):
+        raise IOError("disk full")
+
+    threads_before = threading.active_count()
+    with pytest.raises(IOError, match="disk full"):
+        # A one-slot queue would block the producer forever if it were not stopped
+        pipelined_write(_docs(50), 5, fake_generator, fail, queue_size=1)
+
+    assert threading.active_count() == threads_before